@@ -1,23 +1,115 @@
 import Stockcsv
-from Main import Individual, Group
-from typing import List
+import Stockdb
+from Main import Individual, Group, ScoreMatrix, SearchIndex, stack_data
+from typing import List, Tuple
+from itertools import islice
+from bisect import bisect_left
+import numpy as np
+import csv
 import json
 import os
+import sqlite3
+import threading
+import uuid
 
 NOTES_FILE = 'notes.json'
 STUDENTS_FILE = 'students.json'
+# Journal des modifications de students.json (une ligne JSON par écriture)
+JOURNAL_FILE = 'students.journal.jsonl'
+# Taille (octets) au-delà de laquelle le journal est fusionné dans students.json
+JOURNAL_COMPACT_BYTES = 1_000_000
+# Instantané binaire du dernier chargement (matrice .npy + colonnes encodées par dictionnaire)
+SNAPSHOT_DIR = 'students.snapshot'
+# False : les fichiers sources sont toujours relus (ni lecture ni écriture de l'instantané)
+USE_SNAPSHOT = True
+
+# Stockage des étudiants : False = students.json, True = table SQLite de Stockdb.DB_FILE
+USE_SQLITE = False
+
+# Nombre d'entrées construites par lot lors d'un chargement progressif
+LOAD_BATCH_SIZE = 5000
+
+# Stockage des notes du dépôt : 'memory' = tableau NumPy, 'memmap' = fichier projeté
+# dans SCORES_MAP_DIR (jeux de données plus grands que la mémoire vive)
+SCORE_STORAGE = 'memory'
+SCORES_MAP_DIR = 'scores.map'
+# float32 divise par deux la taille du fichier projeté
+SCORES_MAP_DTYPE = np.float64
+
+# Protège l'échange journal / instantané entre les écritures et la compaction
+_journal_lock = threading.Lock()
+_compaction_thread = None
+
+# Dernier jeu de données lu, partagé par `load_all_individuals` et `load_groups` ;
+# valable tant que la clé (version, état des fichiers sources) ne change pas
+_parse_cache = {'key': None, 'individuals': None, 'groups': None}
 
 class DataManager:
     """Classe de pont entre les entités et le gestionnaire de CSV."""
 
+    # Version du jeu de données, incrémentée à chaque écriture (sert de clé aux caches)
+    version = 0
+
+    @staticmethod
+    def bump_version():
+        """Signale une modification des données persistées."""
+        DataManager.version += 1
+
     @staticmethod
     def parse_data_string(data_string: str) -> List[float]:
         """Convertit une chaîne de données en une liste de flottants."""
         try:
             return [float(x.strip()) for x in data_string.split(',')]
-        except:
+        except ValueError:
             return []
-        
+
+    @staticmethod
+    def parse_data_strings(data_strings: List[str]) -> Tuple[np.ndarray, np.ndarray, dict]:
+        """Convertit en bloc des chaînes de données ("12,15,18") en une matrice de flottants.
+
+        Toutes les chaînes sont jointes puis lues en une seule passe par `np.fromstring` ;
+        l'analyse ne repasse ligne par ligne que si le bloc contient une valeur invalide.
+
+        Returns:
+            Tuple (matrice lignes x nombre maximal de valeurs complétée par NaN,
+            nombre de valeurs de chaque ligne, dictionnaire indice de ligne -> message
+            d'erreur). Une ligne invalide compte zéro valeur, comme avec `parse_data_string`.
+        """
+        strings = [s.strip() for s in data_strings]
+        counts = np.fromiter((s.count(',') + 1 if s else 0 for s in strings), dtype=np.intp, count=len(strings))
+        errors = {}
+        flat = DataManager._parse_floats(','.join(filter(None, strings)), int(counts.sum()))
+        if flat is None:
+            # au moins une ligne invalide : on la localise en analysant chaque ligne
+            parts = []
+            for i, text in enumerate(strings):
+                values = DataManager._parse_floats(text, int(counts[i]))
+                if values is None:
+                    errors[i] = f"valeur non numérique dans {text!r}"
+                    counts[i] = 0
+                else:
+                    parts.append(values)
+            flat = np.concatenate(parts) if parts else np.empty(0)
+
+        width = int(counts.max()) if len(counts) else 0
+        if len(counts) and (counts == width).all():
+            return flat.reshape(len(counts), width), counts, errors
+        matrix = np.full((len(counts), width), np.nan)
+        rows = np.repeat(np.arange(len(counts)), counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        matrix[rows, np.arange(len(flat)) - starts] = flat
+        return matrix, counts, errors
+
+    @staticmethod
+    def _parse_floats(text: str, expected: int):
+        """Lit `expected` flottants séparés par des virgules, ou retourne None si le texte est invalide."""
+        try:
+            values = np.fromstring(text, sep=',')
+        except ValueError:
+            return None
+        # une virgule en trop ou une valeur vide donne moins de valeurs que de séparateurs
+        return values if len(values) == expected else None
+
     @staticmethod
     def load_all_individuals() -> List[Individual]:
         """Charge toutes les entrées individuelles.
@@ -25,54 +117,240 @@ class DataManager:
         Priorité aux étudiants définis dans `students.json` (format JSON).
         Si absent ou vide, on retombe sur le CSV `Bd.csv`.
         """
+        key = DataManager._sources_key()
+        if _parse_cache['key'] == key and _parse_cache['individuals'] is not None:
+            return list(_parse_cache['individuals'])
         individuals = []
+        for batch, _ in DataManager.iter_all_individuals():
+            individuals.extend(batch)
+        return individuals
 
-        # si students.json existe, l'utiliser
-        if os.path.isfile(STUDENTS_FILE):
+    @staticmethod
+    def _sources_key():
+        """Clé de cache : version des données et (chemin, mtime_ns, taille) de chaque fichier source."""
+        paths = [NOTES_FILE, STUDENTS_FILE, JOURNAL_FILE + '.compacting', JOURNAL_FILE, "Bd.csv"]
+        if USE_SQLITE:
+            paths += [Stockdb.DB_FILE, Stockdb.DB_FILE + '-wal']
+        stamps = []
+        for path in paths:
             try:
-                with open(STUDENTS_FILE, 'r', encoding='utf-8') as f:
-                    students = json.load(f)
-                # charger l'ordre des notes si présent
-                notes = []
-                if os.path.isfile(NOTES_FILE):
+                stat = os.stat(path)
+                stamps.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append((path, None, None))
+        return DataManager.version, USE_SQLITE, tuple(stamps)
+
+    @staticmethod
+    def invalidate_cache():
+        """Oublie le jeu de données gardé en cache (les fichiers seront relus)."""
+        _parse_cache.update(key=None, individuals=None, groups=None)
+
+    @staticmethod
+    def iter_all_individuals(batch_size: int = LOAD_BATCH_SIZE):
+        """Charge les entrées individuelles par lots (même priorité que `load_all_individuals`).
+
+        Si aucun fichier source n'a changé depuis le dernier chargement complet, les
+        individus déjà construits sont renvoyés sans relire les fichiers.
+
+        Yields:
+            Tuple (lot d'`Individual`, nombre total d'entrées ou None s'il est inconnu).
+        """
+        # clé prise avant la lecture : une modification pendant la lecture invalide le résultat
+        key = DataManager._sources_key()
+        cached = _parse_cache['individuals'] if _parse_cache['key'] == key else None
+        if cached is None and USE_SNAPSHOT:
+            # démarrage : instantané binaire si les fichiers sources n'ont pas changé depuis
+            cached = DataManager.read_snapshot(key[1:])
+            if cached is not None:
+                _parse_cache.update(key=key, individuals=cached, groups=None)
+        if cached is not None:
+            for start in range(0, len(cached), batch_size):
+                yield cached[start:start + batch_size], len(cached)
+            return
+
+        individuals = []
+        for batch, total in DataManager._read_all_individuals(batch_size):
+            individuals.extend(batch)
+            yield batch, total
+        _parse_cache.update(key=key, individuals=individuals, groups=None)
+        if USE_SNAPSHOT:
+            DataManager.write_snapshot(key[1:], individuals)
+
+    @staticmethod
+    def write_snapshot(sources, individuals: List[Individual]):
+        """Écrit l'instantané binaire des individus, associé à l'état `sources` des fichiers sources.
+
+        La matrice des notes (complétée par NaN) est un `.npy` ; noms, prénoms et groupes
+        sont des tableaux de codes vers des listes de valeurs distinctes. Les fichiers
+        portent un identifiant de génération et `meta.json` n'est remplacé qu'en dernier :
+        un instantané interrompu n'est jamais lu. Un échec d'écriture est ignoré.
+        """
+        names = [n.get('name') for n in DataManager.load_notes() if isinstance(n, dict)]
+        # 'notes' : scores = notes nommées selon notes.json ; 'none' : pas de scores (CSV)
+        mode = 'notes' if names and any(ind.scores for ind in individuals) else 'none'
+        n = len(individuals)
+        counts = np.fromiter((len(ind.data) for ind in individuals), dtype=np.int32, count=n)
+        width = int(counts.max()) if n else 0
+        if n and (counts == width).all():
+            scores = stack_data([ind.data for ind in individuals], width)
+        else:
+            scores = np.full((n, width), np.nan)
+            for i, ind in enumerate(individuals):
+                scores[i, :counts[i]] = ind.data
+
+        columns = {}
+        codes = np.empty((n, 3), dtype=np.int32)
+        for c, field in enumerate(('nom', 'prenom', 'groupe')):
+            values = {}
+            codes[:, c] = [values.setdefault(getattr(ind, field), len(values)) for ind in individuals]
+            columns[field] = list(values)
+
+        irregular = {}
+        shared = tuple(names)
+        for i, ind in enumerate(individuals):
+            if mode == 'notes' and ind.note_names == shared[:len(ind.data)]:
+                continue
+            expected = dict(zip(names, ind.data)) if mode == 'notes' else {}
+            if ind.scores != expected:
+                irregular[i] = ind.scores
+
+        generation = uuid.uuid4().hex
+        meta = {'sources': json.loads(json.dumps(sources)), 'generation': generation, 'count': n,
+                'notes': names, 'mode': mode, 'columns': columns, 'irregular': irregular}
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            np.save(os.path.join(SNAPSHOT_DIR, f'scores-{generation}.npy'), scores)
+            np.save(os.path.join(SNAPSHOT_DIR, f'counts-{generation}.npy'), counts)
+            np.save(os.path.join(SNAPSHOT_DIR, f'codes-{generation}.npy'), codes)
+            temp = os.path.join(SNAPSHOT_DIR, 'meta.json.tmp')
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(temp, os.path.join(SNAPSHOT_DIR, 'meta.json'))
+            # fichiers des générations précédentes ; un fichier encore projeté par des
+            # individus lus plus tôt (refusé sous Windows) sera retiré à la prochaine écriture
+            for name in os.listdir(SNAPSHOT_DIR):
+                if name.endswith('.npy') and generation not in name:
                     try:
-                        with open(NOTES_FILE, 'r', encoding='utf-8') as nf:
-                            notes = json.load(nf)
-                    except Exception:
-                        notes = []
-
-                for s in students:
-                    nom = s.get('nom','').strip()
-                    prenom = s.get('prenom','').strip()
-                    groupe = s.get('groupe','').strip()
-                    scores = s.get('scores', {})
-                    # build data list following notes order, fallback to values if missing
-                    if notes:
-                        data = [float(scores.get(n.get('name'), 0)) for n in notes]
-                    else:
-                        # if no notes defined, flatten numeric values
-                        data = [float(v) for v in scores.values()] if isinstance(scores, dict) else []
-                    ind = Individual(nom, prenom, groupe, data, scores=scores)
-                    individuals.append(ind)
-                return individuals
+                        os.remove(os.path.join(SNAPSHOT_DIR, name))
+                    except OSError:
+                        pass
+        except (OSError, TypeError, ValueError):
+            pass
+
+    @staticmethod
+    def read_snapshot(sources):
+        """Reconstruit les individus depuis l'instantané binaire s'il correspond à l'état `sources`.
+
+        La matrice des notes est ouverte en mémoire projetée (`mmap_mode='r'`).
+        Retourne None si l'instantané est absent, périmé ou illisible.
+        """
+        try:
+            with open(os.path.join(SNAPSHOT_DIR, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('sources') != json.loads(json.dumps(sources)):
+                return None
+            generation = meta['generation']
+            scores = np.load(os.path.join(SNAPSHOT_DIR, f'scores-{generation}.npy'), mmap_mode='r')
+            counts = np.load(os.path.join(SNAPSHOT_DIR, f'counts-{generation}.npy'), mmap_mode='r')
+            codes = np.load(os.path.join(SNAPSHOT_DIR, f'codes-{generation}.npy'), mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None
+        n = meta['count']
+        if scores.shape[0] != n or len(counts) != n or codes.shape != (n, 3):
+            return None
+
+        columns = meta['columns']
+        noms = np.array(columns['nom'], dtype=object)[codes[:, 0]].tolist()
+        prenoms = np.array(columns['prenom'], dtype=object)[codes[:, 1]].tolist()
+        groupes = np.array(columns['groupe'], dtype=object)[codes[:, 2]].tolist()
+        # les données de chaque individu sont une vue (lecture seule) sur sa ligne du fichier
+        # projeté : rien n'est copié, les pages sont lues à la demande
+        scores = np.asarray(scores)
+        counts = counts.tolist()
+        # noms des notes partagés par les individus dont les scores suivent les données
+        names = tuple(meta['notes']) if meta['mode'] == 'notes' else None
+        irregular = {int(i): row_scores for i, row_scores in meta['irregular'].items()}
+
+        individuals = []
+        for i, (nom, prenom, groupe, count) in enumerate(zip(noms, prenoms, groupes, counts)):
+            data = scores[i, :count]
+            row_scores = irregular[i] if i in irregular else names
+            individuals.append(Individual(nom, prenom, groupe, data, scores=row_scores))
+        return individuals
+
+    @staticmethod
+    def _read_all_individuals(batch_size: int):
+        """Lit les fichiers sources et construit les individus par lots (voir `iter_all_individuals`)."""
+        if USE_SQLITE:
+            DataManager.migrate_to_sqlite()
+            students = Stockdb.ReadStudents()
+            yield from DataManager._iter_student_batches(students, DataManager.load_notes(), batch_size)
+            return
+
+        # si students.json (ou son journal) existe, l'utiliser
+        if DataManager.has_students():
+            try:
+                students = DataManager.read_students_file()
+                batches = DataManager._iter_student_batches(students, DataManager.load_notes(), batch_size)
+                first = next(batches, None)
             except Exception:
                 # fallback to CSV on failure
-                pass
+                students = None
+            if students is not None:
+                if first is not None:
+                    yield first
+                    yield from batches
+                return
+
+        # fallback: read CSV, lot par lot, sans charger tout le fichier
+        for chunk in Stockcsv.IterCsv(batch_size):
+            batch = DataManager._build_csv_individuals(chunk)
+            if batch:
+                yield batch, None
 
-        # fallback: read CSV
-        csv_data = Stockcsv.ReadCsv()
-        for entry in csv_data:
+    @staticmethod
+    def _build_csv_individuals(rows) -> List[Individual]:
+        """Construit les `Individual` d'un lot de lignes du CSV (lignes sans nom ou prénom ignorées)."""
+        entries = []
+        for entry in rows:
             nom = entry.get("Nom", "").strip()
             prenom = entry.get("Prénom", "").strip()
-            groupe = entry.get("Groupe", "").strip()
-            data_str = entry.get("Données", "").strip()
+            if nom and prenom:
+                entries.append((nom, prenom, entry.get("Groupe", "").strip(), entry.get("Données", "")))
 
-            data = DataManager.parse_data_string(data_str)
+        matrix, counts, errors = DataManager.parse_data_strings([e[3] for e in entries])
+        for i, message in errors.items():
+            print(f"Données invalides pour {entries[i][0]} {entries[i][1]} : {message}")
 
-            if nom and prenom:
-                ind = Individual(nom, prenom, groupe, data)
-                individuals.append(ind)
-        
+        width = matrix.shape[1]
+        individuals = []
+        for (nom, prenom, groupe, _), data, count in zip(entries, matrix.tolist(), counts.tolist()):
+            individuals.append(Individual(nom, prenom, groupe, data if count == width else data[:count]))
+        return individuals
+
+    @staticmethod
+    def _iter_student_batches(students, notes, batch_size):
+        """Construit les `Individual` d'une liste d'étudiants par lots de `batch_size`."""
+        for start in range(0, len(students), batch_size):
+            yield DataManager._build_individuals(students[start:start + batch_size], notes), len(students)
+
+    @staticmethod
+    def _build_individuals(students, notes) -> List[Individual]:
+        """Construit les `Individual` à partir des dictionnaires étudiants."""
+        individuals = []
+        for s in students:
+            nom = s.get('nom','').strip()
+            prenom = s.get('prenom','').strip()
+            groupe = s.get('groupe','').strip()
+            scores = s.get('scores', {})
+            # build data list following notes order, fallback to values if missing
+            if notes:
+                data = [float(scores.get(n.get('name'), 0)) for n in notes]
+            else:
+                # if no notes defined, flatten numeric values
+                data = [float(v) for v in scores.values()] if isinstance(scores, dict) else []
+            ind = Individual(nom, prenom, groupe, data, scores=scores)
+            individuals.append(ind)
         return individuals
 
     @staticmethod
@@ -91,6 +369,7 @@ class DataManager:
         try:
             with open(NOTES_FILE, 'w', encoding='utf-8') as f:
                 json.dump(notes_list, f, ensure_ascii=False, indent=2)
+            DataManager.bump_version()
             return True
         except Exception:
             return False
@@ -98,62 +377,294 @@ class DataManager:
     @staticmethod
     def load_students():
         """Charge les étudiants depuis `students.json` (raw dicts)."""
-        if not os.path.isfile(STUDENTS_FILE):
-            return []
+        if USE_SQLITE:
+            DataManager.migrate_to_sqlite()
+            try:
+                return Stockdb.ReadStudents()
+            except sqlite3.Error:
+                return []
         try:
-            with open(STUDENTS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return DataManager.read_students_file()
         except Exception:
             return []
 
     @staticmethod
-    def save_student(student_dict):
-        """Ajoute ou met à jour un étudiant dans `students.json`."""
-        students = []
-        if os.path.isfile(STUDENTS_FILE):
-            try:
+    def has_students() -> bool:
+        """Indique si `students.json` ou son journal existe."""
+        return any(os.path.isfile(path) for path in (STUDENTS_FILE, JOURNAL_FILE + '.compacting', JOURNAL_FILE))
+
+    @staticmethod
+    def read_students_file():
+        """Lit l'instantané `students.json` puis rejoue le journal des modifications.
+
+        Lève une exception si l'instantané est illisible ; une ligne de journal
+        incomplète (écriture interrompue) est ignorée.
+        """
+        with _journal_lock:
+            students = []
+            if os.path.isfile(STUDENTS_FILE):
                 with open(STUDENTS_FILE, 'r', encoding='utf-8') as f:
                     students = json.load(f)
-            except Exception:
-                students = []
+            # journal en cours de compaction, puis journal courant
+            journals = [JOURNAL_FILE + '.compacting', JOURNAL_FILE]
+            return DataManager._replay_journal(students, [p for p in journals if os.path.isfile(p)])
 
-        # find existing by nom+prenom
-        updated = False
-        for s in students:
-            if s.get('nom') == student_dict.get('nom') and s.get('prenom') == student_dict.get('prenom'):
-                s.update(student_dict)
-                updated = True
-                break
-        if not updated:
-            students.append(student_dict)
+    @staticmethod
+    def _replay_journal(students, paths):
+        """Applique aux étudiants les enregistrements upsert/delete des journaux `paths`, dans l'ordre."""
+        by_key = {(s.get('nom'), s.get('prenom')): s for s in students}
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('op') == 'delete':
+                        by_key.pop((record.get('nom'), record.get('prenom')), None)
+                    elif record.get('op') == 'upsert':
+                        student = record.get('student', {})
+                        key = (student.get('nom'), student.get('prenom'))
+                        if key in by_key:
+                            by_key[key].update(student)
+                        else:
+                            by_key[key] = student
+        return list(by_key.values())
 
+    @staticmethod
+    def _append_journal(*records) -> bool:
+        """Ajoute des enregistrements au journal en une écriture ; lance la compaction si le journal est trop gros."""
+        text = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
         try:
-            with open(STUDENTS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(students, f, ensure_ascii=False, indent=2)
-            return True
-        except Exception:
+            with _journal_lock:
+                with open(JOURNAL_FILE, 'ab+') as f:
+                    size = f.seek(0, os.SEEK_END)
+                    if size:
+                        f.seek(size - 1)
+                        if f.read(1) != b'\n':
+                            # dernière ligne incomplète (écriture interrompue) : elle reste isolée,
+                            # sinon l'enregistrement suivant lui serait accolé et perdu au rejeu
+                            text = '\n' + text
+                    f.write(text.encode('utf-8'))
+                    size = f.tell()
+        except OSError:
             return False
+        if size > JOURNAL_COMPACT_BYTES:
+            DataManager.compact_journal_async()
+        return True
 
     @staticmethod
-    def delete_student(nom: str, prenom: str):
-        students = DataManager.load_students()
-        new = [s for s in students if not (s.get('nom')==nom and s.get('prenom')==prenom)]
+    def compact_journal():
+        """Fusionne le journal dans un nouvel instantané `students.json`.
+
+        Le journal est d'abord renommé pour que les écritures suivantes repartent
+        sur un journal vide ; l'instantané est écrit dans un fichier temporaire puis
+        substitué à l'ancien, si bien qu'une interruption ne perd aucune modification.
+        """
+        compacting = JOURNAL_FILE + '.compacting'
+        with _journal_lock:
+            # un journal de compaction restant (compaction interrompue) est repris tel quel
+            if not os.path.isfile(compacting):
+                if not os.path.isfile(JOURNAL_FILE):
+                    return
+                os.replace(JOURNAL_FILE, compacting)
+            students = []
+            if os.path.isfile(STUDENTS_FILE):
+                with open(STUDENTS_FILE, 'r', encoding='utf-8') as f:
+                    students = json.load(f)
+
+        students = DataManager._replay_journal(students, [compacting])
+        temp = STUDENTS_FILE + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(students, f, ensure_ascii=False, indent=2)
+
+        with _journal_lock:
+            os.replace(temp, STUDENTS_FILE)
+            os.remove(compacting)
+
+    @staticmethod
+    def compact_journal_async():
+        """Lance `compact_journal` dans un thread de fond s'il n'y en a pas déjà un.
+
+        Le thread n'est pas démon : une compaction commencée se termine avant la fin du programme.
+        """
+        global _compaction_thread
+        if _compaction_thread is not None and _compaction_thread.is_alive():
+            return
+        _compaction_thread = threading.Thread(target=DataManager._compact_quietly, name="students-compaction")
+        _compaction_thread.start()
+
+    @staticmethod
+    def _compact_quietly():
         try:
-            with open(STUDENTS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(new, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
+            DataManager.compact_journal()
+        except (OSError, ValueError) as e:
+            print(f"Compaction du journal impossible : {e}")
+
+    @staticmethod
+    def save_student(student_dict):
+        """Ajoute ou met à jour un étudiant dans `students.json`.
+
+        L'écriture est un ajout d'une ligne au journal (coût proportionnel à l'enregistrement).
+        """
+        if USE_SQLITE:
+            try:
+                DataManager.migrate_to_sqlite()
+                Stockdb.UpsertStudent(student_dict)
+                DataManager.bump_version()
+                return True
+            except sqlite3.Error:
+                return False
+
+        # rejoué comme une mise à jour (fusion des champs) si nom+prenom existe déjà
+        if not DataManager._append_journal({'op': 'upsert', 'student': student_dict}):
+            return False
+        DataManager.bump_version()
+        return True
+
+    @staticmethod
+    def delete_student(nom: str, prenom: str):
+        """Supprime un étudiant de la base SQLite ou de `students.json` (ajout au journal).
+
+        Returns:
+            True si la suppression est enregistrée, False en cas d'échec.
+        """
+        if USE_SQLITE:
+            try:
+                DataManager.migrate_to_sqlite()
+                Stockdb.DeleteStudent(nom, prenom)
+                DataManager.bump_version()
+                return True
+            except sqlite3.Error:
+                return False
+
+        if not DataManager._append_journal({'op': 'delete', 'nom': nom, 'prenom': prenom}):
+            return False
+        DataManager.bump_version()
+        return True
     
+    @staticmethod
+    def migrate_to_sqlite():
+        """Importe une seule fois `students.json` puis `Bd.csv` dans la base SQLite.
+
+        Les étudiants du JSON sont prioritaires ; les lignes du CSV ne sont ajoutées que
+        pour les couples (nom, prénom) absents, leurs notes étant nommées selon `notes.json`.
+        """
+        if Stockdb.IsMigrated():
+            return
+        students = []
+        if DataManager.has_students():
+            try:
+                students = DataManager.read_students_file()
+            except Exception:
+                students = []
+
+        known = {(s.get('nom','').strip(), s.get('prenom','').strip()) for s in students}
+        names = [n.get('name') for n in DataManager.load_notes() if isinstance(n, dict)]
+        Stockdb.UpsertStudents(students)
+        for chunk in Stockcsv.IterCsv():
+            rows = []
+            for ind in DataManager._build_csv_individuals(chunk):
+                if (ind.nom, ind.prenom) in known:
+                    continue
+                rows.append(DataManager._student_from_individual(ind, names))
+                known.add((ind.nom, ind.prenom))
+            Stockdb.UpsertStudents(rows)
+        Stockdb.SetMigrated()
+
+    @staticmethod
+    def save_students_bulk(students) -> int:
+        """Ajoute ou met à jour en une seule écriture un ensemble d'étudiants.
+
+        Les étudiants de même (nom, prénom) sont d'abord fusionnés (les derniers champs
+        l'emportent), puis écrits en une transaction SQLite ou un seul ajout au journal.
+
+        Args:
+            students: Itérable de dictionnaires au format de `students.json`.
+
+        Returns:
+            Le nombre d'étudiants distincts enregistrés (0 en cas d'échec).
+        """
+        merged = {}
+        for student in students:
+            key = (student.get('nom'), student.get('prenom'))
+            if key in merged:
+                merged[key].update(student)
+            else:
+                merged[key] = dict(student)
+        if not merged:
+            return 0
+
+        if USE_SQLITE:
+            DataManager.migrate_to_sqlite()
+            try:
+                Stockdb.UpsertStudents(merged.values())
+            except sqlite3.Error:
+                return 0
+        elif not DataManager._append_journal(*({'op': 'upsert', 'student': s} for s in merged.values())):
+            return 0
+        DataManager.bump_version()
+        return len(merged)
+
+    @staticmethod
+    def import_csv(filename) -> int:
+        """Importe un fichier au format de `Bd.csv` via `save_students_bulk`.
+
+        Le fichier est lu par lots ; les notes sont nommées selon `notes.json`.
+
+        Returns:
+            Le nombre d'étudiants distincts importés.
+        """
+        names = [n.get('name') for n in DataManager.load_notes() if isinstance(n, dict)]
+
+        def students():
+            with open(filename, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.DictReader(f)
+                while True:
+                    chunk = list(islice(reader, Stockcsv.CSV_CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    for ind in DataManager._build_csv_individuals(chunk):
+                        yield DataManager._student_from_individual(ind, names)
+
+        return DataManager.save_students_bulk(students())
+
+    @staticmethod
+    def _student_from_individual(individual: Individual, names) -> dict:
+        """Convertit une entrée du CSV en étudiant, ses notes étant nommées selon `names` puis `Note i`."""
+        scores = {(names[i] if i < len(names) else f'Note {i+1}'): v for i, v in enumerate(individual.data)}
+        return {'nom': individual.nom, 'prenom': individual.prenom, 'groupe': individual.groupe, 'scores': scores}
+
+    @staticmethod
+    def save_individuals_bulk(individuals) -> int:
+        """Ajoute en un seul passage des entrées individuelles au CSV ; retourne leur nombre."""
+        count = Stockcsv.AddEntries((ind.nom, ind.prenom, ind.groupe, ','.join([str(x) for x in ind.data]))
+                                    for ind in individuals)
+        if count:
+            DataManager.bump_version()
+        return count
+
     @staticmethod
     def save_individual(individual: Individual):
         """Sauvegarde ou met à jour une entrée individuelle dans le CSV."""
         data_str = ','.join([str(x) for x in individual.data])
         Stockcsv.AddEntry(individual.nom, individual.prenom, individual.groupe, data_str)
+        DataManager.bump_version()
 
     @staticmethod
     def load_groups() -> List[Group]:
-        """Charge les groupes d'entrées depuis le CSV."""
-        individuals  = DataManager.load_all_individuals()
+        """Charge les groupes d'entrées (construits une fois par état des fichiers sources)."""
+        key = DataManager._sources_key()
+        if _parse_cache['key'] == key and _parse_cache['groups'] is not None:
+            return list(_parse_cache['groups'])
+        groups = DataManager.build_groups(DataManager.load_all_individuals())
+        if _parse_cache['key'] == key:
+            _parse_cache['groups'] = groups
+        return list(groups)
+
+    @staticmethod
+    def build_groups(individuals: List[Individual]) -> List[Group]:
+        """Regroupe des individus déjà chargés par nom de groupe."""
         groups_dict = {}
         for ind in individuals:
             if ind.groupe:
@@ -173,3 +684,222 @@ class DataManager:
     def delete_individual(nom: str, prenom: str):
         """Supprime une entrée individuelle du CSV."""
         Stockcsv.DeleteEntry(nom, prenom)
+        DataManager.bump_version()
+
+
+class Repository:
+    """Jeu de données en mémoire : individus, index par (nom, prénom), groupes et matrice des notes.
+
+    Les écritures sont persistées via `DataManager` puis appliquées au seul
+    enregistrement concerné, sans relire les fichiers ni reconstruire les groupes.
+    """
+
+    def __init__(self):
+        """Initialise un dépôt vide ; appeler `load` pour le remplir."""
+        self.individuals: List[Individual] = []
+        self.groups: List[Group] = []
+        self.notes = []
+        self.matrix = Repository._new_matrix()
+        self._by_key = {}
+        self._group_index = {}
+        # identifiants croissants dans l'ordre de self.individuals (ordre d'affichage) :
+        # la position d'un individu (ou d'un groupe) se trouve par dichotomie sur son identifiant
+        self._uids = {}
+        self._by_uid = {}
+        self._next_uid = 0
+        self._group_uids = {}
+        # index de recherche construit à la première recherche puis tenu à jour
+        self._search_index = None
+
+    def load(self):
+        """Charge (une seule fois) les fichiers et construit groupes, index et matrice."""
+        self.reset(DataManager.load_notes())
+        for batch, _ in DataManager.iter_all_individuals():
+            self.extend(batch)
+
+    def reset(self, notes):
+        """Vide le dépôt avant un (re)chargement, en conservant l'ordre des notes `notes`."""
+        self.notes = notes
+        self.individuals = []
+        self.groups = []
+        self.matrix = Repository._new_matrix()
+        self._by_key = {}
+        self._group_index = {}
+        self._uids = {}
+        self._by_uid = {}
+        self._next_uid = 0
+        self._group_uids = {}
+        self._search_index = None
+
+    @staticmethod
+    def _new_matrix() -> ScoreMatrix:
+        """Matrice vide selon `SCORE_STORAGE` (les fichiers projetés précédents sont supprimés)."""
+        if SCORE_STORAGE == 'memmap':
+            ScoreMatrix.clear_directory(SCORES_MAP_DIR)
+            return ScoreMatrix([], directory=SCORES_MAP_DIR, dtype=SCORES_MAP_DTYPE)
+        return ScoreMatrix([])
+
+    def extend(self, individuals: List[Individual]):
+        """Ajoute un lot d'individus chargés (groupes, index et matrice compris)."""
+        self.individuals.extend(individuals)
+        for ind in individuals:
+            self._by_key[(ind.nom, ind.prenom)] = ind
+            self._group_add(ind)
+            uid = self._assign_uid(ind)
+            if self._search_index is not None:
+                self._search_index.add(uid, ind.nom, ind.prenom, ind.groupe)
+        self.matrix.append_rows(individuals)
+
+    def _assign_uid(self, individual: Individual) -> int:
+        uid = self._next_uid
+        self._next_uid += 1
+        self._uids[individual] = uid
+        self._by_uid[uid] = individual
+        return uid
+
+    def uid(self, individual: Individual) -> int:
+        """Identifiant stable d'un individu du dépôt ; l'ordre des identifiants est l'ordre d'affichage."""
+        return self._uids[individual]
+
+    def group_uid(self, group: Group) -> int:
+        """Identifiant stable d'un groupe du dépôt, croissant dans l'ordre de `self.groups`."""
+        return self._group_uids[group]
+
+    def search(self, term: str, within=None) -> List[Individual]:
+        """Retourne, dans l'ordre d'affichage, les individus dont le nom, le prénom ou le groupe contient `term`.
+
+        Args:
+            term (str): Le terme recherché (la casse est ignorée).
+            within (List[Individual]): Résultat d'une recherche précédente dont le terme
+                est contenu dans `term` ; seuls ces individus sont alors examinés.
+        """
+        if self._search_index is None:
+            self._search_index = SearchIndex()
+            self._search_index.build((uid, (ind.nom, ind.prenom, ind.groupe)) for ind, uid in self._uids.items())
+        keys = None if within is None else {self._uids[ind] for ind in within if ind in self._uids}
+        return [self._by_uid[k] for k in self._search_index.search(term, keys)]
+
+    def find(self, nom: str, prenom: str):
+        """Retourne l'individu (nom, prénom), ou None."""
+        return self._by_key.get((nom, prenom))
+
+    def find_group(self, nom: str):
+        """Retourne le groupe `nom`, ou None."""
+        return self._group_index.get(nom)
+
+    def save_student(self, student_dict, previous: Individual = None):
+        """Enregistre un étudiant et met à jour la mémoire.
+
+        Args:
+            student_dict (dict): L'étudiant au format de `students.json`.
+            previous (Individual): L'individu modifié (None pour un ajout) ; s'il est
+                renommé, son ancien enregistrement est supprimé.
+
+        Returns:
+            Tuple (individu enregistré, groupes touchés, individus retirés), ou None en cas d'échec.
+        """
+        key = (student_dict.get('nom', '').strip(), student_dict.get('prenom', '').strip())
+        if previous is not None and (previous.nom, previous.prenom) != key:
+            if not DataManager.delete_student(previous.nom, previous.prenom):
+                return None
+        if not DataManager.save_student(student_dict):
+            return None
+
+        fresh = DataManager._build_individuals([student_dict], self.notes)[0]
+        removed = []
+        touched = set()
+        target = self._by_key.get(key)
+        if previous is not None and target is not None and target is not previous:
+            # renommé vers un étudiant existant : les deux enregistrements fusionnent
+            touched.add(previous.groupe)
+            self._remove(previous)
+            removed.append(previous)
+        elif target is None:
+            target = previous
+
+        regroup = True
+        if target is None:
+            target = fresh
+            self.individuals.append(target)
+            self._assign_uid(target)
+        else:
+            touched.add(target.groupe)
+            # même groupe : le groupe suit les nouvelles données via `Individual.data` ;
+            # le retirer puis le remettre recréerait un groupe dont il est le seul membre
+            regroup = target.groupe != fresh.groupe
+            if regroup:
+                self._group_remove(target)
+            self._by_key.pop((target.nom, target.prenom), None)
+            target.nom, target.prenom, target.groupe = fresh.nom, fresh.prenom, fresh.groupe
+            target.data, target.scores = fresh.data, fresh.scores
+        self._by_key[key] = target
+        if regroup:
+            self._group_add(target)
+        touched.add(target.groupe)
+        self.matrix.set_row(target)
+        if self._search_index is not None:
+            self._search_index.add(self._uids[target], target.nom, target.prenom, target.groupe)
+        return target, {g for g in touched if g}, removed
+
+    def delete(self, individual: Individual):
+        """Supprime un individu de la source chargée (SQLite, students.json ou, à défaut, Bd.csv)
+        et le retire de la mémoire.
+
+        Returns:
+            Les noms des groupes touchés.
+
+        Raises:
+            OSError: Si la suppression n'a pas pu être enregistrée (l'individu reste en mémoire).
+        """
+        if USE_SQLITE or DataManager.has_students():
+            if not DataManager.delete_student(individual.nom, individual.prenom):
+                raise OSError(f"suppression de {individual.prenom} {individual.nom} non enregistrée")
+        else:
+            # données du seul Bd.csv : un enregistrement au journal créerait students.json
+            # et masquerait le CSV au chargement suivant
+            DataManager.delete_individual(individual.nom, individual.prenom)
+        self._remove(individual)
+        return {individual.groupe} if individual.groupe else set()
+
+    def _remove(self, individual: Individual):
+        """Retire un individu des listes, de l'index, de son groupe et de la matrice.
+
+        La position dans `self.individuals` est trouvée par dichotomie sur l'identifiant
+        (O(log n)) ; seul le décalage de la fin de la liste (`del`, copie mémoire) reste linéaire.
+        """
+        position = bisect_left(self.individuals, self._uids[individual], key=self._uids.__getitem__)
+        del self.individuals[position]
+        if self._by_key.get((individual.nom, individual.prenom)) is individual:
+            del self._by_key[(individual.nom, individual.prenom)]
+        self._group_remove(individual)
+        self.matrix.remove_row(individual)
+        uid = self._uids.pop(individual, None)
+        if uid is not None:
+            del self._by_uid[uid]
+            if self._search_index is not None:
+                self._search_index.remove(uid)
+
+    def _group_add(self, individual: Individual):
+        """Ajoute un individu à son groupe, en créant le groupe au besoin."""
+        if not individual.groupe:
+            return
+        group = self._group_index.get(individual.groupe)
+        if group is None:
+            group = Group(individual.groupe, [])
+            self._group_index[group.nom] = group
+            self._group_uids[group] = self._next_uid
+            self._next_uid += 1
+            self.groups.append(group)
+        group.add_member(individual)
+
+    def _group_remove(self, individual: Individual):
+        """Retire un individu de son groupe et supprime le groupe devenu vide."""
+        group = self._group_index.get(individual.groupe)
+        if group is None or individual not in group.members:
+            return
+        group.delete_member(individual)
+        if not group.members:
+            del self._group_index[group.nom]
+            position = bisect_left(self.groups, self._group_uids[group], key=self._group_uids.__getitem__)
+            del self.groups[position]
+            del self._group_uids[group]
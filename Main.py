@@ -1,14 +1,30 @@
 """Class principal des fenêtres d'analyse statistique."""
 
+import os
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, insort
 import numpy as np
 import matplotlib.pyplot as plt
 from abc import ABC, abstractmethod
 from typing import List
 
+# Budget (nombre de valeurs) des blocs lus pour les statistiques d'une matrice projetée
+STATS_BLOCK_VALUES = 4_000_000
+# Nombre d'intervalles de l'histogramme utilisé pour localiser un quantile par passes successives
+QUANTILE_BINS = 4096
+# Au-delà de ce nombre de notes, les quartiles nationaux viennent d'une esquisse KLL
+QUANTILE_EXACT_LIMIT = 2_000_000
+# Précision de l'esquisse : erreur de rang d'au plus 3.3 / k (0,33 % pour k = 1000)
+QUANTILE_SKETCH_K = 1000
+
 #Classes d'entités analysables
 class Entity(ABC):
     """Classe abstraite représentant une entité analysable."""
 
+    __slots__ = ('nom',)
+
     def __init__(self, nom: str, ):
         """Initialise l'entité avec un nom.
 
@@ -25,7 +41,18 @@ class Entity(ABC):
 
 # Classe représentant une entrée individuelle
 class Individual(Entity):
-    """Classe représentant une entrée individuelle."""
+    """Classe représentant une entrée individuelle.
+
+    Représentation compacte : attributs en `__slots__`, données dans un `array('d')`
+    (ou une vue NumPy sur une matrice projetée), prénom et groupe internalisés. Le
+    dictionnaire `scores` n'est conservé que s'il diffère des données ; sinon il est
+    reconstruit à la demande depuis un tuple de noms de notes partagé entre individus.
+    """
+
+    __slots__ = ('prenom', 'groupe', '_data', '_scores', '_group')
+
+    # tuples de noms de notes partagés : un seul exemplaire par liste de notes
+    _note_names = {}
 
     def __init__(self, nom: str, prenom: str, groupe: str, data: List[float], scores: dict = None):
         """Initialise l'entrée individuelle avec des données.
@@ -34,23 +61,96 @@ class Individual(Entity):
             nom (str): Le nom de l'entrée.
             prénom (str): Le prénom de l'entrée.
             data (List[float]): Les données associées à l'entrée.
-            scores (dict): dictionnaire note_name -> valeur (optionnel)
+            scores (dict): dictionnaire note_name -> valeur (optionnel), ou tuple des
+                noms des notes lorsque les valeurs sont celles de `data`, dans l'ordre
             data (List[float]): Les données associées à l'entrée.
         """
         super().__init__(nom)
+        # groupe notifié des modifications des données (voir `Group`)
+        self._group = None
+        self._scores = None
         self.data = data
-        self.prenom = prenom
+        # prénoms et groupes se répètent : un seul exemplaire de chaque chaîne
+        self.prenom = sys.intern(prenom) if type(prenom) is str else prenom
         # optional per-note scores mapping
-        self.scores = scores or {}
-        self.groupe = groupe
+        self.scores = scores
+        self.groupe = sys.intern(groupe) if type(groupe) is str else groupe
+
+    @property
+    def data(self):
+        """Les données de l'entrée (`array('d')`, ou vue NumPy en stockage projeté)."""
+        return self._data
+
+    @data.setter
+    def data(self, values):
+        if not isinstance(values, (array, np.ndarray)):
+            values = array('d', values)
+        if type(self._scores) is tuple and self._data.tolist() != values.tolist():
+            self._detach_scores()
+        if self._group is not None:
+            self._group._replace_values(self._data, values)
+        self._data = values
+
+    def _detach_scores(self):
+        """Remplace les noms partagés par un dictionnaire propre avant une modification des données.
+
+        Sans cela, `scores` (reconstruit depuis les données) suivrait les données modifiées
+        et associerait les noms aux mauvaises valeurs.
+        """
+        if type(self._scores) is tuple:
+            self._scores = dict(zip(self._scores, self._data.tolist()))
+
+    @property
+    def scores(self) -> dict:
+        """Dictionnaire note_name -> valeur (vide si l'entrée n'a pas de notes nommées)."""
+        if type(self._scores) is tuple:
+            return dict(zip(self._scores, self._data))
+        return dict(self._scores) if self._scores else {}
+
+    @property
+    def note_names(self) -> tuple:
+        """Noms des notes si `scores` suit exactement les données (dans l'ordre), sinon None."""
+        return self._scores if type(self._scores) is tuple else None
+
+    @scores.setter
+    def scores(self, scores: dict):
+        if not scores:
+            self._scores = None
+            return
+        if type(scores) is tuple:
+            self._scores = Individual._note_names.setdefault(scores, scores)
+            return
+        names = tuple(scores)
+        if len(names) == len(self._data) and list(scores.values()) == self._data.tolist():
+            # notes identiques aux données : seuls les noms (partagés) sont gardés
+            self._scores = Individual._note_names.setdefault(names, names)
+        else:
+            self._scores = dict(scores)
 
     def ajouter_donnée(self, valeur: float):
         """Ajoute une donnée à l'entrée individuelle."""
-        self.data.append(valeur)
+        if isinstance(self.data, np.ndarray):
+            # vue sur une matrice projetée : la ligne est remplacée par `ScoreMatrix.set_row`
+            self.data = np.append(self.data, valeur)
+        else:
+            self._detach_scores()
+            self.data.append(valeur)
+            if self._group is not None:
+                self._group._add_values((valeur,))
 
     def supprimer_donnée(self, valeur: float):
         """Supprime une donnée de l'entrée individuelle."""
-        self.data.remove(valeur)
+        if isinstance(self.data, np.ndarray):
+            matches = np.flatnonzero(self.data == valeur)
+            if not len(matches):
+                raise ValueError(f"{valeur} absent des données")
+            self.data = np.delete(self.data, matches[0])
+        else:
+            if valeur in self.data:
+                self._detach_scores()
+            self.data.remove(valeur)
+            if self._group is not None:
+                self._group._remove_values((valeur,))
 
     def get_data(self) -> List[float]:
         """Retourne les données associées à l'entrée individuelle."""
@@ -60,7 +160,15 @@ class Individual(Entity):
     
 # Classe représentant un groupe d'entrées
 class Group(Entity):
-    """Classe représentant un groupe d'entrées."""
+    """Classe représentant un groupe d'entrées.
+
+    Les agrégats des données des membres (effectif, moyenne et M2 de Welford, données
+    triées pour min/max/quantiles) sont construits au premier calcul, puis tenus à
+    jour en O(k) par `add_member`, `delete_member` et les modifications des données
+    d'un membre (`ajouter_donnée`, `supprimer_donnée`, affectation de `data`).
+    """
+
+    __slots__ = ('members', '_count', '_mean', '_m2', '_sorted', '_shared')
 
     def __init__(self, nom: str, members: List[Individual]):
         """Initialise le groupe avec ses membres.
@@ -72,29 +180,127 @@ class Group(Entity):
         """
         super().__init__(nom)
         self.members = members
+        # données triées (array('d')) ; None tant que les agrégats ne sont pas construits
+        self._sorted = None
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        # membres rattachés depuis à un autre groupe : leurs modifications ne sont plus
+        # notifiées ici, les agrégats sont alors recalculés à chaque lecture
+        self._shared = 0
+        for member in members:
+            self._attach(member)
 
+    def _attach(self, member: Individual):
+        """Fait de ce groupe celui que `member` notifie de ses modifications."""
+        previous = member._group
+        if previous is not None and previous is not self:
+            previous._shared += 1
+        member._group = self
 
     def add_member(self, member: Individual):
         """Ajoute un membre au groupe."""
         self.members.append(member)
+        self._attach(member)
+        self._add_values(member.get_data())
 
     def delete_member(self, member: Individual):
         """Supprime un membre du groupe. """
         self.members.remove(member)
+        if member._group is self:
+            member._group = None
+            self._remove_values(member.get_data())
+        elif self._shared:
+            self._shared -= 1
+            # modifications du membre manquées : agrégats à reconstruire
+            self._sorted = None
+
+    def _build(self):
+        """Construit les agrégats à partir des données de tous les membres."""
+        if self.members:
+            values = np.sort(np.concatenate([np.asarray(m.get_data(), dtype=float) for m in self.members]))
+        else:
+            values = np.zeros(0)
+        self._sorted = array('d', values.tobytes())
+        self._count = len(values)
+        self._mean = float(values.mean()) if len(values) else 0.0
+        self._m2 = float(((values - self._mean) ** 2).sum())
+
+    def _ready(self):
+        """Garantit des agrégats à jour."""
+        if self._sorted is None or self._shared:
+            self._build()
+
+    def _add_values(self, values):
+        """Intègre des données aux agrégats (s'ils sont construits)."""
+        if self._sorted is None:
+            return
+        for x in values:
+            x = float(x)
+            self._count += 1
+            delta = x - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (x - self._mean)
+            insort(self._sorted, x)
+
+    def _remove_values(self, values):
+        """Retire des données des agrégats (s'ils sont construits)."""
+        if self._sorted is None:
+            return
+        for x in values:
+            x = float(x)
+            del self._sorted[bisect_left(self._sorted, x)]
+            self._count -= 1
+            if self._count == 1:
+                # une seule donnée restante : valeurs exactes, sans dérive d'arrondi
+                self._mean, self._m2 = self._sorted[0], 0.0
+                continue
+            if not self._count:
+                self._mean = self._m2 = 0.0
+                continue
+            delta = x - self._mean
+            self._mean -= delta / self._count
+            self._m2 = max(0.0, self._m2 - delta * (x - self._mean))
+
+    def _replace_values(self, old, new):
+        """Remplace dans les agrégats les données `old` d'un membre par `new`."""
+        if self._sorted is None or old.tolist() == list(new):
+            return
+        self._remove_values(old)
+        self._add_values(new)
+
+    def quantile(self, q: float) -> float:
+        """Quantile `q` (0 à 1) des données agrégées, interpolé comme `np.percentile` (0.0 sans donnée)."""
+        self._ready()
+        if not self._count:
+            return 0.0
+        pos = (self._count - 1) * q
+        lo = int(pos)
+        hi = min(lo + 1, self._count - 1)
+        return self._sorted[lo] + (self._sorted[hi] - self._sorted[lo]) * (pos - lo)
 
     def moyenne(self) -> float:
         """Calcule la moyenne des données agrégées des membres du groupe."""
-        all_data = self.get_data()
-        if all_data:
-            return sum(all_data) / len(all_data)
-        return 0.0
-    
+        self._ready()
+        return self._mean if self._count else 0.0
+
     def mediane(self) -> float:
         """Calcule la médiane des données agrégées des membres du groupe."""
-        all_data = self.get_data()
-        if all_data:
-            return np.median(all_data)
-        return 0.0
+        return self.quantile(0.5)
+
+    def ecart_type(self) -> float:
+        """Calcule l'écart-type (population) des données agrégées des membres du groupe."""
+        self._ready()
+        return float(np.sqrt(self._m2 / self._count)) if self._count else 0.0
+
+    def statistiques(self) -> dict:
+        """Statistiques des données agrégées (mêmes clés que `ScoreMatrix.national_stats`), ou None sans donnée."""
+        self._ready()
+        if not self._count:
+            return None
+        return {'mean': self._mean, 'median': self.quantile(0.5), 'std': self.ecart_type(),
+                'min': self._sorted[0], 'max': self._sorted[-1],
+                'q1': self.quantile(0.25), 'q3': self.quantile(0.75), 'count': self._count}
 
     def get_data(self) -> List[float]:
         """Retourne les données agrégées des membres du groupe."""
@@ -104,6 +310,1137 @@ class Group(Entity):
         return all_data
 
 
+def stack_data(rows, width: int) -> np.ndarray:
+    """Empile des données de même longueur `width` en un tableau float64 (lignes × width).
+
+    Les `array('d')` sont concaténés octet à octet, sans conversion élément par élément.
+    """
+    if all(type(r) is array for r in rows):
+        return np.frombuffer(b''.join(rows), dtype=np.float64).reshape(len(rows), width)
+    return np.array(rows, dtype=float).reshape(len(rows), width)
+
+
+def sort_ranks(*keys) -> np.ndarray:
+    """Rang de chaque élément dans l'ordre croissant de `keys` (la première clé prime,
+    les suivantes départagent les égalités ; tri stable, NaN en dernier).
+
+    `sorted_by_rank` réordonne ensuite n'importe quel sous-ensemble en O(m log m)
+    sans comparer de nouveau les clés.
+    """
+    order = np.lexsort(tuple(np.asarray(k) for k in reversed(keys)))
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return ranks
+
+
+def sorted_by_rank(items: list, positions: np.ndarray, ranks: np.ndarray, reverse: bool = False) -> list:
+    """Retourne `items` trié selon `ranks[positions]`, `positions` donnant l'indice de chaque élément."""
+    order = np.argsort(ranks[positions], kind='stable')
+    if reverse:
+        order = order[::-1]
+    return [items[i] for i in order.tolist()]
+
+
+def sorted_position(items: list, key, value, reverse: bool = False) -> int:
+    """Position d'insertion de la clé `value` dans `items` trié par `key` (décroissant si `reverse`).
+
+    Recherche dichotomique : `key` n'est appelée que O(log n) fois.
+    """
+    lo, hi = 0, len(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        current = key(items[mid])
+        if (current > value) if reverse else (current < value):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def locate(items: list, item, key, reverse: bool = False) -> int:
+    """Position de `item` dans `items` trié par `key` à clés uniques, ou -1 s'il n'y figure pas (O(log n))."""
+    position = sorted_position(items, key, key(item), reverse)
+    return position if position < len(items) and items[position] is item else -1
+
+
+def describe(values) -> dict:
+    """Statistiques descriptives de `values` calculées sur un seul tri (NaN ignorés).
+
+    Retourne {'mean', 'median', 'std', 'min', 'max', 'q1', 'q3', 'count'}, quantiles
+    interpolés comme `np.percentile`, ou None s'il n'y a aucune valeur.
+    """
+    ordered = np.asarray(values, dtype=np.float64).ravel()
+    ordered = np.sort(ordered[~np.isnan(ordered)])
+    n = len(ordered)
+    if not n:
+        return None
+    mean = float(ordered.mean())
+
+    def quantile(q):
+        pos = (n - 1) * q
+        lo = int(pos)
+        hi = min(lo + 1, n - 1)
+        return float(ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo))
+
+    return {'mean': mean, 'median': quantile(0.5), 'std': float(np.sqrt(((ordered - mean) ** 2).mean())),
+            'min': float(ordered[0]), 'max': float(ordered[-1]),
+            'q1': quantile(0.25), 'q3': quantile(0.75), 'count': n}
+
+
+def describe_batch(arrays) -> list:
+    """`describe` de plusieurs tableaux à la fois : un seul tri pour toutes les valeurs.
+
+    Retourne une liste alignée sur `arrays` (None pour un tableau sans valeur).
+    """
+    arrays = [np.asarray(a, dtype=np.float64).ravel() for a in arrays]
+    if not arrays:
+        return []
+    values = np.concatenate(arrays)
+    codes = np.repeat(np.arange(len(arrays)), [len(a) for a in arrays])
+    present = ~np.isnan(values)
+    stats = _segment_stats(values[present], codes[present], len(arrays))
+    return [{k: (int(v[i]) if k == 'count' else float(v[i])) for k, v in stats.items()} if stats['count'][i] else None
+            for i in range(len(arrays))]
+
+
+def _segment_stats(values: np.ndarray, codes: np.ndarray, nb_codes: int) -> dict:
+    """Statistiques descriptives de `values` par segment de code, en une passe vectorisée.
+
+    Les valeurs sont triées par valeur, puis par code avec un tri stable (les valeurs
+    restent exactes, sans clé composite flottante), puis les quantiles sont lus dans chaque segment par
+    interpolation linéaire (comme `np.percentile`). Sommes et écarts-types sont
+    calculés sur les valeurs d'origine avec `np.bincount`.
+    Retourne un dictionnaire de tableaux de taille `nb_codes` (NaN pour un code sans valeur).
+    """
+    counts = np.bincount(codes, minlength=nb_codes)
+    stats = {k: np.full(nb_codes, np.nan) for k in ('mean', 'median', 'std', 'min', 'max', 'q1', 'q3')}
+    stats['count'] = counts
+    present = np.flatnonzero(counts)
+    if not len(present):
+        return stats
+
+    n = counts[present]
+    means = np.bincount(codes, weights=values, minlength=nb_codes)[present] / n
+    stats['mean'][present] = means
+    full_means = np.zeros(nb_codes)
+    full_means[present] = means
+    sq = np.bincount(codes, weights=(values - full_means[codes]) ** 2, minlength=nb_codes)[present]
+    stats['std'][present] = np.sqrt(sq / n)
+
+    # Tri unique : les segments d'un même code sont contigus et triés par valeur
+    order = np.argsort(values)
+    # codes dans le plus petit entier non signé : tri stable par base (radix) de NumPy
+    by_code = codes[order].astype(np.min_scalar_type(nb_codes), copy=False)
+    v = values[order[np.argsort(by_code, kind='stable')]]
+    starts = (np.cumsum(counts) - counts)[present]
+    stats['min'][present] = v[starts]
+    stats['max'][present] = v[starts + n - 1]
+    for key, q in (('q1', 0.25), ('median', 0.5), ('q3', 0.75)):
+        pos = (n - 1) * q
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        stats[key][present] = v[starts + lo] + (v[starts + hi] - v[starts + lo]) * (pos - lo)
+    return stats
+
+
+def _select_ranks(blocks, ranks, low: float, high: float, budget: int = STATS_BLOCK_VALUES) -> dict:
+    """Valeurs de rangs donnés (0 = plus petite) d'un flux de valeurs, en mémoire bornée.
+
+    Chaque passe sur `blocks()` (itérateur de tableaux à plat) compte les valeurs de
+    l'intervalle encore possible de chaque rang dans un histogramme de `QUANTILE_BINS`
+    cases, puis réduit l'intervalle à la case contenant le rang. Les rangs partageant
+    un intervalle partagent son histogramme ; les valeurs d'un intervalle sont gardées
+    tant qu'elles tiennent dans `budget`, les rangs y sont alors lus par `np.partition`.
+    """
+    # intervalle (borne basse, borne haute, borne haute incluse, valeurs sous la borne basse) -> rangs
+    pending = {(low, high, True, 0): set(ranks)}
+    result = {}
+    while pending:
+        state = {}
+        for interval in pending:
+            a, b = interval[:2]
+            state[interval] = {'count': 0, 'min': np.inf, 'max': -np.inf, 'kept': [],
+                               'hist': np.zeros(QUANTILE_BINS, dtype=np.int64),
+                               'edges': np.linspace(a, b, QUANTILE_BINS + 1)}
+        for values in blocks():
+            for (a, b, closed, _), st in state.items():
+                inside = values[(values >= a) & ((values <= b) if closed else (values < b))]
+                if not inside.size:
+                    continue
+                st['count'] += inside.size
+                st['min'] = min(st['min'], inside.min())
+                st['max'] = max(st['max'], inside.max())
+                bins = np.clip(np.searchsorted(st['edges'], inside, side='right') - 1, 0, QUANTILE_BINS - 1)
+                st['hist'] += np.bincount(bins, minlength=QUANTILE_BINS)
+                if st['kept'] is not None:
+                    st['kept'].append(inside)
+                    if st['count'] > budget:
+                        st['kept'] = None
+
+        narrowed = {}
+        for interval, targets in pending.items():
+            _, _, closed, below = interval
+            st = state[interval]
+            if st['min'] == st['max']:
+                result.update((r, float(st['min'])) for r in targets)
+            elif st['kept'] is not None:
+                kept = np.concatenate(st['kept'])
+                local = sorted(r - below for r in targets)
+                kept.partition(local)
+                result.update((r, float(kept[r - below])) for r in targets)
+            else:
+                cumulative = np.cumsum(st['hist'])
+                edges = st['edges']
+                for r in targets:
+                    j = int(np.searchsorted(cumulative, r - below, side='right'))
+                    key = (edges[j], edges[j + 1], closed and j == QUANTILE_BINS - 1,
+                           below + int(cumulative[j] - st['hist'][j]))
+                    narrowed.setdefault(key, set()).add(r)
+        pending = narrowed
+    return result
+
+
+def _stream_moments(blocks, budget: int = 0):
+    """Effectif, moyenne, écart-type, min et max d'un flux de valeurs, sans tri.
+
+    Moyenne et écart-type sont fusionnés bloc par bloc (formule de Chan). Les blocs
+    sont aussi gardés tant que leur total ne dépasse pas `budget`.
+
+    Returns:
+        Tuple (statistiques ou None s'il n'y a aucune valeur, blocs gardés ou None).
+    """
+    count, mean, m2 = 0, 0.0, 0.0
+    low, high = np.inf, -np.inf
+    kept = []
+    for values in blocks():
+        if not values.size:
+            continue
+        n = values.size
+        block_mean = float(values.mean())
+        block_m2 = float(((values - block_mean) ** 2).sum())
+        delta = block_mean - mean
+        total = count + n
+        mean += delta * n / total
+        m2 += block_m2 + delta * delta * count * n / total
+        count = total
+        low, high = min(low, float(values.min())), max(high, float(values.max()))
+        if kept is not None:
+            kept.append(values)
+            if count > budget:
+                kept = None
+    if not count:
+        return None, None
+    return {'mean': mean, 'std': float(np.sqrt(m2 / count)), 'min': low, 'max': high, 'count': count}, kept
+
+
+def _stream_stats(blocks, budget: int = STATS_BLOCK_VALUES) -> dict:
+    """Statistiques descriptives d'un flux de valeurs (`blocks()` itère des tableaux à plat).
+
+    Si toutes les valeurs tiennent dans `budget`, les quartiles sont calculés
+    directement ; sinon ils sont obtenus par `_select_ranks`, et la mémoire utilisée
+    ne dépend que de la taille des blocs. Retourne None s'il n'y a aucune valeur.
+    """
+    stats, kept = _stream_moments(blocks, budget)
+    if stats is None:
+        return None
+    quartiles = (('q1', 0.25), ('median', 0.5), ('q3', 0.75))
+    if kept is not None:
+        values = np.percentile(np.concatenate(kept), [q * 100 for _, q in quartiles])
+        stats.update((key, float(v)) for (key, _), v in zip(quartiles, values))
+        return stats
+
+    count = stats['count']
+    positions = {key: (count - 1) * q for key, q in quartiles}
+    ranks = {int(np.floor(p)) for p in positions.values()} | {int(np.ceil(p)) for p in positions.values()}
+    values_at = _select_ranks(blocks, ranks, stats['min'], stats['max'], budget)
+    for key, pos in positions.items():
+        lo, hi = values_at[int(np.floor(pos))], values_at[int(np.ceil(pos))]
+        stats[key] = lo + (hi - lo) * (pos - np.floor(pos))
+    return stats
+
+
+class QuantileSketch:
+    """Esquisse de quantiles fusionnable (KLL), construite en une passe sur un flux de valeurs.
+
+    Tant que le nombre de valeurs reste sous `exact_limit`, toutes sont gardées et les
+    quantiles sont exacts (interpolés comme `np.percentile`). Au-delà, les valeurs sont
+    réparties en niveaux : un niveau trop plein est trié puis une valeur sur deux
+    (décalage aléatoire) monte au niveau suivant, où elle compte double. La mémoire
+    est alors de l'ordre de 3k valeurs ; l'erreur de rang est d'environ 0.8 / k en
+    moyenne et reste sous 3.3 / k avec une forte probabilité (borne usuelle de KLL).
+
+    Les valeurs retirées (`remove`) sont comptées dans une seconde esquisse, de poids
+    négatif lors des requêtes ; `needs_rebuild` signale quand elles deviennent trop
+    nombreuses pour garder la précision.
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, exact_limit: int = QUANTILE_EXACT_LIMIT, seed=None):
+        """Initialise une esquisse vide.
+
+        Args:
+            k (int): Taille du niveau le plus haut (précision de l'esquisse).
+            exact_limit (int): Nombre de valeurs gardées telles quelles avant compaction.
+            seed: Graine du tirage des décalages de compaction.
+        """
+        self.k = k
+        self.exact_limit = exact_limit
+        self._rng = np.random.default_rng(seed)
+        # niveau h : valeurs de poids 2**h ; le niveau 0 n'est pas compacté en mode exact
+        self._levels = [[]]
+        self._exact = True
+        self._added = 0
+        self._removed = None
+
+    @property
+    def count(self) -> int:
+        """Nombre de valeurs ajoutées moins le nombre de valeurs retirées."""
+        return self._added - (self._removed._added if self._removed is not None else 0)
+
+    @property
+    def exact(self) -> bool:
+        """Indique si les quantiles sont exacts (aucune compaction n'a eu lieu)."""
+        return self._exact and (self._removed is None or self._removed._exact)
+
+    def needs_rebuild(self) -> bool:
+        """Indique si les retraits dépassent la moitié des ajouts (esquisse à reconstruire)."""
+        return not self.exact and self._removed is not None and 2 * self._removed._added > self._added
+
+    def update(self, values):
+        """Ajoute des valeurs (tableau de forme quelconque, NaN ignorés)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self._added += values.size
+        self._levels[0].append(values)
+        if self._exact and self._added <= self.exact_limit:
+            return
+        self._exact = False
+        self._compress()
+
+    def remove(self, values):
+        """Retire des valeurs précédemment ajoutées."""
+        if self._removed is None:
+            self._removed = QuantileSketch(self.k, self.exact_limit, self._rng.integers(1 << 32))
+        self._removed.update(values)
+
+    def merge(self, other: 'QuantileSketch'):
+        """Intègre les valeurs (et les retraits) d'une autre esquisse."""
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for level, chunks in zip(self._levels, other._levels):
+            level.extend(chunks)
+        self._added += other._added
+        if other._removed is not None:
+            if self._removed is None:
+                self._removed = QuantileSketch(self.k, self.exact_limit, self._rng.integers(1 << 32))
+            self._removed.merge(other._removed)
+        if not other._exact or self._added > self.exact_limit:
+            self._exact = False
+            self._compress()
+
+    def _capacity(self, level: int) -> int:
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self._levels) - level - 1))))
+
+    def _compress(self):
+        """Compacte les niveaux qui dépassent leur capacité."""
+        h = 0
+        while h < len(self._levels):
+            level = np.concatenate(self._levels[h]) if self._levels[h] else np.zeros(0)
+            if len(level) <= self._capacity(h):
+                self._levels[h] = [level] if len(level) else []
+                h += 1
+                continue
+            level.sort()
+            # une valeur reste au niveau h si leur nombre est impair
+            rest = level[-1:] if len(level) % 2 else level[:0]
+            promoted = level[self._rng.integers(2):len(level) - len(rest):2]
+            self._levels[h] = [rest] if len(rest) else []
+            if h + 1 == len(self._levels):
+                self._levels.append([])
+            self._levels[h + 1].append(promoted)
+            h += 1
+
+    def _weighted(self):
+        """Valeurs de l'esquisse et leur poids (2**niveau)."""
+        values = [np.concatenate(chunks) for chunks in self._levels if chunks]
+        weights = [np.full(sum(len(c) for c in chunks), float(2 ** h)) for h, chunks in enumerate(self._levels) if chunks]
+        if not values:
+            return np.zeros(0), np.zeros(0)
+        return np.concatenate(values), np.concatenate(weights)
+
+    def quantiles(self, qs) -> list:
+        """Quantiles `qs` (0 à 1) des valeurs ajoutées et non retirées (liste vide sans valeur)."""
+        if self.count <= 0:
+            return []
+        values, weights = self._weighted()
+        if self._removed is not None:
+            removed, removed_weights = self._removed._weighted()
+        else:
+            removed, removed_weights = np.zeros(0), np.zeros(0)
+
+        if self.exact:
+            values.sort()
+            if removed.size:
+                # retrait exact du multi-ensemble : i-ème occurrence d'une valeur -> i-ème position
+                removed.sort()
+                occurrence = np.arange(removed.size) - np.searchsorted(removed, removed, side='left')
+                values = np.delete(values, np.searchsorted(values, removed, side='left') + occurrence)
+            return [float(v) for v in np.percentile(values, [q * 100 for q in qs])]
+
+        values = np.concatenate((values, removed))
+        weights = np.concatenate((weights, -removed_weights))
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        # rang cumulé (rendu croissant : les poids négatifs peuvent le faire reculer)
+        ranks = np.maximum.accumulate(np.cumsum(weights[order]))
+        total = ranks[-1]
+        positions = np.searchsorted(ranks, [q * total for q in qs], side='left')
+        return [float(values[min(i, len(values) - 1)]) for i in positions]
+
+    def quantile(self, q: float) -> float:
+        """Quantile `q` (0 à 1), ou None sans valeur."""
+        result = self.quantiles([q])
+        return result[0] if result else None
+
+
+class RankIndex:
+    """Index de rangs : valeurs triées par clé, avec l'individu de chaque valeur.
+
+    Clés : `'national'` et `('group', nom)` pour la moyenne de chaque individu,
+    `('note', j)` pour sa note de la colonne j. Rang, centile et voisins se lisent par
+    `np.searchsorted` en O(log n) ; ajouter ou retirer un individu insère ou supprime
+    ses valeurs dans les tableaux triés (copie mémoire, sans nouveau tri).
+    """
+
+    def __init__(self):
+        """Initialise un index vide (voir `build`)."""
+        self._values = {}
+        self._owners = {}
+
+    @staticmethod
+    def _entries(row: np.ndarray, groupe: str) -> list:
+        """Couples (clé, valeur) d'un individu à partir de sa ligne de notes."""
+        present = ~np.isnan(row)
+        count = int(present.sum())
+        if not count:
+            return []
+        mean = float(row[present].sum() / count)
+        entries = [('national', mean)]
+        if groupe:
+            entries.append((('group', groupe), mean))
+        entries.extend((('note', int(j)), float(row[j])) for j in np.flatnonzero(present))
+        return entries
+
+    @classmethod
+    def build(cls, scores: np.ndarray, codes: np.ndarray, group_names: list, individuals: list) -> 'RankIndex':
+        """Construit l'index d'une matrice de notes (un tri par clé, vectorisé)."""
+        index = cls()
+        owners = np.empty(len(individuals), dtype=object)
+        owners[:] = individuals
+        present = ~np.isnan(scores)
+        counts = present.sum(axis=1)
+        rated = np.flatnonzero(counts)
+        means = np.where(present[rated], scores[rated], 0.0).sum(axis=1) / counts[rated]
+
+        rated_owners, rated_codes = owners[rated], codes[rated]
+
+        order = np.argsort(means, kind='stable')
+        index._values['national'] = means[order]
+        index._owners['national'] = rated_owners[order]
+
+        # tri par (groupe, moyenne) : chaque groupe est un segment contigu et trié
+        order = np.lexsort((means, rated_codes))
+        sorted_means, sorted_owners, sorted_codes = means[order], rated_owners[order], rated_codes[order]
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(sorted_codes)) + 1, [len(order)]))
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            if hi > lo and group_names[sorted_codes[lo]]:
+                key = ('group', group_names[sorted_codes[lo]])
+                index._values[key] = sorted_means[lo:hi]
+                index._owners[key] = sorted_owners[lo:hi]
+
+        for j in range(scores.shape[1]):
+            rows = np.flatnonzero(present[:, j])
+            order = np.argsort(scores[rows, j], kind='stable')
+            index._values[('note', j)] = scores[rows, j][order]
+            index._owners[('note', j)] = owners[rows][order]
+        return index
+
+    def add(self, individual: Individual, row: np.ndarray, groupe: str):
+        """Insère les valeurs d'un individu (ligne `row` de la matrice)."""
+        for key, value in self._entries(row, groupe):
+            values = self._values.get(key, np.zeros(0))
+            owners = self._owners.get(key, np.empty(0, dtype=object))
+            i = int(np.searchsorted(values, value, side='right'))
+            self._values[key] = np.insert(values, i, value)
+            inserted = np.empty(len(owners) + 1, dtype=object)
+            inserted[:i], inserted[i], inserted[i + 1:] = owners[:i], individual, owners[i:]
+            self._owners[key] = inserted
+
+    def remove(self, individual: Individual, row: np.ndarray, groupe: str):
+        """Retire les valeurs d'un individu, calculées depuis sa ligne avant modification."""
+        for key, value in self._entries(row, groupe):
+            values = self._values.get(key)
+            if values is None:
+                continue
+            # tolérance : la moyenne de construction (vectorisée) peut différer au dernier bit
+            tolerance = 1e-9 * max(1.0, abs(value))
+            lo = int(np.searchsorted(values, value - tolerance, side='left'))
+            hi = int(np.searchsorted(values, value + tolerance, side='right'))
+            owners = self._owners[key]
+            for i in range(lo, hi):
+                if owners[i] is individual:
+                    self._values[key] = np.delete(values, i)
+                    self._owners[key] = np.delete(owners, i)
+                    break
+
+    def rank(self, key, value: float):
+        """Position de `value` parmi les valeurs de `key` (1 = la plus haute) et leur nombre, ou None."""
+        values = self._values.get(key)
+        if values is None or not len(values):
+            return None
+        above = len(values) - int(np.searchsorted(values, value, side='right'))
+        return above + 1, len(values)
+
+    def percentile(self, key, value: float):
+        """Pourcentage des valeurs de `key` strictement inférieures à `value`, ou None."""
+        values = self._values.get(key)
+        if values is None or not len(values):
+            return None
+        return 100.0 * int(np.searchsorted(values, value, side='left')) / len(values)
+
+    def neighbours(self, key, value: float, k: int = 2) -> list:
+        """Jusqu'à `k` couples (individu, valeur) de part et d'autre de `value`, par valeur croissante."""
+        values = self._values.get(key)
+        if values is None:
+            return []
+        i = int(np.searchsorted(values, value, side='left'))
+        lo, hi = max(0, i - k), min(len(values), i + k + 1)
+        return list(zip(self._owners[key][lo:hi], values[lo:hi].tolist()))
+
+
+class ScoreMatrix:
+    """Stockage colonnaire des notes : une ligne par individu, une colonne par note.
+
+    `scores` est un tableau float64 (individus × notes) complété par NaN pour les
+    individus ayant moins de notes ; `group_codes` associe chaque ligne à
+    `group_names[code]`. Les lignes peuvent être ajoutées, modifiées ou retirées une
+    à une (`set_row` / `remove_row`) sans reconstruire la matrice.
+
+    Avec `directory`, les notes sont stockées dans un fichier de ce dossier projeté
+    en mémoire (`numpy.memmap`) : `get_data()` de chaque individu devient une vue
+    sur sa ligne et les statistiques sont calculées par blocs, en mémoire bornée.
+    """
+
+    def __init__(self, individuals: List[Individual], directory: str = None, dtype=np.float64):
+        """Construit la matrice à partir d'une liste d'individus.
+
+        Args:
+            individuals (List[Individual]): Les individus, dans l'ordre des lignes.
+            directory (str): Dossier du fichier projeté (None : notes en mémoire).
+            dtype: Type des notes dans le fichier projeté (float32 ou float64).
+        """
+        self.individuals = []
+        self._rows = {}
+        self.directory = directory
+        self.path = None
+        self.dtype = np.dtype(dtype) if directory else np.dtype(np.float64)
+        self._scores = self._allocate(0, 0)
+        self._lengths = np.zeros(0, dtype=np.int32)
+        self._codes = np.zeros(0, dtype=np.int64)
+        self.group_names = []
+        self._group_index = {}
+        # esquisse des quantiles nationaux, construite à la première requête puis tenue à jour
+        self._sketch = None
+        # index des rangs, construit à la première requête puis tenu à jour
+        self._ranks = None
+        self.append_rows(individuals)
+
+    def __len__(self) -> int:
+        return len(self.individuals)
+
+    @property
+    def scores(self) -> np.ndarray:
+        """Notes des lignes utilisées (vue, sans la capacité de réserve)."""
+        return self._scores[:len(self.individuals)]
+
+    @property
+    def group_codes(self) -> np.ndarray:
+        """Code de groupe de chaque ligne utilisée."""
+        return self._codes[:len(self.individuals)]
+
+    def _group_code(self, nom: str) -> int:
+        """Retourne le code du groupe `nom`, en l'ajoutant au besoin."""
+        code = self._group_index.get(nom)
+        if code is None:
+            code = len(self.group_names)
+            self.group_names.append(nom)
+            self._group_index[nom] = code
+        return code
+
+    def _allocate(self, rows: int, width: int, source: np.ndarray = None) -> np.ndarray:
+        """Crée un tampon de notes (rows × width) rempli de NaN, en y recopiant `source`.
+
+        En mode projeté, le tampon est un `np.memmap` sur un nouveau fichier de
+        `directory`, la recopie se fait par blocs et l'ancien fichier est supprimé.
+        """
+        if self.directory is None:
+            buffer = np.full((rows, width), np.nan)
+            if source is not None:
+                buffer[:source.shape[0], :source.shape[1]] = source
+            return buffer
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix='.map', dir=self.directory)
+        os.close(fd)
+        # un fichier projeté ne peut pas être vide
+        buffer = np.memmap(path, dtype=self.dtype, mode='w+', shape=(max(rows, 1), max(width, 1)))
+        step = max(1, STATS_BLOCK_VALUES // max(width, 1))
+        for start in range(0, max(rows, 1), step):
+            buffer[start:start + step] = np.nan
+        if source is not None:
+            for start in range(0, source.shape[0], step):
+                chunk = source[start:start + step]
+                buffer[start:start + len(chunk), :source.shape[1]] = chunk
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                # fichier encore projeté (Windows) : supprimé au prochain `clear_directory`
+                pass
+        self.path = path
+        return buffer[:rows, :width]
+
+    @staticmethod
+    def clear_directory(directory: str):
+        """Supprime les fichiers projetés laissés dans `directory` par des matrices précédentes."""
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            if name.endswith('.map'):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def _reserve(self, rows: int, width: int):
+        """Garantit la place pour `rows` lignes et `width` colonnes (capacité doublée au besoin)."""
+        capacity, current_width = self._scores.shape
+        if width <= current_width and rows <= capacity:
+            return
+        if rows > capacity:
+            capacity = max(16, 2 * capacity, rows)
+            grown = capacity - len(self._codes)
+            self._codes = np.concatenate((self._codes, np.zeros(grown, dtype=np.int64)))
+            self._lengths = np.concatenate((self._lengths, np.zeros(grown, dtype=np.int32)))
+        self._scores = self._allocate(capacity, max(width, current_width), self._scores)
+        if self.directory is not None:
+            # les vues des individus désignaient l'ancien fichier
+            for row, ind in enumerate(self.individuals):
+                self._bind(ind, row)
+
+    def _bind(self, individual: Individual, row: int):
+        """En mode projeté, fait des données de l'individu une vue sur sa ligne du fichier."""
+        if self.directory is not None:
+            individual.data = self._scores[row, :self._lengths[row]]
+
+    def append_rows(self, individuals: List[Individual]):
+        """Ajoute en bloc les lignes d'individus absents de la matrice."""
+        rows = [ind.get_data() for ind in individuals]
+        if not rows:
+            return
+        start = len(self.individuals)
+        end = start + len(rows)
+        width = max(len(r) for r in rows)
+        self._reserve(end, width)
+        if all(len(r) == width for r in rows):
+            self._scores[start:end, :width] = stack_data(rows, width)
+        else:
+            for i, r in enumerate(rows, start=start):
+                self._scores[i, :len(r)] = r
+        self._lengths[start:end] = [len(r) for r in rows]
+        self._codes[start:end] = [self._group_code(ind.groupe) for ind in individuals]
+        if self._sketch is not None:
+            self._sketch.update(self._scores[start:end])
+        if self._ranks is not None:
+            for i, ind in enumerate(individuals, start=start):
+                self._ranks.add(ind, np.asarray(self._scores[i], dtype=np.float64), ind.groupe)
+        for i, ind in enumerate(individuals, start=start):
+            self._rows[ind] = i
+            self._bind(ind, i)
+        self.individuals.extend(individuals)
+
+    def set_row(self, individual: Individual):
+        """Ajoute ou met à jour la ligne d'un individu (coût amorti O(nombre de notes))."""
+        row = self._rows.get(individual)
+        if row is None:
+            self.append_rows([individual])
+            return
+        # copie : en mode projeté, les données peuvent être une vue sur cette même ligne
+        data = np.array(individual.get_data(), dtype=float)
+        if self._sketch is not None:
+            self._sketch.remove(self._scores[row, :self._lengths[row]])
+            self._sketch.update(data)
+        if self._ranks is not None:
+            self._ranks.remove(individual, np.asarray(self._scores[row], dtype=np.float64),
+                               self.group_names[self._codes[row]])
+        self._reserve(len(self.individuals), len(data))
+        self._scores[row] = np.nan
+        self._scores[row, :len(data)] = data
+        self._lengths[row] = len(data)
+        self._codes[row] = self._group_code(individual.groupe)
+        self._bind(individual, row)
+        if self._ranks is not None:
+            self._ranks.add(individual, np.asarray(self._scores[row], dtype=np.float64), individual.groupe)
+
+    def remove_row(self, individual: Individual):
+        """Retire la ligne d'un individu en y déplaçant la dernière ligne (O(nombre de notes))."""
+        row = self._rows.pop(individual, None)
+        if row is None:
+            return
+        if self._sketch is not None:
+            self._sketch.remove(self._scores[row, :self._lengths[row]])
+        if self._ranks is not None:
+            self._ranks.remove(individual, np.asarray(self._scores[row], dtype=np.float64),
+                               self.group_names[self._codes[row]])
+        if self.directory is not None:
+            # l'individu retiré garde une copie de ses données, sa ligne va être réutilisée
+            individual.data = np.array(individual.data)
+        last = len(self.individuals) - 1
+        if row != last:
+            moved = self.individuals[last]
+            self._scores[row] = self._scores[last]
+            self._codes[row] = self._codes[last]
+            self._lengths[row] = self._lengths[last]
+            self.individuals[row] = moved
+            self._rows[moved] = row
+            self._bind(moved, row)
+        self.individuals.pop()
+        self._scores[last] = np.nan
+        self._lengths[last] = 0
+
+    def _flat(self, rows=None):
+        """Retourne les notes présentes (des lignes `rows`, ou de toutes) et le code de groupe de chacune."""
+        scores = self.scores if rows is None else self.scores[rows]
+        codes = self.group_codes if rows is None else self.group_codes[rows]
+        mask = ~np.isnan(scores)
+        return scores[mask], np.broadcast_to(codes[:, None], scores.shape)[mask]
+
+    def values(self) -> np.ndarray:
+        """Retourne toutes les notes présentes sous forme de tableau à plat."""
+        scores = self.scores
+        return scores[~np.isnan(scores)]
+
+    def _blocks(self, rows=None):
+        """Fonction itérant les notes présentes (des lignes `rows`, ou de toutes) par blocs bornés."""
+        step = max(1, STATS_BLOCK_VALUES // max(1, self._scores.shape[1]))
+
+        def blocks():
+            total = len(self.individuals) if rows is None else len(rows)
+            for start in range(0, total, step):
+                block = self.scores[start:start + step] if rows is None else self.scores[rows[start:start + step]]
+                block = np.asarray(block, dtype=np.float64)
+                yield block[~np.isnan(block)]
+        return blocks
+
+    def quantile_sketch(self) -> QuantileSketch:
+        """Esquisse des quantiles de toutes les notes : une passe par blocs, puis mise à jour à chaque écriture."""
+        if self._sketch is None or self._sketch.needs_rebuild():
+            sketch = QuantileSketch()
+            for values in self._blocks()():
+                sketch.update(values)
+            self._sketch = sketch
+        return self._sketch
+
+    def rank_index(self) -> RankIndex:
+        """Index des rangs (moyennes nationales, par groupe et notes), construit à la première requête."""
+        if self._ranks is None:
+            scores = np.asarray(self.scores, dtype=np.float64)
+            self._ranks = RankIndex.build(scores, self.group_codes, self.group_names, self.individuals)
+        return self._ranks
+
+    def standing(self, individual: Individual) -> dict:
+        """Classement d'un individu : moyenne, rangs national et dans son groupe, rang de chaque note.
+
+        Returns:
+            {'mean', 'national': (rang, total), 'group': (rang, total) ou None,
+            'notes': [(rang, total) ou None par colonne]}, ou None sans note.
+        """
+        row = self._rows.get(individual)
+        if row is None:
+            return None
+        index = self.rank_index()
+        values = np.asarray(self._scores[row], dtype=np.float64)
+        entries = dict(index._entries(values, individual.groupe))
+        if 'national' not in entries:
+            return None
+        mean = entries['national']
+        group_key = ('group', individual.groupe)
+        return {'mean': mean,
+                'national': index.rank('national', mean),
+                'group': index.rank(group_key, mean) if group_key in entries else None,
+                'notes': [index.rank(('note', j), values[j]) if ('note', j) in entries else None
+                          for j in range(len(values))]}
+
+    def rows_of(self, individuals: List[Individual]) -> np.ndarray:
+        """Ligne de la matrice de chaque individu de `individuals`."""
+        return np.fromiter((self._rows[ind] for ind in individuals), dtype=np.int64, count=len(individuals))
+
+    def row_means(self, rows: np.ndarray = None) -> np.ndarray:
+        """Moyenne de chaque ligne (ou des lignes `rows`), NaN pour un individu sans note, calculée par blocs.
+
+        Le calcul est le même quel que soit le nombre de lignes : la moyenne d'une ligne
+        seule est identique au bit près à celle obtenue pour toute la matrice.
+        """
+        total = len(self.individuals) if rows is None else len(rows)
+        means = np.full(total, np.nan)
+        step = max(1, STATS_BLOCK_VALUES // max(1, self._scores.shape[1]))
+        for start in range(0, total, step):
+            stop = min(total, start + step)
+            block = self._scores[start:stop] if rows is None else self._scores[rows[start:stop]]
+            block = np.asarray(block, dtype=np.float64)
+            present = ~np.isnan(block)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means[start:start + len(block)] = np.where(present, block, 0.0).sum(axis=1) / present.sum(axis=1)
+        return means
+
+    def leaderboard(self, k: int = 10, lowest: bool = False, note: int = None, group: str = None) -> list:
+        """Les `k` meilleurs (ou moins bons) individus, par moyenne ou par la note de colonne `note`.
+
+        Sélection par `np.argpartition` bloc par bloc (O(n), mémoire bornée en mode
+        projeté) : seuls les candidats retenus sont triés. Les individus sans valeur
+        sont ignorés ; les valeurs égales retenues gardent l'ordre des lignes.
+
+        Args:
+            k (int): Nombre d'individus retournés au plus.
+            lowest (bool): Les moins bonnes valeurs plutôt que les meilleures.
+            note (int): Colonne de la note classée (None pour la moyenne de chaque individu).
+            group (str): Limite le classement aux membres de ce groupe (None pour tous).
+
+        Returns:
+            list: Couples (individu, valeur), de la meilleure à la moins bonne (l'inverse si `lowest`).
+        """
+        code = None if group is None else self._group_index.get(group)
+        if k <= 0 or (group is not None and code is None):
+            return []
+        sign = 1.0 if lowest else -1.0
+        total = len(self.individuals)
+        step = max(1, STATS_BLOCK_VALUES // max(1, self._scores.shape[1]))
+        rows, keys = [], []
+        for start in range(0, total, step):
+            block = np.asarray(self._scores[start:min(total, start + step)], dtype=np.float64)
+            if note is None:
+                present = ~np.isnan(block)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    values = np.where(present, block, 0.0).sum(axis=1) / present.sum(axis=1)
+            elif note < block.shape[1]:
+                values = block[:, note]
+            else:
+                break
+            keep = ~np.isnan(values)
+            if code is not None:
+                keep &= self._codes[start:start + len(block)] == code
+            candidates = np.flatnonzero(keep)
+            if len(candidates) > k:
+                candidates = np.sort(candidates[np.argpartition(sign * values[candidates], k - 1)[:k]])
+            rows.append(candidates + start)
+            keys.append(values[candidates])
+        if not rows:
+            return []
+        rows, keys = np.concatenate(rows), np.concatenate(keys)
+        if len(rows) > k:
+            chosen = np.sort(np.argpartition(sign * keys, k - 1)[:k])
+            rows, keys = rows[chosen], keys[chosen]
+        order = np.argsort(sign * keys, kind='stable')
+        return [(self.individuals[r], v) for r, v in zip(rows[order].tolist(), keys[order].tolist())]
+
+    def national_stats(self) -> dict:
+        """Statistiques sur l'ensemble des notes, ou None s'il n'y en a aucune.
+
+        Au-delà de `QUANTILE_EXACT_LIMIT` notes, les quartiles sont lus dans
+        `quantile_sketch()` et les autres statistiques sont calculées par blocs.
+        """
+        if int(self._lengths[:len(self.individuals)].sum()) > QUANTILE_EXACT_LIMIT:
+            stats, _ = _stream_moments(self._blocks())
+            if stats is not None:
+                q1, median, q3 = self.quantile_sketch().quantiles([0.25, 0.5, 0.75])
+                stats.update(q1=q1, median=median, q3=q3)
+            return stats
+        if self.directory is not None:
+            return _stream_stats(self._blocks())
+        return describe(self.values())
+
+    def group_stats(self, names=None) -> dict:
+        """Statistiques par groupe : nom du groupe -> dictionnaire de statistiques.
+
+        Chaque dictionnaire contient aussi `members` (nombre d'individus du groupe).
+        Les individus sans groupe sont ignorés. Si `names` est fourni, seuls ces
+        groupes sont calculés (en une seule passe sur leurs lignes).
+        """
+        rows = None
+        selected = range(len(self.group_names))
+        if names is not None:
+            selected = [self._group_index[n] for n in names if n in self._group_index]
+            rows = np.isin(self.group_codes, selected)
+        if self.directory is not None:
+            stats = self._blockwise_group_stats(rows)
+        else:
+            values, codes = self._flat(rows)
+            stats = _segment_stats(values, codes, len(self.group_names))
+        members = np.bincount(self.group_codes, minlength=len(self.group_names))
+        result = {}
+        for code in selected:
+            name = self.group_names[code]
+            if not name or not members[code]:
+                continue
+            entry = {k: (int(v[code]) if k == 'count' else float(v[code])) for k, v in stats.items()}
+            entry['members'] = int(members[code])
+            result[name] = entry
+        return result
+
+    def _blockwise_group_stats(self, mask=None) -> dict:
+        """`_segment_stats` des groupes d'une matrice projetée, par paquets de groupes entiers.
+
+        Les lignes sont ordonnées par groupe ; les groupes sont lus par paquets d'au
+        plus `STATS_BLOCK_VALUES` notes, et un groupe dépassant seul ce budget est
+        calculé en flux par `_stream_stats`.
+        """
+        nb = len(self.group_names)
+        codes = self.group_codes
+        rows = np.arange(len(codes)) if mask is None else np.flatnonzero(mask)
+        rows = rows[np.argsort(codes[rows], kind='stable')]
+        members = np.bincount(codes[rows], minlength=nb)
+        stats = {k: np.full(nb, np.nan) for k in ('mean', 'median', 'std', 'min', 'max', 'q1', 'q3')}
+        stats['count'] = np.zeros(nb, dtype=np.int64)
+        width = max(1, self._scores.shape[1])
+        bounds = np.concatenate(([0], np.cumsum(members)))
+
+        def flush(first, last):
+            # groupes first..last-1 : lignes contiguës dans `rows`
+            part = rows[bounds[first]:bounds[last]]
+            if not len(part):
+                return
+            block = np.asarray(self.scores[part], dtype=np.float64)
+            mask_present = ~np.isnan(block)
+            local = np.broadcast_to((codes[part] - first)[:, None], block.shape)[mask_present]
+            partial = _segment_stats(block[mask_present], local, last - first)
+            for k, v in partial.items():
+                stats[k][first:last] = v
+
+        first = 0
+        for code in range(nb):
+            size = members[code] * width
+            if size > STATS_BLOCK_VALUES:
+                flush(first, code)
+                single = _stream_stats(self._blocks(rows[bounds[code]:bounds[code + 1]]))
+                if single is not None:
+                    for k, v in single.items():
+                        stats[k][code] = v
+                first = code + 1
+            elif (bounds[code + 1] - bounds[first]) * width > STATS_BLOCK_VALUES:
+                flush(first, code)
+                first = code
+        flush(first, nb)
+        return stats
+
+    def note_means(self):
+        """Moyenne de chaque note (colonne) sur tout le jeu de données et pour chaque groupe, en une passe par blocs.
+
+        Returns:
+            Tuple (moyennes du jeu de données (notes,), moyennes par groupe
+            (groupes × notes), lignes dans l'ordre de `group_names`) ; NaN sans valeur.
+        """
+        nb, width = len(self.group_names), self._scores.shape[1]
+        sums = np.zeros(nb * width)
+        counts = np.zeros(nb * width)
+        step = max(1, STATS_BLOCK_VALUES // max(1, width))
+        columns = np.arange(width)
+        for start in range(0, len(self.individuals), step):
+            block = np.asarray(self.scores[start:start + step], dtype=np.float64)
+            present = ~np.isnan(block)
+            # case (groupe, note) de chaque valeur du bloc
+            cells = (self.group_codes[start:start + step, None] * width + columns).ravel()
+            sums += np.bincount(cells, weights=np.where(present, block, 0.0).ravel(), minlength=nb * width)
+            counts += np.bincount(cells, weights=present.ravel(), minlength=nb * width)
+        sums, counts = sums.reshape(nb, width), counts.reshape(nb, width)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums.sum(axis=0) / counts.sum(axis=0), sums / counts
+
+
+def note_comparison(matrix: ScoreMatrix, notes: list, entity: Entity, means=None) -> dict:
+    """Comparaison note par note d'une entité à son groupe, au jeu de données et aux références nationales.
+
+    Les vecteurs retournés sont alignés sur `notes` (liste de `notes.json`) : valeur de
+    l'entité (ses notes pour un individu, les moyennes du groupe pour un groupe),
+    moyenne du groupe de l'individu (None pour un groupe), moyenne du jeu de données
+    et champ `national` de chaque note (NaN si absent).
+
+    Args:
+        matrix (ScoreMatrix): La matrice des notes contenant l'entité.
+        notes (list): Les notes de `notes.json`, dans l'ordre des colonnes.
+        entity (Entity): L'individu ou le groupe comparé.
+        means: Résultat de `matrix.note_means()` déjà calculé (recalculé si None).
+    """
+    names = [n.get('name') if isinstance(n, dict) else str(n) for n in notes]
+    size = len(names)
+
+    def aligned(vector):
+        out = np.full(size, np.nan)
+        if vector is not None:
+            vector = np.asarray(vector, dtype=np.float64)[:size]
+            out[:len(vector)] = vector
+        return out
+
+    def group_row(nom):
+        code = matrix._group_index.get(nom)
+        return None if code is None else groups[code]
+
+    dataset, groups = matrix.note_means() if means is None else means
+    national = []
+    for n in notes:
+        try:
+            national.append(float(n.get('national')))
+        except (AttributeError, TypeError, ValueError):
+            national.append(np.nan)
+
+    if isinstance(entity, Group):
+        values, group = group_row(entity.nom), None
+    else:
+        values, group = entity.get_data(), aligned(group_row(entity.groupe)) if entity.groupe else None
+    return {'names': names, 'entity': aligned(values), 'group': group,
+            'dataset': aligned(dataset), 'national': np.asarray(national, dtype=np.float64)}
+
+
+class StatsCache:
+    """Mémoïse des statistiques descriptives pour une version donnée du jeu de données.
+
+    Les entrées sont indexées par une clé libre (ex. `('national',)`,
+    `('group', nom)`) et toutes oubliées dès que la version change, sauf si
+    l'appelant indique via `advance` les seules clés touchées par une écriture.
+    """
+
+    def __init__(self):
+        """Initialise un cache vide."""
+        self.version = None
+        self._entries = {}
+
+    def get(self, version, key, compute):
+        """Retourne la valeur de `key` pour `version`, en appelant `compute()` si absente."""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+        if key not in self._entries:
+            self._entries[key] = compute()
+        return self._entries[key]
+
+    def get_many(self, version, keys, compute):
+        """Retourne {clé: valeur} pour `keys` ; `compute(manquantes)` calcule en une fois les clés absentes."""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+        missing = [k for k in keys if k not in self._entries]
+        if missing:
+            computed = compute(missing)
+            for k in missing:
+                self._entries[k] = computed.get(k)
+        return {k: self._entries[k] for k in keys}
+
+    def advance(self, version, stale=()):
+        """Passe à `version` en n'oubliant que les clés `stale` (après une modification ciblée)."""
+        for key in stale:
+            self._entries.pop(key, None)
+        self.version = version
+
+    def invalidate(self):
+        """Vide le cache, quelle que soit la version."""
+        self._entries.clear()
+        self.version = None
+
+
+class SearchIndex:
+    """Index de trigrammes (insensible à la casse) pour la recherche de sous-chaînes.
+
+    Chaque clé entière est associée à ses champs texte ; une recherche ne vérifie
+    que les clés contenant tous les trigrammes du terme, ou seulement celles d'un
+    résultat précédent (`within`) lorsque le terme a été affiné.
+    """
+
+    SEPARATOR = '\x1f'
+
+    def __init__(self):
+        """Initialise un index vide."""
+        self._texts = {}
+        self._grams = {}
+
+    @staticmethod
+    def _trigrams(text: str) -> set:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, key: int, *fields: str):
+        """Indexe (ou ré-indexe) la clé `key` avec ses champs texte."""
+        if key in self._texts:
+            self.remove(key)
+        text = self.SEPARATOR.join(f.casefold() for f in fields)
+        self._texts[key] = text
+        for gram in self._trigrams(text):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def build(self, records):
+        """Indexe en masse des couples (clé, champs) ; plus rapide que des `add` successifs.
+
+        Args:
+            records: Itérable de (clé, tuple de champs texte), clés absentes de l'index.
+        """
+        texts = self._texts
+        grams = self._grams
+        sep = self.SEPARATOR
+        for key, fields in records:
+            text = sep.join(f.casefold() for f in fields)
+            texts[key] = text
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                keys = grams.get(gram)
+                if keys is None:
+                    grams[gram] = {key}
+                else:
+                    keys.add(key)
+
+    def remove(self, key: int):
+        """Retire la clé `key` de l'index."""
+        text = self._texts.pop(key, None)
+        if text is None:
+            return
+        for gram in self._trigrams(text):
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    def search(self, term: str, within=None) -> List[int]:
+        """Retourne, triées, les clés dont un champ contient `term`.
+
+        Args:
+            term (str): Le terme recherché (la casse est ignorée).
+            within: Clés candidates optionnelles (résultat d'une recherche dont le
+                terme est contenu dans `term`) ; évite de repartir de tout l'index.
+        """
+        term = term.casefold()
+        if not term:
+            return sorted(self._texts if within is None else within)
+        candidates = within
+        grams = self._trigrams(term)
+        if grams:
+            postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+            if within is None or len(postings[0]) < len(within):
+                candidates = set.intersection(*postings)
+        if candidates is None:
+            candidates = self._texts
+        texts = self._texts
+        return sorted(k for k in candidates if k in texts and term in texts[k])
+
+
 class StatistiqueAnalysis:
     """Classe pour afficher les statistiques d'un sujet ou d'un groupe sous forme de graphe araignée."""
 
@@ -116,7 +1453,7 @@ class StatistiqueAnalysis:
         self.entity = entity
 
     def plot_radar_chart(self, labels=None):
-        data = self.entity.get_data()
+        data = list(self.entity.get_data())
         if not data:
             print("Aucune donnée disponible.")
             return
@@ -1,5 +1,23 @@
 import os
 import csv
+import io
+import json
+import atexit
+
+
+# Nombre de lignes par lot renvoyé par `IterCsv` : borne la mémoire utilisée
+# quelle que soit la taille du fichier
+CSV_CHUNK_SIZE = 10000
+
+# Index (nom, prénom) -> positions des lignes, sauvegardé à côté du CSV indexé
+# (chemin absolu du CSV suivi de ce suffixe)
+INDEX_SUFFIX = ".idx"
+# Les lignes supprimées sont effacées sur place ; le fichier est compacté quand elles
+# dépassent ce nombre et cette proportion des lignes
+TOMBSTONE_COMPACT_MIN = 1000
+TOMBSTONE_COMPACT_RATIO = 0.25
+
+_index = None
 
 
 def CreateCsv():
@@ -11,30 +29,345 @@ def CreateCsv():
             writer.writerow(["Nom", "Prénom", "Groupe", "Données"])
 
 
+def IterCsv(chunk_size=CSV_CHUNK_SIZE):
+    """Parcourt le fichier CSV par lots d'au plus `chunk_size` dictionnaires.
+
+    Seul le lot courant est gardé en mémoire.
+    """
+    filename = "Bd.csv"
+    if not os.path.isfile(filename):
+        return
+    with open(filename, 'r', encoding="utf-8", newline='') as file:
+        reader = csv.DictReader(file)
+        chunk = []
+        for row in reader:
+            if not row.get("Nom") and IsTombstone(row):
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
 def ReadCsv():
     """Lit le fichier CSV et retourne les données sous forme de liste de dictionnaires."""
-    filename = "Bd.csv"
     data = []
-    if os.path.isfile(filename):
-        with open(filename, 'r', encoding="utf-8", newline='') as file:
-            reader = csv.DictReader(file)
-            data = list(reader)
+    for chunk in IterCsv():
+        data.extend(chunk)
     return data
 
 
+# Index (nom, prénom) -> positions
+
+def IsTombstone(row):
+    """Indique si une ligne lue est une ligne supprimée (tous les champs vides)."""
+    return not any(v.strip() for v in row.values() if isinstance(v, str))
+
+
+def _Key(nom, prenom):
+    """Clé normalisée (casse et espaces ignorés) d'un couple nom, prénom."""
+    return f"{nom.strip().lower()}\x1f{prenom.strip().lower()}"
+
+
+def _CsvPath():
+    """Chemin absolu du CSV du dossier courant, qui identifie l'index."""
+    return os.path.abspath("Bd.csv")
+
+
+def _Current(index):
+    """Indique si `index` décrit le CSV du dossier courant dans son état actuel."""
+    return index is not None and index.get('csv') == _CsvPath() and (index['mtime_ns'], index['size']) == _Stamp()
+
+
+def _Stamp():
+    """Retourne (mtime_ns, taille) du CSV, qui valident l'index."""
+    stat = os.stat("Bd.csv")
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _ReadRecord(file):
+    """Lit l'enregistrement commençant à la position courante (plusieurs lignes si un champ entre guillemets en contient)."""
+    raw = file.readline()
+    while raw and raw.count(b'"') % 2:
+        more = file.readline()
+        if not more:
+            break
+        raw += more
+    return raw
+
+
+def _ParseRecord(raw):
+    """Découpe un enregistrement brut en liste de champs."""
+    return next(csv.reader(io.StringIO(raw.decode("utf-8"), newline='')), [])
+
+
+def BuildIndex():
+    """Parcourt le CSV une fois et construit l'index clé -> positions (en octets) des lignes."""
+    keys = {}
+    rows = tombstones = 0
+    with open("Bd.csv", 'rb') as file:
+        header = _ParseRecord(_ReadRecord(file))
+        position = file.tell()
+        while True:
+            raw = _ReadRecord(file)
+            if not raw:
+                break
+            fields = _ParseRecord(raw)
+            if any(f.strip() for f in fields):
+                keys.setdefault(_Key(fields[0], fields[1] if len(fields) > 1 else ''), []).append(position)
+                rows += 1
+            else:
+                tombstones += 1
+            position = file.tell()
+    mtime_ns, size = _Stamp()
+    return {'csv': _CsvPath(), 'mtime_ns': mtime_ns, 'size': size, 'header': header, 'keys': keys,
+            'rows': rows, 'tombstones': tombstones, 'dirty': True}
+
+
+def LoadIndex():
+    """Retourne l'index du CSV du dossier courant : celui en mémoire ou le fichier sauvegardé
+    à côté du CSV s'ils sont à jour, sinon reconstruit.
+
+    L'index d'un autre CSV (changement de dossier courant) est d'abord sauvegardé.
+    """
+    global _index
+    if _index is not None and _index.get('csv') != _CsvPath():
+        SaveIndex()
+        _index = None
+    if not os.path.isfile("Bd.csv"):
+        _index = None
+        return None
+    if _Current(_index):
+        return _index
+    _index = None
+    index_file = _CsvPath() + INDEX_SUFFIX
+    if os.path.isfile(index_file):
+        try:
+            with open(index_file, 'r', encoding="utf-8") as file:
+                saved = json.load(file)
+            if _Current(saved):
+                saved['dirty'] = False
+                _index = saved
+        except (OSError, ValueError):
+            pass
+    if _index is None:
+        _index = BuildIndex()
+        SaveIndex()
+    return _index
+
+
+def SaveIndex():
+    """Écrit l'index en mémoire à côté du CSV qu'il décrit, s'il a changé depuis la dernière sauvegarde.
+
+    Le chemin ne dépend pas du dossier courant au moment de l'appel (ex. en fin de programme).
+    """
+    if _index is None or not _index.get('dirty') or not os.path.isdir(os.path.dirname(_index['csv'])):
+        return
+    index_file = _index['csv'] + INDEX_SUFFIX
+    temp = index_file + ".tmp"
+    with open(temp, 'w', encoding="utf-8") as file:
+        json.dump({k: v for k, v in _index.items() if k != 'dirty'}, file, ensure_ascii=False)
+    os.replace(temp, index_file)
+    _index['dirty'] = False
+
+
+# L'index est mis à jour en mémoire à chaque écriture et sauvegardé une fois en fin de programme
+atexit.register(SaveIndex)
+
+
+def _Touch(index):
+    """Enregistre dans l'index le nouvel état du CSV après une écriture faite par ce module."""
+    index['mtime_ns'], index['size'] = _Stamp()
+    index['dirty'] = True
+
+
+def _Matches(index, nom, prenom, exact=True):
+    """Retourne [(position, champs)] des lignes de (nom, prénom), dans l'ordre du fichier.
+
+    Avec `exact`, la casse doit correspondre (comme pour les modifications) ;
+    sinon la comparaison l'ignore (comme pour la recherche).
+    """
+    matches = []
+    positions = index['keys'].get(_Key(nom, prenom), [])
+    if not positions:
+        return matches
+    with open("Bd.csv", 'rb') as file:
+        for position in sorted(positions):
+            file.seek(position)
+            raw = _ReadRecord(file)
+            fields = _ParseRecord(raw)
+            if len(fields) < 2:
+                continue
+            if exact and (fields[0].strip() != nom.strip() or fields[1].strip() != prenom.strip()):
+                continue
+            matches.append((position, raw, fields))
+    return matches
+
+
+def _EncodeRow(fields, newline):
+    """Encode une ligne CSV avec le terminateur `newline`."""
+    buffer = io.StringIO()
+    # le terminateur par défaut fait mettre entre guillemets les champs contenant un saut de ligne
+    csv.writer(buffer).writerow(fields)
+    return buffer.getvalue()[:-2].encode("utf-8") + newline
+
+
+def _Terminator(raw):
+    return b'\r\n' if raw.endswith(b'\r\n') else (b'\n' if raw.endswith(b'\n') else b'')
+
+
+def _Overwrite(position, raw, fields):
+    """Réécrit sur place la ligne `raw` si `fields` s'encode exactement sur sa longueur.
+
+    Retourne False si la longueur diffère : des espaces de remplissage feraient partie
+    du dernier champ à la relecture.
+    """
+    newline = _Terminator(raw)
+    encoded = _EncodeRow(fields, b'')
+    width = len(raw) - len(newline)
+    if len(encoded) != width:
+        return False
+    with open("Bd.csv", 'r+b') as file:
+        file.seek(position)
+        file.write(encoded + b' ' * (width - len(encoded)))
+    return True
+
+
+def _Tombstone(position, raw):
+    """Efface une ligne sur place : tous ses champs deviennent vides, sa longueur ne change pas."""
+    width = len(raw) - len(_Terminator(raw))
+    with open("Bd.csv", 'r+b') as file:
+        file.seek(position)
+        file.write(b',,,'.ljust(width))
+
+
+def _AppendRecord(fields):
+    """Ajoute une ligne en fin de CSV et retourne sa position (en octets)."""
+    with open("Bd.csv", 'a+b') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        # la dernière ligne du fichier peut ne pas être terminée
+        if position:
+            file.seek(position - 1)
+            if file.read(1) != b'\n':
+                file.write(b'\r\n')
+                position += 2
+        file.write(_EncodeRow(fields, b'\r\n'))
+    return position
+
+
+def _Unindex(index, nom, prenom, position):
+    key = _Key(nom, prenom)
+    positions = index['keys'].get(key, [])
+    if position in positions:
+        positions.remove(position)
+        if not positions:
+            del index['keys'][key]
+    index['rows'] -= 1
+
+
+def CompactIfNeeded(index):
+    """Réécrit le CSV sans ses lignes supprimées quand elles sont trop nombreuses."""
+    tombstones = index['tombstones']
+    if tombstones < TOMBSTONE_COMPACT_MIN or tombstones < TOMBSTONE_COMPACT_RATIO * (index['rows'] + tombstones):
+        return
+    CompactCsv()
+
+
+def CompactCsv():
+    """Réécrit le CSV sans ses lignes supprimées, puis reconstruit l'index."""
+    global _index
+    filename = "Bd.csv"
+    temp = filename + ".tmp"
+    with open(temp, 'w', encoding="utf-8", newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=["Nom", "Prénom", "Groupe", "Données"])
+        writer.writeheader()
+        for chunk in IterCsv():
+            writer.writerows(chunk)
+    os.replace(temp, filename)
+    _index = BuildIndex()
+    SaveIndex()
+
+
 def AddEntry(nom, prenom, groupe, donnees):
     """Ajoute une nouvelle entrée dans le fichier CSV."""
     filename = "Bd.csv"
     # S'assurer que le fichier existe
     if not os.path.isfile(filename):
         CreateCsv()
-    
-    with open(filename, 'a', encoding="utf-8", newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow([nom, prenom, groupe, donnees])
+    index = LoadIndex()
+
+    position = _AppendRecord([nom, prenom, groupe, donnees])
+    index['keys'].setdefault(_Key(nom, prenom), []).append(position)
+    index['rows'] += 1
+    _Touch(index)
     print(f"Entrée ajoutée : {nom} {prenom}")
 
 
+def AddEntries(rows):
+    """Ajoute en un seul passage des entrées (nom, prénom, groupe, données) à la fin du CSV.
+
+    Les lignes sont écrites par blocs de `CSV_CHUNK_SIZE` ; l'index est complété s'il
+    est déjà chargé, sinon il sera reconstruit à la prochaine recherche.
+
+    Returns:
+        Le nombre d'entrées ajoutées.
+    """
+    filename = "Bd.csv"
+    if not os.path.isfile(filename):
+        CreateCsv()
+    index = _index if _Current(_index) else None
+
+    count = 0
+    with open(filename, 'a+b') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        # la dernière ligne du fichier peut ne pas être terminée
+        if position:
+            file.seek(position - 1)
+            if file.read(1) != b'\n':
+                file.write(b'\r\n')
+                position += 2
+        buffer = io.StringIO(newline='')
+        writer = csv.writer(buffer)
+        chunk = []
+        for row in rows:
+            start = buffer.tell()
+            writer.writerow(row)
+            chunk.append((row, start))
+            if len(chunk) >= CSV_CHUNK_SIZE:
+                position = _WriteChunk(file, buffer, chunk, position, index)
+                count += len(chunk)
+                buffer.seek(0)
+                buffer.truncate()
+                chunk = []
+        if chunk:
+            position = _WriteChunk(file, buffer, chunk, position, index)
+            count += len(chunk)
+
+    if index is not None:
+        index['rows'] += count
+        _Touch(index)
+    print(f"{count} entrées ajoutées")
+    return count
+
+
+def _WriteChunk(file, buffer, chunk, position, index):
+    """Écrit un bloc de lignes préparé par `AddEntries` et indexe leurs positions ; retourne la position suivante."""
+    text = buffer.getvalue()
+    if index is not None:
+        ends = [start for _, start in chunk[1:]] + [len(text)]
+        offset = position
+        for (row, start), end in zip(chunk, ends):
+            index['keys'].setdefault(_Key(row[0], row[1]), []).append(offset)
+            offset += len(text[start:end].encode("utf-8"))
+    data = text.encode("utf-8")
+    file.write(data)
+    return position + len(data)
+
+
 def UpdateCsv(data):
     """Remplace complètement le contenu du CSV avec les nouvelles données."""
     filename = "Bd.csv"
@@ -57,19 +390,20 @@ def DeleteEntry(nom, prenom):
         print("Le fichier CSV n'existe pas.")
         return
     
-    data = ReadCsv()
-    initial_count = len(data)
-    
-    # Filtrer pour garder toutes les entrées SAUF celle à supprimer
-    data = [entry for entry in data 
-            if not (entry.get("Nom", "").strip() == nom.strip() and 
-                   entry.get("Prénom", "").strip() == prenom.strip())]
-    
-    if len(data) == initial_count:
-        print(f"Aucune entrée trouvée pour {nom} {prenom}")
-    else:
-        UpdateCsv(data)
+    # Effacer sur place toutes les lignes correspondantes (compaction différée)
+    index = LoadIndex()
+    matches = _Matches(index, nom, prenom)
+    for position, raw, fields in matches:
+        _Tombstone(position, raw)
+        _Unindex(index, fields[0], fields[1], position)
+        index['tombstones'] += 1
+
+    if matches:
+        _Touch(index)
+        CompactIfNeeded(index)
         print(f"Entrée supprimée : {nom} {prenom}")
+    else:
+        print(f"Aucune entrée trouvée pour {nom} {prenom}")
 
 
 def ClearCsv():
@@ -95,38 +429,43 @@ def DeleteCsv():
 
 def SearchByName(nom, prenom):
     """Recherche une personne par nom et prénom."""
-    data = ReadCsv()
-    results = [entry for entry in data 
-               if entry.get("Nom", "").strip().lower() == nom.strip().lower() and
-                  entry.get("Prénom", "").strip().lower() == prenom.strip().lower()]
-    return results
+    index = LoadIndex()
+    if index is None:
+        return []
+    header = index['header']
+    return [dict(zip(header, fields)) for _, _, fields in _Matches(index, nom, prenom, exact=False)]
 
 
 def SearchByGroupe(groupe):
     """Retourne toutes les personnes d'un groupe donné."""
-    data = ReadCsv()
-    results = [entry for entry in data 
-               if entry.get("Groupe", "").strip().lower() == groupe.strip().lower()]
+    results = []
+    for chunk in IterCsv():
+        results.extend(entry for entry in chunk
+                       if entry.get("Groupe", "").strip().lower() == groupe.strip().lower())
     return results
 
 
 def UpdateEntry(nom, prenom, nouveau_groupe=None, nouvelles_donnees=None):
     """Met à jour le groupe et/ou les données d'une personne."""
-    data = ReadCsv()
-    found = False
-    
-    for entry in data:
-        if (entry.get("Nom", "").strip() == nom.strip() and 
-            entry.get("Prénom", "").strip() == prenom.strip()):
-            if nouveau_groupe is not None:
-                entry["Groupe"] = nouveau_groupe
-            if nouvelles_donnees is not None:
-                entry["Données"] = nouvelles_donnees
-            found = True
-            break
-    
-    if found:
-        UpdateCsv(data)
+    index = LoadIndex()
+    matches = _Matches(index, nom, prenom) if index is not None else []
+    if matches:
+        position, raw, fields = matches[0]
+        fields = (fields + [''] * 4)[:4]
+        if nouveau_groupe is not None:
+            fields[2] = nouveau_groupe
+        if nouvelles_donnees is not None:
+            fields[3] = nouvelles_donnees
+        # Réécriture sur place à longueur égale, sinon effacement et ajout en fin de fichier
+        if not _Overwrite(position, raw, fields):
+            _Tombstone(position, raw)
+            _Unindex(index, fields[0], fields[1], position)
+            index['tombstones'] += 1
+            appended = _AppendRecord(fields)
+            index['keys'].setdefault(_Key(fields[0], fields[1]), []).append(appended)
+            index['rows'] += 1
+        _Touch(index)
+        CompactIfNeeded(index)
         print(f"Entrée mise à jour : {nom} {prenom}")
     else:
         print(f"Aucune entrée trouvée pour {nom} {prenom}")
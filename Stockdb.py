@@ -0,0 +1,117 @@
+import json
+import sqlite3
+import threading
+
+
+DB_FILE = "bibliotheque.db"
+
+# Requêtes réutilisées telles quelles : sqlite3 garde en cache les instructions
+# préparées par texte SQL, elles ne sont donc compilées qu'une seule fois par connexion.
+SQL_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS etudiants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nom TEXT NOT NULL,
+        prenom TEXT NOT NULL,
+        groupe TEXT DEFAULT '',
+        scores TEXT DEFAULT '{}'
+    )
+"""
+SQL_CREATE_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_etudiants_nom_prenom ON etudiants (nom, prenom)"
+SQL_SELECT_ALL = "SELECT nom, prenom, groupe, scores FROM etudiants ORDER BY id"
+SQL_UPSERT = """
+    INSERT INTO etudiants (nom, prenom, groupe, scores) VALUES (?, ?, ?, ?)
+    ON CONFLICT(nom, prenom) DO UPDATE SET groupe = excluded.groupe, scores = excluded.scores
+"""
+SQL_DELETE = "DELETE FROM etudiants WHERE nom = ? AND prenom = ?"
+
+_connection = None
+# La connexion est partagée entre le thread de chargement et celui de Tk :
+# chaque utilisation passe par ce verrou.
+_lock = threading.RLock()
+
+
+def Connect():
+    """Ouvre (une seule fois) la connexion à la base et crée le schéma si nécessaire.
+
+    La connexion peut être utilisée depuis n'importe quel thread, sous `_lock`.
+    """
+    global _connection
+    with _lock:
+        if _connection is None:
+            _connection = _open()
+        return _connection
+
+
+def _open():
+    """Ouvre une connexion utilisable hors du thread qui l'a créée et prépare le schéma."""
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        conn.execute(SQL_CREATE_TABLE)
+        conn.execute(SQL_CREATE_INDEX)
+    return conn
+
+
+def Close():
+    """Ferme la connexion ouverte par `Connect`."""
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+
+
+def _row(student):
+    """Convertit un dictionnaire étudiant en paramètres pour `SQL_UPSERT`."""
+    return (
+        student.get('nom', '').strip(),
+        student.get('prenom', '').strip(),
+        student.get('groupe', '').strip(),
+        json.dumps(student.get('scores', {}) or {}, ensure_ascii=False),
+    )
+
+
+def ReadStudents():
+    """Retourne tous les étudiants sous forme de dictionnaires (même format que students.json)."""
+    conn = Connect()
+    with _lock:
+        return [{'nom': nom, 'prenom': prenom, 'groupe': groupe or '', 'scores': json.loads(scores or '{}')}
+                for nom, prenom, groupe, scores in conn.execute(SQL_SELECT_ALL)]
+
+
+def UpsertStudent(student):
+    """Ajoute ou met à jour un étudiant (clé unique nom + prénom)."""
+    conn = Connect()
+    with _lock, conn:
+        conn.execute(SQL_UPSERT, _row(student))
+
+
+def UpsertStudents(students):
+    """Ajoute ou met à jour plusieurs étudiants dans une seule transaction."""
+    conn = Connect()
+    with _lock, conn:
+        conn.executemany(SQL_UPSERT, (_row(s) for s in students))
+
+
+def DeleteStudent(nom, prenom):
+    """Supprime un étudiant par nom et prénom."""
+    conn = Connect()
+    with _lock, conn:
+        conn.execute(SQL_DELETE, (nom.strip(), prenom.strip()))
+
+
+def IsMigrated():
+    """Indique si la migration initiale depuis les fichiers a déjà été effectuée."""
+    conn = Connect()
+    with _lock:
+        return conn.execute("PRAGMA user_version").fetchone()[0] >= 1
+
+
+def SetMigrated():
+    """Marque la base comme migrée pour que la migration ne soit faite qu'une fois."""
+    conn = Connect()
+    with _lock:
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+
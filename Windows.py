@@ -2,14 +2,251 @@ import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk, messagebox, simpledialog, filedialog
 from datetime import datetime
+import itertools
+import queue
+from bisect import bisect_left
+import threading
 import numpy as np
 import Main
-from DataManager import DataManager
+from DataManager import DataManager, Repository
+
+# Délai (ms) entre la dernière frappe et l'exécution de la recherche
+SEARCH_DEBOUNCE_MS = 150
+
+# Chargement en arrière-plan : intervalle de relève de la file et lots intégrés par relève
+LOAD_POLL_MS = 50
+LOAD_BATCHES_PER_POLL = 4
+
+# Nombre d'étudiants affichés par défaut dans le panneau de classement
+LEADERBOARD_SIZE = 10
+
+# Tri des tableaux : attribut texte des entrées et statistique des groupes de chaque colonne
+ENTREE_SORT_ATTRIBUTES = {'Nom': 'nom', 'Prénom': 'prenom', 'Groupe': 'groupe'}
+ENTREE_SORT_COLUMNS = tuple(ENTREE_SORT_ATTRIBUTES) + ('Score',)
+GROUPE_SORT_STATS = {'Total Notes': 'count', 'Moyenne': 'mean', 'Médiane': 'median',
+                     'Min': 'min', 'Max': 'max', 'Écart-type': 'std'}
+GROUPE_SORT_COLUMNS = ('Nom Groupe', 'Nb Membres') + tuple(GROUPE_SORT_STATS)
 
 # Les imports vers d'autres modules de l'application sont faits localement
 # pour éviter les erreurs si le module n'est pas disponible lors d'une importation partielle.
 
 
+class VirtualTreeview:
+    """Affiche une longue liste dans un Treeview en ne créant que les lignes visibles.
+
+    Le Treeview ne contient jamais plus que les lignes de la fenêtre visible plus
+    `buffer` lignes ; la barre de défilement verticale est reliée à la position
+    dans `items` (la liste filtrée), quelle que soit sa taille.
+
+    Chaque élément affiché reçoit un identifiant de ligne (iid) unique, conservé
+    tant qu'il reste dans la fenêtre : un rafraîchissement n'applique au Treeview
+    que la différence (lignes retirées, insérées, déplacées ou modifiées).
+    """
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, values, prefetch=None, buffer: int = 5):
+        """Relie le Treeview et sa barre de défilement à une liste virtuelle.
+
+        Args:
+            tree (ttk.Treeview): Le tableau à remplir.
+            scrollbar (ttk.Scrollbar): La barre de défilement verticale.
+            values: Fonction (position à partir de 1, élément) -> valeurs de la ligne.
+            prefetch: Fonction optionnelle appelée avec les éléments à afficher avant leur rendu.
+            buffer (int): Nombre de lignes créées en plus de la partie visible.
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.values = values
+        self.prefetch = prefetch
+        self.buffer = buffer
+        self.items = []
+        self.offset = 0
+        # élément sélectionné, conservé même lorsque sa ligne sort de la vue
+        self.selected = None
+        # iid -> élément et élément -> iid des lignes créées, iids dans l'ordre affiché
+        self._rendered = {}
+        self._iids = {}
+        self._order = []
+        self._row_values = {}
+        self._counter = itertools.count()
+
+        tree.configure(yscrollcommand='')
+        scrollbar.config(command=self.yview)
+        tree.bind('<Configure>', lambda e: self.refresh(), add='+')
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        tree.bind('<MouseWheel>', self._on_wheel)
+        tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        tree.bind('<Button-5>', lambda e: self.scroll(3))
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', None), ('<Next>', None)):
+            tree.bind(key, lambda e, k=key, s=step: self._on_key(k, s))
+
+    def visible_rows(self) -> int:
+        """Nombre de lignes que le Treeview peut afficher à sa taille actuelle."""
+        try:
+            rowheight = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        except (tk.TclError, ValueError):
+            rowheight = 20
+        measured = (self.tree.winfo_height() - 25) // rowheight
+        return max(1, int(self.tree.cget('height')), measured)
+
+    def set_items(self, items):
+        """Remplace la liste affichée et revient en haut du tableau."""
+        self.items = items
+        self.offset = 0
+        self.selected = None
+        self.refresh()
+
+    def refresh(self):
+        """Met à jour la fenêtre visible par différence avec les lignes déjà créées.
+
+        Le coût ne dépend que de la taille de la fenêtre : les lignes restées visibles
+        ne sont modifiées que si leurs valeurs changent, et seules celles hors de la plus
+        longue suite restée dans l'ordre sont déplacées (nombre minimal de déplacements).
+        """
+        count = len(self.items)
+        visible = self.visible_rows()
+        self.offset = max(0, min(self.offset, count - visible))
+        end = min(count, self.offset + visible + self.buffer)
+        window = self.items[self.offset:end]
+        if self.prefetch is not None:
+            self.prefetch(window)
+
+        order = [self._iids.get(item) or f"r{next(self._counter)}" for item in window]
+        wanted = set(order)
+        gone = [iid for iid in self._order if iid not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone:
+                del self._iids[self._rendered.pop(iid)]
+                del self._row_values[iid]
+        # lignes restantes dans leur ordre actuel ; les autres (et les nouvelles) sont placées
+        # juste après la ligne qui les précède dans la fenêtre
+        current = [iid for iid in self._order if iid in wanted]
+        unmoved = self._unmoved(current, order)
+        previous = None
+        for pos, item, iid in zip(range(self.offset + 1, end + 1), window, order):
+            values = tuple(self.values(pos, item))
+            if iid not in unmoved:
+                if iid in self._rendered:
+                    current.remove(iid)
+                index = current.index(previous) + 1 if previous is not None else 0
+                current.insert(index, iid)
+                if iid in self._rendered:
+                    self.tree.move(iid, '', index)
+                else:
+                    self.tree.insert('', index, iid=iid, values=values)
+                    self._rendered[iid] = item
+                    self._iids[item] = iid
+                    self._row_values[iid] = values
+            if self._row_values[iid] != values:
+                self.tree.item(iid, values=values)
+                self._row_values[iid] = values
+            previous = iid
+        self._order = order
+        if self.selected is not None and self.selected in self._iids:
+            self.tree.selection_set(self._iids[self.selected])
+
+        if count:
+            self.scrollbar.set(self.offset / count, min(1.0, (self.offset + visible) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    @staticmethod
+    def _unmoved(current, order) -> set:
+        """Lignes de `current` formant la plus longue suite déjà dans l'ordre de `order` (O(w log w))."""
+        kept = set(current)
+        if [iid for iid in order if iid in kept] == current:
+            # cas courant (défilement, ajout ou retrait de lignes) : aucun déplacement
+            return kept
+        positions = {iid: i for i, iid in enumerate(current)}
+        sequence = [positions[iid] for iid in order if iid in positions]
+        # tails[k] : plus petite fin d'une suite croissante de longueur k + 1
+        tails, tail_index, parent = [], [], [None] * len(sequence)
+        for i, p in enumerate(sequence):
+            k = bisect_left(tails, p)
+            parent[i] = tail_index[k - 1] if k else None
+            if k == len(tails):
+                tails.append(p)
+                tail_index.append(i)
+            else:
+                tails[k], tail_index[k] = p, i
+        unmoved = set()
+        i = tail_index[-1] if tail_index else None
+        while i is not None:
+            unmoved.add(current[sequence[i]])
+            i = parent[i]
+        return unmoved
+
+    def scroll(self, rows: int):
+        """Fait défiler la vue de `rows` lignes."""
+        self.offset += rows
+        self.refresh()
+        return 'break'
+
+    def yview(self, *args):
+        """Commande de la barre de défilement (`moveto` / `scroll`)."""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self.items))
+            self.refresh()
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if len(args) > 2 and args[2] == 'pages':
+                step *= self.visible_rows()
+            self.scroll(step)
+
+    def iid(self, item):
+        """Retourne l'identifiant de ligne d'un élément affiché, ou None."""
+        return self._iids.get(item)
+
+    def item(self, iid):
+        """Retourne l'élément d'une ligne affichée, ou None."""
+        return self._rendered.get(iid)
+
+    def selected_item(self):
+        """Retourne l'élément sélectionné, même si sa ligne n'est plus affichée."""
+        selection = self.tree.selection()
+        if selection and selection[0] in self._rendered:
+            return self._rendered[selection[0]]
+        return self.selected
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._rendered:
+            self.selected = self._rendered[selection[0]]
+
+    def _on_wheel(self, event):
+        return self.scroll(-1 if event.delta > 0 else 1)
+
+    def _on_key(self, key, step):
+        """Déplace la sélection au clavier en faisant défiler au-delà des lignes créées."""
+        if step is None:
+            step = self.visible_rows() * (-1 if key == '<Prior>' else 1)
+        current = self.selected_item()
+        if current in self._iids:
+            # élément affiché : sa position découle de sa place dans la fenêtre
+            pos = self.offset + self._order.index(self._iids[current])
+        else:
+            try:
+                pos = self.items.index(current) if current is not None else self.offset - 1
+            except ValueError:
+                pos = self.offset - 1
+        pos = max(0, min(len(self.items) - 1, pos + step))
+        if not self.items:
+            return 'break'
+        visible = self.visible_rows()
+        if pos < self.offset:
+            self.offset = pos
+        elif pos >= self.offset + visible:
+            self.offset = pos - visible + 1
+        self.selected = self.items[pos]
+        self.refresh()
+        iid = self._iids[self.selected]
+        self.tree.focus(iid)
+        self.tree.selection_set(iid)
+        return 'break'
+
+
 class StatisticsWindow:
     """Fenêtre d'analyse statistique pour entrées individuelles et groupes"""
 
@@ -31,6 +268,24 @@ class StatisticsWindow:
         self.groups = []
         self.filtered_individuals = []
         self.filtered_groups = []
+        # Résultat de la recherche texte (avant filtre de groupe) et dernier terme recherché
+        self.search_results = []
+        self._last_search = None
+        self._search_job = None
+        # Tri courant des tableaux : (colonne, décroissant) ou None pour l'ordre de chargement
+        self._entree_sort = None
+        self._groupe_sort = None
+        # entrées ajoutées en fin de liste par le chargement et pas encore triées
+        self._entree_unsorted = 0
+        self._groupe_unsorted = False
+        # Incrémenté à chaque chargement pour ignorer les lots d'un chargement abandonné
+        self._load_generation = 0
+        self.repository = Repository()
+        self.score_matrix = self.repository.matrix
+        self.stats_cache = Main.StatsCache()
+        # Entités dont le détail est affiché dans les panneaux de droite
+        self._displayed_entree = None
+        self._displayed_groupe = None
 
         # Interface
         self.root.title("Quantiv - Analyse Statistique")
@@ -64,6 +319,7 @@ class StatisticsWindow:
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Fichier", menu=file_menu)
         file_menu.add_command(label="Actualiser les données", command=self.refresh_data)
+        file_menu.add_command(label="Importer des entrées (CSV)", command=self.import_entrees)
         file_menu.add_command(label="Exporter les statistiques", command=self.export_stats)
         file_menu.add_separator()
         file_menu.add_command(label="Quitter", command=self.root.quit)
@@ -106,7 +362,7 @@ class StatisticsWindow:
 
         ttk.Label(search_frame, text="Rechercher:").pack(side='left', padx=5)
         self.entree_search_var = tk.StringVar()
-        self.entree_search_var.trace('w', lambda *a: self.search_entrees())
+        self.entree_search_var.trace('w', lambda *a: self.schedule_entree_search())
         ttk.Entry(search_frame, textvariable=self.entree_search_var, width=40).pack(side='left', padx=5)
 
         filter_frame = ttk.Frame(top_frame)
@@ -141,13 +397,12 @@ class StatisticsWindow:
         hsb = ttk.Scrollbar(tree_frame, orient="horizontal")
 
         self.entree_tree = ttk.Treeview(tree_frame, columns=columns, show='headings',
-                                        yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-        vsb.config(command=self.entree_tree.yview)
+                                        xscrollcommand=hsb.set)
         hsb.config(command=self.entree_tree.xview)
 
         column_config = {'ID': 50, 'Nom': 120, 'Prénom': 120, 'Groupe': 100, 'Score': 80, 'Date': 100, 'Statut': 100}
         for col in columns:
-            self.entree_tree.heading(col, text=col)
+            self.entree_tree.heading(col, text=col, command=lambda c=col: self.sort_entrees(c))
             self.entree_tree.column(col, width=column_config.get(col, 100), anchor='center')
         # placer le treeview et ses scrollbars
         self.entree_tree.grid(row=0, column=0, sticky='nsew')
@@ -156,6 +411,8 @@ class StatisticsWindow:
         tree_frame.grid_rowconfigure(0, weight=1)
         tree_frame.grid_columnconfigure(0, weight=1)
         self.entree_tree.bind('<<TreeviewSelect>>', self.on_entree_select)
+        # Seules les lignes visibles sont créées ; vsb parcourt self.filtered_individuals
+        self.entree_view = VirtualTreeview(self.entree_tree, vsb, self._entree_values)
 
         # Panel droit pour détails individuels
         right_frame = ttk.LabelFrame(content_frame, text="Statistiques Détaillées", padding="10")
@@ -186,20 +443,113 @@ class StatisticsWindow:
         self.count_label.pack(side='right')
 
     def load_initial_data(self):
-        """Charge les données initiales depuis DataManager si disponible."""
+        """Charge les données depuis DataManager dans un thread de fond.
+
+        La fenêtre s'affiche aussitôt ; les lots d'individus construits par le thread
+        sont relevés via `root.after` et ajoutés progressivement aux tableaux.
+        """
+        self._load_generation += 1
+        repository = Repository()
         try:
-            # Utiliser la classe DataManager importée en haut du fichier
-            self.individuals = DataManager.load_all_individuals()
-            self.filtered_individuals = self.individuals.copy()
-            self.groups = DataManager.load_groups()
-            self.filtered_groups = self.groups.copy()
+            repository.reset(DataManager.load_notes())
         except Exception:
-            # Pas de DataManager disponible ou échec: on garde les listes vides
-            self.individuals = []
-            self.filtered_individuals = []
-            self.groups = []
-            self.filtered_groups = []
+            pass
+        self.use_repository(repository)
+        self.update_status("Chargement des données...")
+
+        results = queue.Queue()
+        threading.Thread(target=self._load_worker, args=(results,), daemon=True).start()
+        self.root.after(LOAD_POLL_MS, self._poll_loading, results, self._load_generation, 0)
 
+    @staticmethod
+    def _load_worker(results: queue.Queue):
+        """Corps du thread de chargement : lit les fichiers et construit les individus, sans toucher à Tk."""
+        try:
+            for batch, total in DataManager.iter_all_individuals():
+                results.put(('batch', batch, total))
+            results.put(('done', None, None))
+        except Exception as e:
+            results.put(('error', e, None))
+
+    def _poll_loading(self, results: queue.Queue, generation: int, loaded: int):
+        """Intègre les lots reçus du thread de chargement puis se replanifie jusqu'à la fin."""
+        if generation != self._load_generation:
+            # un chargement plus récent a pris le relais
+            return
+        status = None
+        total = None
+        received = loaded
+        for _ in range(LOAD_BATCHES_PER_POLL):
+            try:
+                kind, payload, total = results.get_nowait()
+            except queue.Empty:
+                break
+            if kind != 'batch':
+                status = kind
+                break
+            self.add_loaded_batch(payload)
+            loaded += len(payload)
+
+        if status == 'error':
+            # Échec du chargement : on garde des listes vides
+            self.use_repository(Repository())
+            self.update_status(f"Erreur de chargement: {payload}")
+            return
+        if loaded != received:
+            self.entree_view.refresh()
+            self.groupe_view.refresh()
+            self.update_counts()
+        if status == 'done':
+            if self._entree_unsorted:
+                self.populate_entree_table()
+            if self._groupe_unsorted:
+                self.populate_groupe_table()
+            self.update_entree_group_filter()
+            self.update_comparison_entities()
+            self.update_leaderboard_criteria()
+            self.refresh_leaderboard()
+            self.update_status("Données actualisées")
+            return
+        if loaded != received:
+            progress = f"{loaded}/{total}" if total else f"{loaded}"
+            self.update_status(f"Chargement des données... {progress} entrées")
+        self.root.after(LOAD_POLL_MS, self._poll_loading, results, generation, loaded)
+
+    def add_loaded_batch(self, batch):
+        """Ajoute au dépôt et aux listes filtrées un lot d'individus venant d'être chargé."""
+        nb_groups = len(self.repository.groups)
+        self.repository.extend(batch)
+        self.stats_cache.invalidate()
+        matching = [ind for ind in batch if self.entree_matches_filters(ind)]
+        self.filtered_individuals.extend(matching)
+        if self._last_search:
+            # le résultat de la recherche en cours est complété avec les entrées du lot
+            self.search_results.extend(self.repository.search(self._last_search[0], batch))
+        term = self.groupe_search_var.get().lower()
+        self.filtered_groups.extend(g for g in self.repository.groups[nb_groups:] if term in g.nom.lower())
+        if self._entree_sort is not None:
+            self._entree_unsorted += len(matching)
+        if self._groupe_sort is not None:
+            self._groupe_unsorted = True
+        # Tri actif : nouveau tri dès que la fin non triée atteint la moitié de la liste
+        # (O(n log n) amorti sur tout le chargement), puis une dernière fois à la fin
+        if 2 * self._entree_unsorted > len(self.filtered_individuals):
+            self.populate_entree_table()
+            if self._groupe_unsorted:
+                self.populate_groupe_table()
+
+    def use_repository(self, repository: Repository):
+        """Affiche le contenu d'un dépôt et réinitialise listes filtrées et caches."""
+        self.repository = repository
+        self.individuals = repository.individuals
+        self.filtered_individuals = self.individuals.copy()
+        self.search_results = self.individuals
+        self._last_search = None
+        self.groups = repository.groups
+        self.filtered_groups = self.groups.copy()
+        # Matrice des notes partagée par tous les calculs statistiques
+        self.score_matrix = repository.matrix
+        self.stats_cache.invalidate()
         self.refresh_data()
 
     def refresh_data(self):
@@ -272,30 +622,176 @@ class StatisticsWindow:
             pass
 
     def populate_entree_table(self):
-        """Remplit le tableau des entrées avec self.filtered_individuals"""
-        for i in self.entree_tree.get_children():
-            self.entree_tree.delete(i)
-
-        for i, ind in enumerate(self.filtered_individuals, start=1):
-            data = ind.get_data() if hasattr(ind, 'get_data') else []
-            score = f"{(sum(data)/len(data)):.2f}" if data else "-"
-            date = getattr(ind, 'date', '')
-            statut = getattr(ind, 'status', '')
-            self.entree_tree.insert('', 'end', values=(i, ind.nom, ind.prenom, ind.groupe, score, date, statut))
+        """Remplit le tableau des entrées avec self.filtered_individuals (dans l'ordre du tri courant)"""
+        if self._entree_sort is not None:
+            self.filtered_individuals = self.sorted_entrees(self.filtered_individuals, *self._entree_sort)
+        self._entree_unsorted = 0
+        self.entree_view.set_items(self.filtered_individuals)
+
+    def _entree_values(self, i, ind):
+        """Valeurs affichées sur la ligne d'une entrée d'identifiant `i`."""
+        data = ind.get_data() if hasattr(ind, 'get_data') else []
+        score = f"{(sum(data)/len(data)):.2f}" if len(data) else "-"
+        date = getattr(ind, 'date', '')
+        statut = getattr(ind, 'status', '')
+        return (i, ind.nom, ind.prenom, ind.groupe, score, date, statut)
 
     def populate_groupe_table(self):
-        """Remplit le tableau des groupes avec self.filtered_groups"""
-        for i in self.groupe_tree.get_children():
-            self.groupe_tree.delete(i)
-
-        for i, group in enumerate(self.filtered_groups, start=1):
-            data = group.get_data() if hasattr(group, 'get_data') else []
-            moyenne = f"{np.mean(data):.2f}" if data else "-"
-            nb = len(data)
-            mini = f"{min(data):.2f}" if data else "-"
-            maxi = f"{max(data):.2f}" if data else "-"
-            ecart = f"{np.std(data):.2f}" if data else "-"
-            self.groupe_tree.insert('', 'end', values=(i, group.nom, nb, moyenne, mini, maxi, ecart))
+        """Remplit le tableau des groupes avec self.filtered_groups (dans l'ordre du tri courant)"""
+        if self._groupe_sort is not None:
+            self.filtered_groups = self.sorted_groupes(self.filtered_groups, *self._groupe_sort)
+        self._groupe_unsorted = False
+        self.groupe_view.set_items(self.filtered_groups)
+
+    def _groupe_values(self, i, group):
+        """Valeurs affichées sur la ligne d'un groupe d'identifiant `i`."""
+        st = self.get_group_stats(group.nom)
+        nb = len(group.members)
+        if st and st['count']:
+            total = st['count']
+            moyenne, mediane = f"{st['mean']:.2f}", f"{st['median']:.2f}"
+            mini, maxi, ecart = f"{st['min']:.2f}", f"{st['max']:.2f}", f"{st['std']:.2f}"
+        else:
+            total = 0
+            moyenne = mediane = mini = maxi = ecart = "-"
+        return (i, group.nom, nb, total, moyenne, mediane, mini, maxi, ecart)
+
+    def selected_entree(self):
+        """Retourne l'entrée sélectionnée dans le tableau, ou None."""
+        return self.entree_view.selected_item()
+
+    def selected_groupe(self):
+        """Retourne le groupe sélectionné dans le tableau, ou None."""
+        return self.groupe_view.selected_item()
+
+    def entree_matches_filters(self, ind):
+        """Indique si une entrée passe la recherche et le filtre de groupe courants."""
+        term = self.entree_search_var.get().casefold()
+        if term and not (term in ind.nom.casefold() or term in ind.prenom.casefold() or term in ind.groupe.casefold()):
+            return False
+        groupe_filter = self.entree_groupe_filter.get()
+        return not groupe_filter or groupe_filter == 'Tous' or ind.groupe == groupe_filter
+
+    def _entree_order_key(self, items):
+        """Clé et sens de l'ordre de la liste affichée `items`, ou None tant qu'elle n'est pas triée.
+
+        Les listes dans l'ordre d'affichage sont triées par uid ; la liste filtrée triée par
+        colonne l'est par `entree_sort_key`. Dans les deux cas les clés sont uniques.
+        """
+        if items is not self.filtered_individuals or self._entree_sort is None:
+            return self.repository.uid, False
+        if self._entree_unsorted:
+            return None
+        column, reverse = self._entree_sort
+        return self.entree_sort_key(column), reverse
+
+    def _entree_position(self, items, individual):
+        """Position d'une entrée dans une liste affichée, ou -1 (dichotomie en O(log n)).
+
+        Seule une liste en cours de chargement, pas encore triée, est parcourue.
+        """
+        order = self._entree_order_key(items)
+        if order is None:
+            return next((i for i, ind in enumerate(items) if ind is individual), -1)
+        return Main.locate(items, individual, *order)
+
+    def _insert_entree(self, items, individual):
+        """Insère une entrée absente d'une liste affichée à sa place dans l'ordre de cette liste."""
+        order = self._entree_order_key(items)
+        if order is None:
+            items.append(individual)
+            self._entree_unsorted += 1
+        else:
+            key, reverse = order
+            items.insert(Main.sorted_position(items, key, key(individual), reverse), individual)
+
+    def detach_entrees(self, individuals):
+        """Retire des listes affichées des entrées encore présentes dans le dépôt.
+
+        À appeler avant de modifier, supprimer ou fusionner ces entrées : leur uid et leurs
+        données courantes servent à les situer dans les listes.
+        """
+        for ind in individuals:
+            lists = [self.filtered_individuals]
+            if self.search_results is not self.individuals:
+                lists.append(self.search_results)
+            for items in lists:
+                position = self._entree_position(items, ind)
+                if position >= 0:
+                    del items[position]
+
+    def attach_entrees(self, individuals):
+        """Remet dans les listes affichées les entrées du dépôt qui passent les filtres courants."""
+        for ind in individuals:
+            if not self.entree_matches_filters(ind):
+                continue
+            if self._entree_position(self.filtered_individuals, ind) < 0:
+                self._insert_entree(self.filtered_individuals, ind)
+            if self.search_results is not self.individuals and self._entree_position(self.search_results, ind) < 0:
+                self._insert_entree(self.search_results, ind)
+
+    def apply_entree_change(self, individual, groups, removed=(), deleted=False):
+        """Répercute l'ajout, la modification ou la suppression d'une seule entrée.
+
+        Les entrées modifiées, supprimées ou fusionnées (`removed`) ont été retirées des listes
+        par `detach_entrees` avant l'écriture ; l'entrée enregistrée y est replacée par
+        dichotomie, à sa place dans le tri courant. Seuls les caches de l'entrée et des
+        groupes `groups` sont oubliés, les groupes sont triés de nouveau si un tri est actif,
+        puis les lignes visibles des deux tableaux et le classement sont redessinés.
+        """
+        gone = list(removed) + ([individual] if deleted else [])
+        stale = [('national',), ('values',), ('note_means',), ('individual', individual)]
+        stale += [('individual', ind) for ind in removed]
+        stale += [('group', g) for g in groups]
+        stale += [('entree_order', c) for c in ENTREE_SORT_COLUMNS]
+        stale += [('groupe_order', c) for c in GROUPE_SORT_COLUMNS]
+        self.stats_cache.advance(DataManager.version, stale)
+
+        # Le résultat mémorisé ne peut plus servir de base à une recherche affinée
+        self._last_search = None
+        for ind in gone:
+            if self.entree_view.selected is ind:
+                self.entree_view.selected = None
+        if not deleted:
+            self.attach_entrees([individual])
+
+        group_list_changed = False
+        for nom in groups:
+            group = self.repository.find_group(nom)
+            if group is None:
+                # groupe vidé (rare) : son uid n'existe plus, la liste est parcourue
+                stale_groups = [g for g in self.filtered_groups if g.nom == nom]
+                for g in stale_groups:
+                    self.filtered_groups.remove(g)
+                group_list_changed = True
+            elif self._groupe_position(group) < 0:
+                if self._groupe_sort is None:
+                    key = self.repository.group_uid
+                    self.filtered_groups.insert(Main.sorted_position(self.filtered_groups, key, key(group)), group)
+                else:
+                    self.filtered_groups.append(group)
+                group_list_changed = True
+        if group_list_changed:
+            self.update_entree_group_filter()
+        if self._groupe_sort is not None:
+            # les statistiques des groupes touchés ont changé : peu de groupes, nouveau tri
+            self.filtered_groups = self.sorted_groupes(self.filtered_groups, *self._groupe_sort)
+            self._groupe_unsorted = False
+            self.groupe_view.items = self.filtered_groups
+
+        # Forcer le réaffichage des détails lorsque la sélection est re-posée
+        self._displayed_entree = None
+        self._displayed_groupe = None
+        self.entree_view.refresh()
+        self.groupe_view.refresh()
+        self.update_counts()
+        self.refresh_leaderboard()
+
+    def _groupe_position(self, group):
+        """Position d'un groupe dans self.filtered_groups, ou -1 (dichotomie sur l'uid sans tri par colonne)."""
+        if self._groupe_sort is not None:
+            return next((i for i, g in enumerate(self.filtered_groups) if g is group), -1)
+        return Main.locate(self.filtered_groups, group, self.repository.group_uid)
 
     def search_entrees(self):
         term = self.entree_search_var.get().lower()
@@ -365,13 +861,11 @@ class StatisticsWindow:
         if not self.individuals:
             messagebox.showinfo("Info", "Aucune donnée disponible")
             return
-        all_data = []
-        for ind in self.individuals:
-            all_data.extend(ind.get_data() if hasattr(ind, 'get_data') else [])
-        if not all_data:
+        st = self.stats_cache.get(DataManager.version, ('national',), self.score_matrix.national_stats)
+        if not st:
             messagebox.showinfo("Info", "Aucune note enregistrée")
             return
-        stats = f"Moyenne: {np.mean(all_data):.2f} | Médiane: {np.median(all_data):.2f} | Écart-type: {np.std(all_data):.2f}"
+        stats = f"Moyenne: {st['mean']:.2f} | Médiane: {st['median']:.2f} | Écart-type: {st['std']:.2f}"
         messagebox.showinfo("Statistiques globales", stats)
 
     def compare_groups(self):
@@ -382,32 +876,15 @@ class StatisticsWindow:
 
     def get_national_average(self):
         """Calcule la moyenne de toutes les notes du système"""
-        all_data = []
-        for ind in self.individuals:
-            data = ind.get_data() if hasattr(ind, 'get_data') else []
-            all_data.extend(data)
-        return np.mean(all_data) if all_data else 0
+        stats = self.stats_cache.get(DataManager.version, ('national',), self.score_matrix.national_stats)
+        return stats['mean'] if stats else 0
 
     def get_national_stats(self):
         """Retourne les statistiques nationales complètes"""
-        all_data = []
-        for ind in self.individuals:
-            data = ind.get_data() if hasattr(ind, 'get_data') else []
-            all_data.extend(data)
-        
-        if not all_data:
+        stats = self.stats_cache.get(DataManager.version, ('national',), self.score_matrix.national_stats)
+        if not stats:
             return None
-        
-        stats = {
-            'mean': np.mean(all_data),
-            'median': np.median(all_data),
-            'std': np.std(all_data),
-            'min': min(all_data),
-            'max': max(all_data),
-            'q1': np.percentile(all_data, 25),
-            'q3': np.percentile(all_data, 75),
-            'count': len(all_data)
-        }
+        stats = dict(stats)
 
         # Si une moyenne nationale forcée est définie (override), l'utiliser
         if hasattr(self, 'national_override') and self.national_override is not None:
@@ -418,6 +895,23 @@ class StatisticsWindow:
 
         return stats
 
+    def get_groups_stats(self, names):
+        """Retourne {nom: statistiques} pour plusieurs groupes ; les absents du cache sont calculés en une passe."""
+        def compute(keys):
+            stats = self.score_matrix.group_stats([k[1] for k in keys])
+            return {('group', nom): st for nom, st in stats.items()}
+        cached = self.stats_cache.get_many(DataManager.version, [('group', n) for n in names], compute)
+        return {key[1]: st for key, st in cached.items()}
+
+    def get_group_stats(self, nom):
+        """Retourne les statistiques (mises en cache) d'un groupe, ou None."""
+        return self.get_groups_stats([nom]).get(nom)
+
+    def get_individual_stats(self, individual):
+        """Retourne les statistiques (mises en cache) d'un individu, ou None s'il n'a pas de notes."""
+        return self.stats_cache.get(DataManager.version, ('individual', individual),
+                                    lambda: Main.describe(individual.get_data()))
+
     def update_comparison_entities(self, *args):
         """Met à jour la liste des entités à comparer selon le type choisi"""
         entity_type = self.comp_type_var.get()
@@ -516,46 +1010,24 @@ class StatisticsWindow:
             messagebox.showerror("Erreur", "Entité non trouvée")
             return
         
-        # Calculer les stats de l'entité
-        entity_data = entity.get_data() if hasattr(entity, 'get_data') else []
-        if not entity_data:
+        # Calculer les stats de l'entité (mises en cache tant que les données ne changent pas)
+        if entity_type == "Individu":
+            entity_stats = self.get_individual_stats(entity)
+        else:
+            entity_stats = self.get_group_stats(entity.nom)
+        if not entity_stats or not entity_stats['count']:
             messagebox.showinfo("Info", "L'entité sélectionnée n'a pas de données")
             return
         
-        entity_stats = {
-            'mean': np.mean(entity_data),
-            'median': np.median(entity_data),
-            'std': np.std(entity_data),
-            'min': min(entity_data),
-            'max': max(entity_data),
-            'q1': np.percentile(entity_data, 25),
-            'q3': np.percentile(entity_data, 75),
-            'count': len(entity_data)
-        }
         # Préparer comparaison avec le groupe si l'entité est un individu
         group_stats = None
         grp_name = None
         if entity_type == "Individu":
             grp_name = getattr(entity, 'groupe', None)
             if grp_name:
-                group_obj = None
-                for g in self.groups:
-                    if getattr(g, 'nom', None) == grp_name:
-                        group_obj = g
-                        break
-                if group_obj:
-                    g_data = group_obj.get_data() if hasattr(group_obj, 'get_data') else []
-                    if g_data:
-                        group_stats = {
-                            'mean': np.mean(g_data),
-                            'median': np.median(g_data),
-                            'std': np.std(g_data),
-                            'min': min(g_data),
-                            'max': max(g_data),
-                            'q1': np.percentile(g_data, 25),
-                            'q3': np.percentile(g_data, 75),
-                            'count': len(g_data)
-                        }
+                group_stats = self.get_group_stats(grp_name)
+                if group_stats and not group_stats['count']:
+                    group_stats = None
         
         # Afficher les résultats
         self.comp_result_text.config(state='normal')
@@ -623,6 +1095,11 @@ class StatisticsWindow:
             else:
                 result += f"• {entity_name} performe COMME son groupe\n"
 
+        # Comparaison note par note (références nationales de notes.json)
+        by_note = self.get_note_comparison(entity)
+        if by_note is not None:
+            result += self.format_note_comparison(by_note)
+
         self.comp_result_text.insert('1.0', result)
         self.comp_result_text.config(state='disabled')
 
@@ -632,9 +1109,38 @@ class StatisticsWindow:
             'entity_stats': entity_stats,
             'national_stats': national_stats,
             'group_stats': group_stats,
-            'entity_type': entity_type
+            'entity_type': entity_type,
+            'by_note': by_note
         }
 
+    def get_note_comparison(self, entity):
+        """Retourne `Main.note_comparison` pour `entity` (moyennes par note mises en cache), ou None sans note définie."""
+        notes = getattr(self.repository, 'notes', None) or []
+        if not notes:
+            return None
+        means = self.stats_cache.get(DataManager.version, ('note_means',), self.score_matrix.note_means)
+        return Main.note_comparison(self.score_matrix, notes, entity, means)
+
+    @staticmethod
+    def format_note_comparison(by_note):
+        """Tableau texte de la comparaison note par note."""
+        def cell(value):
+            return f"{value:>9.2f}" if not np.isnan(value) else f"{'-':>9}"
+
+        with_group = by_note['group'] is not None
+        header = f"{'Note':<20} {'Entité':>9}" + (f" {'Groupe':>9}" if with_group else '')
+        header += f" {'Données':>9} {'National':>9} {'Écart nat.':>10}"
+        lines = ['', '', 'COMPARAISON PAR NOTE:', header, '-' * len(header)]
+        gap = by_note['entity'] - by_note['national']
+        for i, name in enumerate(by_note['names']):
+            line = f"{str(name)[:20]:<20} {cell(by_note['entity'][i])}"
+            if with_group:
+                line += f" {cell(by_note['group'][i])}"
+            line += f" {cell(by_note['dataset'][i])} {cell(by_note['national'][i])} "
+            line += f"{gap[i]:>+10.2f}" if not np.isnan(gap[i]) else f"{'-':>10}"
+            lines.append(line)
+        return '\n'.join(lines) + '\n'
+
     def show_comparison_chart(self):
         """Affiche un graphique comparatif"""
         if not hasattr(self, 'last_comparison'):
@@ -682,9 +1188,7 @@ class StatisticsWindow:
             ax1.grid(True, alpha=0.3)
             
             # Graphique 2 : Distribution box plot
-            all_data = []
-            for ind in self.individuals:
-                all_data.extend(ind.get_data() if hasattr(ind, 'get_data') else [])
+            all_data = self.stats_cache.get(DataManager.version, ('values',), self.score_matrix.values)
             
             entity_obj = None
             if comp['entity_type'] == "Individu":
@@ -711,6 +1215,28 @@ class StatisticsWindow:
                 ax2.grid(True, alpha=0.3)
             
             plt.tight_layout()
+
+            by_note = comp.get('by_note')
+            if by_note is not None and by_note['names']:
+                # Graphique 3 : barres groupées par note (entité, groupe, données, national)
+                series = [(comp['entity_name'], by_note['entity'], 'skyblue')]
+                if by_note['group'] is not None:
+                    series.append(('Groupe', by_note['group'], 'mediumseagreen'))
+                series += [('Jeu de données', by_note['dataset'], 'silver'),
+                           ('National (notes.json)', by_note['national'], 'coral')]
+                fig3, ax3 = plt.subplots(figsize=(max(8, 1.2 * len(by_note['names'])), 5))
+                x = np.arange(len(by_note['names']))
+                width = 0.8 / len(series)
+                for i, (label, values, color) in enumerate(series):
+                    ax3.bar(x - 0.4 + width * (i + 0.5), np.nan_to_num(values), width, label=label, color=color)
+                ax3.set_xticks(x)
+                ax3.set_xticklabels(by_note['names'], rotation=45, ha='right')
+                ax3.set_ylabel('Moyenne')
+                ax3.set_title(f'Comparaison par note: {comp["entity_name"]}')
+                ax3.legend()
+                ax3.grid(True, alpha=0.3, axis='y')
+                fig3.tight_layout()
+
             plt.show()
             
         except Exception as e:
@@ -728,7 +1254,7 @@ class StatisticsWindow:
                 w.writerow(['Nom','Prénom','Groupe','NbNotes','Moyenne'])
                 for ind in self.individuals:
                     data = ind.get_data() if hasattr(ind, 'get_data') else []
-                    avg = f"{(sum(data)/len(data)):.2f}" if data else ''
+                    avg = f"{(sum(data)/len(data)):.2f}" if len(data) else ''
                     w.writerow([ind.nom, ind.prenom, getattr(ind,'groupe',''), len(data), avg])
             messagebox.showinfo('Succès', f'Statistiques exportées dans:\n{filename}')
         except Exception as e:
@@ -845,6 +1371,7 @@ class StatisticsWindow:
                     return
 
             sel = lb.curselection()
+            names_before = [it['name'] for it in norm]
             if sel:
                 idx = sel[0]
                 norm[idx]['name'] = name
@@ -858,7 +1385,13 @@ class StatisticsWindow:
                 try:
                     # confirmation visuelle et rafraîchissement
                     messagebox.showinfo('Succès', 'Notes enregistrées')
-                    self.load_initial_data()
+                    if [it['name'] for it in norm] == names_before:
+                        # seule une valeur nationale a changé : les notes des étudiants sont intactes
+                        self.repository.notes = DataManager.load_notes()
+                        self.stats_cache.advance(DataManager.version)
+                        self.update_leaderboard_criteria()
+                    else:
+                        self.load_initial_data()
                     self.update_comparison_entities()
                 except Exception:
                     pass
@@ -940,9 +1473,8 @@ class StatisticsWindow:
         hsb = ttk.Scrollbar(tree_frame, orient="horizontal")
         
         self.groupe_tree = ttk.Treeview(tree_frame, columns=columns, show='headings',
-                                        yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+                                        xscrollcommand=hsb.set)
         
-        vsb.config(command=self.groupe_tree.yview)
         hsb.config(command=self.groupe_tree.xview)
         
         column_config = {
@@ -970,6 +1502,8 @@ class StatisticsWindow:
         
         self.groupe_tree.bind('<<TreeviewSelect>>', self.on_groupe_select)
         self.groupe_tree.bind('<Double-1>', lambda e: self.show_groupe_details())
+        self.groupe_view = VirtualTreeview(self.groupe_tree, vsb, self._groupe_values,
+                                           prefetch=lambda groups: self.get_groups_stats([g.nom for g in groups]))
         
         # Frame droit - Statistiques groupe
         right_frame = ttk.LabelFrame(content_frame, text="Statistiques du Groupe", padding="10")
@@ -984,6 +1518,9 @@ class StatisticsWindow:
                                           font=('Arial', 10, 'italic'))
         self.groupe_info_label.pack(pady=20)
         
+        # Frame classement - meilleurs / moins bons étudiants
+        self.create_leaderboard_panel(groupe_frame)
+        
         # Frame inférieur - Actions
         action_frame = ttk.Frame(groupe_frame)
         action_frame.pack(fill='x', padx=5, pady=5)
@@ -997,6 +1534,79 @@ class StatisticsWindow:
         ttk.Button(action_frame, text="📄 Générer Rapport", 
                   command=self.generate_groupe_report).pack(side='right', padx=5)
         
+    def create_leaderboard_panel(self, parent):
+        """Crée le panneau de classement (k meilleurs ou moins bons, par moyenne ou par note)"""
+        board_frame = ttk.LabelFrame(parent, text="Classement", padding="5")
+        board_frame.pack(fill='x', padx=5, pady=5)
+        
+        controls = ttk.Frame(board_frame)
+        controls.pack(fill='x')
+        
+        ttk.Label(controls, text="Critère:").pack(side='left', padx=5)
+        self.leaderboard_criterion = ttk.Combobox(controls, state='readonly', width=20, values=['Moyenne'])
+        self.leaderboard_criterion.current(0)
+        self.leaderboard_criterion.pack(side='left', padx=5)
+        self.leaderboard_criterion.bind('<<ComboboxSelected>>', lambda e: self.refresh_leaderboard())
+        
+        ttk.Label(controls, text="Portée:").pack(side='left', padx=5)
+        self.leaderboard_scope = ttk.Combobox(controls, state='readonly', width=18,
+                                              values=['Tous', 'Groupe sélectionné'])
+        self.leaderboard_scope.current(0)
+        self.leaderboard_scope.pack(side='left', padx=5)
+        self.leaderboard_scope.bind('<<ComboboxSelected>>', lambda e: self.refresh_leaderboard())
+        
+        self.leaderboard_lowest = tk.BooleanVar(value=False)
+        ttk.Radiobutton(controls, text="Meilleurs", variable=self.leaderboard_lowest, value=False,
+                        command=self.refresh_leaderboard).pack(side='left', padx=5)
+        ttk.Radiobutton(controls, text="Moins bons", variable=self.leaderboard_lowest, value=True,
+                        command=self.refresh_leaderboard).pack(side='left', padx=5)
+        
+        ttk.Label(controls, text="Nombre:").pack(side='left', padx=5)
+        self.leaderboard_k = tk.IntVar(value=LEADERBOARD_SIZE)
+        ttk.Spinbox(controls, from_=1, to=100, width=5, textvariable=self.leaderboard_k,
+                    command=self.refresh_leaderboard).pack(side='left', padx=5)
+        ttk.Button(controls, text="🔄 Actualiser", command=self.refresh_leaderboard).pack(side='left', padx=5)
+        
+        columns = ('Rang', 'Nom', 'Prénom', 'Groupe', 'Valeur')
+        self.leaderboard_tree = ttk.Treeview(board_frame, columns=columns, show='headings', height=6)
+        for col in columns:
+            self.leaderboard_tree.heading(col, text=col)
+            self.leaderboard_tree.column(col, width=60 if col in ('Rang', 'Valeur') else 120, anchor='center')
+        self.leaderboard_tree.pack(fill='x', pady=(5, 0))
+    
+    def update_leaderboard_criteria(self):
+        """Met à jour la liste des critères du classement (moyenne puis chaque note de notes.json)"""
+        notes = getattr(self.repository, 'notes', None) or []
+        names = [n.get('name') if isinstance(n, dict) else str(n) for n in notes]
+        self.leaderboard_criterion['values'] = ['Moyenne'] + names
+        if self.leaderboard_criterion.current() < 0 or self.leaderboard_criterion.current() > len(names):
+            self.leaderboard_criterion.current(0)
+    
+    def get_leaderboard(self, k, lowest=False, note=None, group=None):
+        """Retourne `ScoreMatrix.leaderboard` : k couples (individu, valeur) sans tri complet"""
+        return self.score_matrix.leaderboard(k, lowest=lowest, note=note, group=group)
+    
+    def refresh_leaderboard(self):
+        """Recalcule et affiche le classement selon les critères du panneau"""
+        if not hasattr(self, 'leaderboard_tree'):
+            return
+        self.leaderboard_tree.delete(*self.leaderboard_tree.get_children())
+        group = None
+        if self.leaderboard_scope.get() == 'Groupe sélectionné':
+            selected = self.selected_groupe()
+            if selected is None:
+                return
+            group = selected.nom
+        try:
+            k = max(1, int(self.leaderboard_k.get()))
+        except (tk.TclError, ValueError):
+            k = LEADERBOARD_SIZE
+        criterion = self.leaderboard_criterion.current()
+        note = criterion - 1 if criterion > 0 else None
+        board = self.get_leaderboard(k, lowest=self.leaderboard_lowest.get(), note=note, group=group)
+        for rank, (ind, value) in enumerate(board, start=1):
+            self.leaderboard_tree.insert('', 'end', values=(rank, ind.nom, ind.prenom, ind.groupe, f"{value:.2f}"))
+    
     def create_comparison_tab(self):
         comp_frame = ttk.Frame(self.notebook)
         self.notebook.add(comp_frame, text="Comparaisons")
@@ -1041,19 +1651,26 @@ class StatisticsWindow:
     # MÉTHODES DE RECHERCHE ET FILTRAGE
     # ============================================================================
     
+    def schedule_entree_search(self):
+        """Relance la recherche SEARCH_DEBOUNCE_MS après la dernière frappe."""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DEBOUNCE_MS, self.search_entrees)
+
     def search_entrees(self):
         """Recherche dans les entrées individuelles"""
-        search_term = self.entree_search_var.get().lower()
+        self._search_job = None
+        search_term = self.entree_search_var.get().casefold()
         
         if not search_term:
-            self.filtered_individuals = self.individuals.copy()
+            self.search_results = self.individuals
         else:
-            self.filtered_individuals = [
-                ind for ind in self.individuals
-                if search_term in ind.nom.lower() 
-                or search_term in ind.prenom.lower()
-                or search_term in ind.groupe.lower()
-            ]
+            # Un terme affiné ne peut que réduire le résultat précédent
+            within = None
+            if self._last_search and self._last_search[0] in search_term:
+                within = self._last_search[1]
+            self.search_results = self.repository.search(search_term, within)
+        self._last_search = (search_term, self.search_results) if search_term else None
         
         self.apply_entree_filters()
         
@@ -1074,7 +1691,7 @@ class StatisticsWindow:
     def apply_entree_filters(self):
         """Applique les filtres sur les entrées"""
         # Commencer avec les résultats de recherche
-        filtered = self.filtered_individuals.copy()
+        filtered = self.search_results.copy()
         
         # Appliquer le filtre de groupe
         groupe_filter = self.entree_groupe_filter.get()
@@ -1088,17 +1705,118 @@ class StatisticsWindow:
         """Réinitialise tous les filtres"""
         self.entree_search_var.set("")
         self.entree_groupe_filter.set('Tous')
+        self.search_results = self.individuals
+        self._last_search = None
         self.filtered_individuals = self.individuals.copy()
         self.populate_entree_table()
         
     def sort_entrees(self, column):
-        """Trie les entrées par colonne (à implémenter si nécessaire)"""
-        # Implémentation optionnelle du tri
-        pass
+        """Trie les entrées par colonne ; un nouveau clic sur la même colonne inverse l'ordre.
+
+        'ID' rétablit l'ordre de chargement.
+        """
+        previous = self._entree_sort
+        if column not in ENTREE_SORT_COLUMNS:
+            self._entree_sort = None
+            self.apply_entree_filters()
+        elif previous is not None and previous[0] == column:
+            # même colonne : inversion de la permutation courante, sans nouveau tri
+            self._entree_sort = (column, not previous[1])
+            if self._entree_unsorted:
+                self.populate_entree_table()
+            else:
+                self.filtered_individuals.reverse()
+                self.entree_view.set_items(self.filtered_individuals)
+        else:
+            self._entree_sort = (column, False)
+            self.populate_entree_table()
+        self.update_sort_headings(self.entree_tree, previous, self._entree_sort)
         
     def sort_groupes(self, column):
-        """Trie les groupes par colonne (à implémenter si nécessaire)"""
-        pass
+        """Trie les groupes par colonne ; un nouveau clic sur la même colonne inverse l'ordre.
+
+        'ID' rétablit l'ordre de chargement.
+        """
+        previous = self._groupe_sort
+        if column not in GROUPE_SORT_COLUMNS:
+            self._groupe_sort = None
+            self.search_groupes()
+        elif previous is not None and previous[0] == column:
+            self._groupe_sort = (column, not previous[1])
+            if self._groupe_unsorted:
+                self.populate_groupe_table()
+            else:
+                self.filtered_groups.reverse()
+                self.groupe_view.set_items(self.filtered_groups)
+        else:
+            self._groupe_sort = (column, False)
+            self.populate_groupe_table()
+        self.update_sort_headings(self.groupe_tree, previous, self._groupe_sort)
+    
+    @staticmethod
+    def update_sort_headings(tree, previous, current):
+        """Indique la colonne et le sens du tri courant dans les en-têtes du tableau"""
+        if previous is not None:
+            tree.heading(previous[0], text=previous[0])
+        if current is not None:
+            tree.heading(current[0], text=f"{current[0]} {'▼' if current[1] else '▲'}")
+    
+    def entree_sort_key(self, column):
+        """Clé de tri d'une entrée pour `column`, dans le même ordre que `get_entree_order`.
+
+        L'uid départage les égalités : une liste triée se parcourt par dichotomie.
+        """
+        uid = self.repository.uid
+        if column == 'Score':
+            matrix = self.score_matrix
+
+            def key(ind):
+                mean = float(matrix.row_means(matrix.rows_of([ind]))[0])
+                # sans note : en dernier, comme NaN dans le tri numpy
+                return (True, 0.0, uid(ind)) if np.isnan(mean) else (False, mean, uid(ind))
+            return key
+        attribute = ENTREE_SORT_ATTRIBUTES[column]
+        return lambda ind: (str(getattr(ind, attribute, '')).casefold(), uid(ind))
+
+    def get_entree_order(self, column):
+        """Rang de chaque ligne de la matrice des notes pour `column` (calculé une fois par version des données)"""
+        def compute():
+            uids = np.array([self.repository.uid(ind) for ind in self.score_matrix.individuals], dtype=np.int64)
+            if column == 'Score':
+                means = self.score_matrix.row_means()
+                missing = np.isnan(means)
+                return Main.sort_ranks(missing, np.where(missing, 0.0, means), uids)
+            attribute = ENTREE_SORT_ATTRIBUTES[column]
+            keys = np.array([str(getattr(ind, attribute, '')).casefold()
+                             for ind in self.score_matrix.individuals])
+            return Main.sort_ranks(keys, uids)
+        return self.stats_cache.get(DataManager.version, ('entree_order', column), compute)
+    
+    def get_groupe_order(self, column):
+        """Rang de chaque groupe et position de chacun dans self.groups pour `column` (calculés une fois par version)"""
+        def compute():
+            if column == 'Nom Groupe':
+                keys = np.array([g.nom.casefold() for g in self.groups])
+            elif column == 'Nb Membres':
+                keys = np.array([len(g.members) for g in self.groups])
+            else:
+                stats = self.get_groups_stats([g.nom for g in self.groups])
+                field = GROUPE_SORT_STATS[column]
+                keys = np.array([stats[g.nom][field] if stats.get(g.nom) else np.nan for g in self.groups],
+                                dtype=np.float64)
+            return Main.sort_ranks(keys), {g: i for i, g in enumerate(self.groups)}
+        return self.stats_cache.get(DataManager.version, ('groupe_order', column), compute)
+    
+    def sorted_entrees(self, individuals, column, reverse=False):
+        """Retourne `individuals` trié par `column` à partir des rangs mis en cache"""
+        ranks = self.get_entree_order(column)
+        return Main.sorted_by_rank(individuals, self.score_matrix.rows_of(individuals), ranks, reverse)
+    
+    def sorted_groupes(self, groups, column, reverse=False):
+        """Retourne `groups` trié par `column` à partir des rangs mis en cache"""
+        ranks, positions = self.get_groupe_order(column)
+        indices = np.fromiter((positions[g] for g in groups), dtype=np.int64, count=len(groups))
+        return Main.sorted_by_rank(groups, indices, ranks, reverse)
     
     # ============================================================================
     # ÉVÉNEMENTS DE SÉLECTION
@@ -1106,16 +1824,9 @@ class StatisticsWindow:
     
     def on_entree_select(self, event):
         """Gère la sélection d'une entrée dans le tableau"""
-        selection = self.entree_tree.selection()
-        if not selection:
-            return
-        
-        # Récupérer l'index de la ligne sélectionnée
-        item = self.entree_tree.item(selection[0])
-        index = int(item['values'][0]) - 1  # ID commence à 1
-        
-        if 0 <= index < len(self.filtered_individuals):
-            individual = self.filtered_individuals[index]
+        individual = self.selected_entree()
+        if individual is not None and individual is not self._displayed_entree:
+            self._displayed_entree = individual
             self.display_entree_info(individual)
     
     def display_entree_info(self, individual):
@@ -1138,15 +1849,19 @@ class StatisticsWindow:
         ttk.Label(info_frame, text=f"Groupe: {individual.groupe}").pack(anchor='w', padx=10)
         
         data = individual.get_data()
-        if data:
+        stats = self.get_individual_stats(individual)
+        if stats:
             ttk.Separator(info_frame, orient='horizontal').pack(fill='x', pady=10)
             
             ttk.Label(info_frame, text="Statistiques:", font=('Arial', 10, 'bold')).pack(anchor='w', padx=10)
-            ttk.Label(info_frame, text=f"Nombre de notes: {len(data)}").pack(anchor='w', padx=10)
-            ttk.Label(info_frame, text=f"Moyenne: {sum(data)/len(data):.2f}").pack(anchor='w', padx=10)
-            ttk.Label(info_frame, text=f"Minimum: {min(data):.2f}").pack(anchor='w', padx=10)
-            ttk.Label(info_frame, text=f"Maximum: {max(data):.2f}").pack(anchor='w', padx=10)
-            ttk.Label(info_frame, text=f"Écart-type: {np.std(data):.2f}").pack(anchor='w', padx=10)
+            ttk.Label(info_frame, text=f"Nombre de notes: {stats['count']}").pack(anchor='w', padx=10)
+            ttk.Label(info_frame, text=f"Moyenne: {stats['mean']:.2f}").pack(anchor='w', padx=10)
+            ttk.Label(info_frame, text=f"Minimum: {stats['min']:.2f}").pack(anchor='w', padx=10)
+            ttk.Label(info_frame, text=f"Maximum: {stats['max']:.2f}").pack(anchor='w', padx=10)
+            ttk.Label(info_frame, text=f"Écart-type: {stats['std']:.2f}").pack(anchor='w', padx=10)
+            standing = self.format_standing(individual)
+            if standing:
+                ttk.Label(info_frame, text=standing, wraplength=250).pack(anchor='w', padx=10)
             
             ttk.Separator(info_frame, orient='horizontal').pack(fill='x', pady=10)
             
@@ -1157,18 +1872,27 @@ class StatisticsWindow:
         else:
             ttk.Label(info_frame, text="Aucune note enregistrée").pack(anchor='w', padx=10, pady=10)
     
+    def format_standing(self, individual):
+        """Classement de la moyenne d'une entrée dans son groupe et au niveau national (index des rangs)"""
+        standing = self.score_matrix.standing(individual)
+        if standing is None:
+            return None
+        parts = []
+        if standing['group']:
+            rank, total = standing['group']
+            parts.append(f"top {100 * rank / total:.0f}% de {individual.groupe} (rang {rank}/{total})")
+        rank, total = standing['national']
+        parts.append(f"top {100 * rank / total:.0f}% au niveau national (rang {rank}/{total})")
+        return "Classement: " + ", ".join(parts)
+    
     def on_groupe_select(self, event):
         """Gère la sélection d'un groupe dans le tableau"""
-        selection = self.groupe_tree.selection()
-        if not selection:
-            return
-        
-        item = self.groupe_tree.item(selection[0])
-        index = int(item['values'][0]) - 1
-        
-        if 0 <= index < len(self.filtered_groups):
-            group = self.filtered_groups[index]
+        group = self.selected_groupe()
+        if group is not None and group is not self._displayed_groupe:
+            self._displayed_groupe = group
             self.display_groupe_info(group)
+            if self.leaderboard_scope.get() == 'Groupe sélectionné':
+                self.refresh_leaderboard()
     
     def display_groupe_info(self, group):
         """Affiche les informations détaillées d'un groupe"""
@@ -1201,13 +1925,13 @@ class StatisticsWindow:
             ttk.Label(members_frame, text=f"... et {len(group.members) - 10} autre(s)").pack(anchor='w')
         
         # Statistiques globales
-        data = group.get_data()
-        if data:
+        stats = group.statistiques()
+        if stats:
             ttk.Separator(info_frame, orient='horizontal').pack(fill='x', pady=10)
             ttk.Label(info_frame, text="Statistiques:", font=('Arial', 10, 'bold')).pack(anchor='w', padx=10)
-            ttk.Label(info_frame, text=f"Total de notes: {len(data)}").pack(anchor='w', padx=10)
-            ttk.Label(info_frame, text=f"Moyenne: {group.moyenne():.2f}").pack(anchor='w', padx=10)
-            ttk.Label(info_frame, text=f"Médiane: {group.mediane():.2f}").pack(anchor='w', padx=10)
+            ttk.Label(info_frame, text=f"Total de notes: {stats['count']}").pack(anchor='w', padx=10)
+            ttk.Label(info_frame, text=f"Moyenne: {stats['mean']:.2f}").pack(anchor='w', padx=10)
+            ttk.Label(info_frame, text=f"Médiane: {stats['median']:.2f}").pack(anchor='w', padx=10)
     
     # ============================================================================
     # ACTIONS - CRUD ENTRÉES
@@ -1281,12 +2005,17 @@ class StatisticsWindow:
                         return
 
             student = {'nom': nom, 'prenom': prenom, 'groupe': groupe, 'scores': scores}
-            ok = DataManager.save_student(student)
-            if ok:
+            # un étudiant déjà présent est remplacé : il est retiré des listes le temps de l'écriture
+            existing = self.repository.find(nom, prenom)
+            changing = [existing] if existing is not None else []
+            self.detach_entrees(changing)
+            result = self.repository.save_student(student)
+            if result:
+                self.apply_entree_change(*result)
                 messagebox.showinfo('Succès', 'Étudiant enregistré')
                 dialog.destroy()
-                self.load_initial_data()
             else:
+                self.attach_entrees(changing)
                 status_lbl.config(text='Erreur lors de l\'enregistrement')
 
         btns = ttk.Frame(main_frame)
@@ -1298,18 +2027,11 @@ class StatisticsWindow:
     def edit_entree(self):
         """Modifie une entrée sélectionnée en affichant uniquement les champs de
         notes pré-définies."""
-        selection = self.entree_tree.selection()
-        if not selection:
+        individual = self.selected_entree()
+        if individual is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner une entrée à modifier")
             return
 
-        item = self.entree_tree.item(selection[0])
-        index = int(item['values'][0]) - 1
-        if index < 0 or index >= len(self.filtered_individuals):
-            messagebox.showerror("Erreur", "Entrée invalide")
-            return
-
-        individual = self.filtered_individuals[index]
         notes = DataManager.load_notes() or []
         if not notes:
             messagebox.showinfo("Info", "Aucune note définie. Utilisez Analyse → Gérer les notes pour en créer.")
@@ -1350,7 +2072,9 @@ class StatisticsWindow:
         score_vars = {}
         # Prefill using individual.scores if available, else map data by position
         scores_src = getattr(individual, 'scores', {}) or {}
-        data_list = getattr(individual, 'data', []) or []
+        data_list = getattr(individual, 'data', None)
+        if data_list is None:
+            data_list = []
 
         for i, n in enumerate(notes):
             name = n.get('name') if isinstance(n, dict) else str(n)
@@ -1386,19 +2110,20 @@ class StatisticsWindow:
                         return
 
             try:
-                # Supprimer l'ancienne entrée dans students.json si présente
-                try:
-                    DataManager.delete_student(individual.nom, individual.prenom)
-                except Exception:
-                    pass
-
+                # L'ancienne entrée est remplacée (ou supprimée si renommée) par le dépôt
                 student = {'nom': new_nom, 'prenom': new_prenom, 'groupe': new_groupe, 'scores': new_scores}
-                ok = DataManager.save_student(student)
-                if not ok:
+                # l'entrée (et celle dans laquelle elle serait fusionnée) quitte les listes le temps
+                # de l'écriture, puis y est replacée selon ses nouvelles données
+                existing = self.repository.find(new_nom, new_prenom)
+                changing = [individual] + ([existing] if existing is not None and existing is not individual else [])
+                self.detach_entrees(changing)
+                result = self.repository.save_student(student, previous=individual)
+                if not result:
+                    self.attach_entrees(changing)
                     status_lbl.config(text='Erreur lors de l\'enregistrement')
                     return
 
-                self.load_initial_data()
+                self.apply_entree_change(*result)
                 dialog.destroy()
                 messagebox.showinfo('Succès', 'Entrée modifiée avec succès!')
 
@@ -1412,19 +2137,11 @@ class StatisticsWindow:
         
     def delete_entree(self):
         """Supprime une entrée sélectionnée"""
-        selection = self.entree_tree.selection()
-        if not selection:
+        individual = self.selected_entree()
+        if individual is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner une entrée à supprimer")
             return
         
-        item = self.entree_tree.item(selection[0])
-        index = int(item['values'][0]) - 1
-        
-        if index < 0 or index >= len(self.filtered_individuals):
-            return
-        
-        individual = self.filtered_individuals[index]
-        
         # Confirmation
         response = messagebox.askyesno(
             "Confirmation",
@@ -1433,16 +2150,14 @@ class StatisticsWindow:
         
         if response:
             try:
-                # Essayer de supprimer depuis students.json, puis fallback CSV
+                # Supprimer depuis students.json (repli CSV) puis retirer la seule ligne concernée
+                self.detach_entrees([individual])
                 try:
-                    DataManager.delete_student(individual.nom, individual.prenom)
+                    groups = self.repository.delete(individual)
                 except Exception:
-                    try:
-                        DataManager.delete_individual(individual.nom, individual.prenom)
-                    except Exception:
-                        pass
-
-                self.refresh_data()
+                    self.attach_entrees([individual])
+                    raise
+                self.apply_entree_change(individual, groups, deleted=True)
                 self.update_status(f"Entrée supprimée: {individual.prenom} {individual.nom}")
                 messagebox.showinfo("Succès", "Entrée supprimée avec succès!")
             except Exception as e:
@@ -1454,20 +2169,12 @@ class StatisticsWindow:
     
     def show_entree_charts(self):
         """Affiche le graphique radar pour une entrée sélectionnée"""
-        selection = self.entree_tree.selection()
-        if not selection:
+        individual = self.selected_entree()
+        if individual is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner une entrée")
             return
         
-        item = self.entree_tree.item(selection[0])
-        index = int(item['values'][0]) - 1
-        
-        if index < 0 or index >= len(self.filtered_individuals):
-            return
-        
-        individual = self.filtered_individuals[index]
-        
-        if not individual.data:
+        if not len(individual.data):
             messagebox.showinfo("Info", "Aucune donnée à afficher pour cette entrée")
             return
         
@@ -1479,18 +2186,10 @@ class StatisticsWindow:
     
     def show_groupe_distribution(self):
         """Affiche la distribution des notes d'un groupe"""
-        selection = self.groupe_tree.selection()
-        if not selection:
+        group = self.selected_groupe()
+        if group is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner un groupe")
             return
-        
-        item = self.groupe_tree.item(selection[0])
-        index = int(item['values'][0]) - 1
-        
-        if index < 0 or index >= len(self.filtered_groups):
-            return
-        
-        group = self.filtered_groups[index]
         data = group.get_data()
         
         if not data:
@@ -1523,19 +2222,11 @@ class StatisticsWindow:
     
     def show_groupe_radar(self):
         """Affiche le graphique radar pour un groupe"""
-        selection = self.groupe_tree.selection()
-        if not selection:
+        group = self.selected_groupe()
+        if group is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner un groupe")
             return
         
-        item = self.groupe_tree.item(selection[0])
-        index = int(item['values'][0]) - 1
-        
-        if index < 0 or index >= len(self.filtered_groups):
-            return
-        
-        group = self.filtered_groups[index]
-        
         if not group.get_data():
             messagebox.showinfo("Info", "Aucune donnée pour ce groupe")
             return
@@ -1548,19 +2239,11 @@ class StatisticsWindow:
     
     def show_groupe_details(self):
         """Affiche les détails complets d'un groupe dans une nouvelle fenêtre"""
-        selection = self.groupe_tree.selection()
-        if not selection:
+        group = self.selected_groupe()
+        if group is None:
             messagebox.showwarning("Attention", "Veuillez sélectionner un groupe")
             return
         
-        item = self.groupe_tree.item(selection[0])
-        index = int(item['values'][0]) - 1
-        
-        if index < 0 or index >= len(self.filtered_groups):
-            return
-        
-        group = self.filtered_groups[index]
-        
         # Créer une fenêtre de détails
         detail_window = tk.Toplevel(self.root)
         detail_window.resizable(False, False)
@@ -1604,9 +2287,9 @@ class StatisticsWindow:
         stats_frame = ttk.Frame(main_frame)
         stats_frame.pack(fill='x', pady=10)
         
-        data = group.get_data()
-        if data:
-            stats_text = f"Statistiques globales: Moyenne={group.moyenne():.2f} | Médiane={group.mediane():.2f} | Écart-type={np.std(data):.2f}"
+        stats = group.statistiques()
+        if stats:
+            stats_text = f"Statistiques globales: Moyenne={stats['mean']:.2f} | Médiane={stats['median']:.2f} | Écart-type={stats['std']:.2f}"
         else:
             stats_text = "Aucune donnée disponible"
         
@@ -1648,7 +2331,7 @@ class StatisticsWindow:
                     f.write(f"GROUPE: {ind.groupe}\n")
                     
                     data = ind.get_data()
-                    if data:
+                    if len(data):
                         f.write(f"Nombre de notes: {len(data)}\n")
                         f.write(f"Moyenne: {sum(data)/len(data):.2f}\n")
                         f.write(f"Min: {min(data):.2f} | Max: {max(data):.2f}\n")
@@ -1690,13 +2373,13 @@ class StatisticsWindow:
                     f.write(f"GROUPE: {group.nom}\n")
                     f.write(f"Nombre de membres: {len(group.members)}\n")
                     
-                    data = group.get_data()
-                    if data:
-                        f.write(f"Total de notes: {len(data)}\n")
-                        f.write(f"Moyenne: {group.moyenne():.2f}\n")
-                        f.write(f"Médiane: {group.mediane():.2f}\n")
-                        f.write(f"Min: {min(data):.2f} | Max: {max(data):.2f}\n")
-                        f.write(f"Écart-type: {np.std(data):.2f}\n")
+                    stats = group.statistiques()
+                    if stats:
+                        f.write(f"Total de notes: {stats['count']}\n")
+                        f.write(f"Moyenne: {stats['mean']:.2f}\n")
+                        f.write(f"Médiane: {stats['median']:.2f}\n")
+                        f.write(f"Min: {stats['min']:.2f} | Max: {stats['max']:.2f}\n")
+                        f.write(f"Écart-type: {stats['std']:.2f}\n")
                     
                     f.write("\nMembres:\n")
                     for member in group.members:
@@ -1713,12 +2396,8 @@ class StatisticsWindow:
             messagebox.showinfo("Info", "Aucune donnée disponible")
             return
         
-        # Collecter toutes les données
-        all_data = []
-        for ind in self.individuals:
-            all_data.extend(ind.get_data())
-        
-        if not all_data:
+        stats = self.stats_cache.get(DataManager.version, ('national',), self.score_matrix.national_stats)
+        if not stats:
             messagebox.showinfo("Info", "Aucune note enregistrée")
             return
         
@@ -1740,19 +2419,19 @@ class StatisticsWindow:
         stats_text = f"""
 Nombre total d'entrées: {len(self.individuals)}
 Nombre total de groupes: {len(self.groups)}
-Nombre total de notes: {len(all_data)}
+Nombre total de notes: {stats['count']}
 
 STATISTIQUES DES NOTES:
-Moyenne générale: {np.mean(all_data):.2f}
-Médiane: {np.median(all_data):.2f}
-Écart-type: {np.std(all_data):.2f}
-Minimum: {min(all_data):.2f}
-Maximum: {max(all_data):.2f}
+Moyenne générale: {stats['mean']:.2f}
+Médiane: {stats['median']:.2f}
+Écart-type: {stats['std']:.2f}
+Minimum: {stats['min']:.2f}
+Maximum: {stats['max']:.2f}
 
 Quartiles:
-  Q1 (25%): {np.percentile(all_data, 25):.2f}
-  Q2 (50%): {np.percentile(all_data, 50):.2f}
-  Q3 (75%): {np.percentile(all_data, 75):.2f}
+  Q1 (25%): {stats['q1']:.2f}
+  Q2 (50%): {stats['median']:.2f}
+  Q3 (75%): {stats['q3']:.2f}
         """
         
         text_widget = tk.Text(main_frame, height=15, width=50, font=('Courier', 10))
@@ -1777,10 +2456,10 @@ Quartiles:
             group_means = []
             
             for group in self.groups:
-                data = group.get_data()
-                if data:
+                stats = group.statistiques()
+                if stats:
                     group_names.append(group.nom)
-                    group_means.append(group.moyenne())
+                    group_means.append(stats['mean'])
             
             if not group_names:
                 messagebox.showinfo("Info", "Aucune donnée à comparer")
@@ -1845,24 +2524,44 @@ Quartiles:
                 writer = csv.writer(f)
                 writer.writerow(['Nom', 'Prénom', 'Groupe', 'Nb Notes', 'Moyenne', 'Min', 'Max', 'Écart-type'])
                 
-                for ind in self.individuals:
-                    data = ind.get_data()
-                    if data:
+                # statistiques de tous les individus en un seul tri
+                all_stats = Main.describe_batch([ind.get_data() for ind in self.individuals])
+                for ind, stats in zip(self.individuals, all_stats):
+                    if stats:
                         writer.writerow([
                             ind.nom,
                             ind.prenom,
                             ind.groupe,
-                            len(data),
-                            f"{sum(data)/len(data):.2f}",
-                            f"{min(data):.2f}",
-                            f"{max(data):.2f}",
-                            f"{np.std(data):.2f}"
+                            stats['count'],
+                            f"{stats['mean']:.2f}",
+                            f"{stats['min']:.2f}",
+                            f"{stats['max']:.2f}",
+                            f"{stats['std']:.2f}"
                         ])
             
             messagebox.showinfo("Succès", f"Statistiques exportées dans:\n{filename}")
             
         except Exception as e:
             messagebox.showerror("Erreur", f"Impossible d'exporter:\n{str(e)}")
+
+    def import_entrees(self):
+        """Importe en une seule écriture les entrées d'un fichier CSV (format de Bd.csv)"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Fichiers CSV", "*.csv"), ("Tous les fichiers", "*.*")],
+            title="Importer des entrées"
+        )
+        
+        if not filename:
+            return
+        
+        try:
+            count = DataManager.import_csv(filename)
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Impossible d'importer:\n{str(e)}")
+            return
+        
+        messagebox.showinfo("Succès", f"{count} entrées importées")
+        self.load_initial_data()
     
     # ============================================================================
     # MÉTHODES UTILITAIRES
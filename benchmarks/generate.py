@@ -0,0 +1,75 @@
+"""Générateur de jeux de données synthétiques pour les benchmarks de Quantiv.
+
+Écrit `notes.json`, `students.json` et `Bd.csv` dans un dossier, avec le même
+format que l'application. La graine rend les jeux de données reproductibles
+d'une exécution (et d'un commit) à l'autre.
+
+Exemple :
+    python benchmarks/generate.py --students 100000 --notes 20 --output /tmp/quantiv_100k
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+
+NOMS = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand",
+        "Leroy", "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "David"]
+PRENOMS = ["Jean", "Marie", "Pierre", "Sophie", "Lucas", "Emma", "Hugo", "Léa",
+           "Louis", "Chloé", "Nathan", "Manon", "Jules", "Camille", "Paul", "Inès"]
+
+# Nombre moyen d'étudiants par groupe
+GROUP_SIZE = 30
+
+
+def GenerateDataset(directory, nb_students, nb_notes, seed=0):
+    """Écrit un jeu de données de `nb_students` étudiants et `nb_notes` notes dans `directory`.
+
+    Les couples (nom, prénom) sont uniques ; les notes suivent une loi normale
+    centrée sur 12, bornée à [0, 20] et arrondie au demi-point.
+
+    Returns:
+        dict: Description du jeu de données (tailles, graine, dossier).
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    notes = [{"name": f"Note {i + 1}", "national": round(rng.uniform(8, 16), 2)} for i in range(nb_notes)]
+    names = [n["name"] for n in notes]
+    nb_groups = max(1, nb_students // GROUP_SIZE)
+
+    with open(os.path.join(directory, "notes.json"), 'w', encoding='utf-8') as f:
+        json.dump(notes, f, ensure_ascii=False, indent=2)
+
+    with open(os.path.join(directory, "students.json"), 'w', encoding='utf-8') as js, \
+            open(os.path.join(directory, "Bd.csv"), 'w', encoding='utf-8', newline='') as cs:
+        writer = csv.writer(cs)
+        writer.writerow(["Nom", "Prénom", "Groupe", "Données"])
+        # écriture en flux : le fichier JSON n'est jamais construit entièrement en mémoire
+        js.write("[\n")
+        for i in range(nb_students):
+            nom = f"{rng.choice(NOMS)}{i}"
+            prenom = rng.choice(PRENOMS)
+            groupe = f"G{rng.randrange(nb_groups):05d}"
+            values = [min(20.0, max(0.0, round(rng.gauss(12, 3.5) * 2) / 2)) for _ in names]
+            student = {"nom": nom, "prenom": prenom, "groupe": groupe, "scores": dict(zip(names, values))}
+            js.write((",\n" if i else "") + json.dumps(student, ensure_ascii=False))
+            writer.writerow([nom, prenom, groupe, ",".join(str(v) for v in values)])
+        js.write("\n]\n")
+
+    return {"students": nb_students, "notes": nb_notes, "groups": nb_groups, "seed": seed, "directory": directory}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un jeu de données synthétique pour Quantiv.")
+    parser.add_argument("--students", type=int, default=1000, help="nombre d'étudiants")
+    parser.add_argument("--notes", type=int, default=3, help="nombre de notes par étudiant")
+    parser.add_argument("--seed", type=int, default=0, help="graine du générateur")
+    parser.add_argument("--output", required=True, help="dossier de destination")
+    args = parser.parse_args()
+    print(GenerateDataset(args.output, args.students, args.notes, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Suite de benchmarks de Quantiv (DataManager, Stockcsv, statistiques, tableaux).
+
+Pour chaque cas « étudiants x notes », un jeu de données est généré avec
+`generate.GenerateDataset` dans un dossier temporaire, puis chaque opération est
+chronométrée (meilleur temps sur `--repeat` exécutions) ; la mémoire retenue par
+les individus chargés est mesurée avec `tracemalloc`. Les résultats sont écrits
+dans un fichier JSON daté et associé au commit courant, que `--compare` met en
+regard d'une exécution précédente.
+
+Exemples :
+    python benchmarks/run.py
+    python benchmarks/run.py --cases 1000x3 100000x20 1000000x3 --repeat 3
+    python benchmarks/run.py --compare benchmarks/results/ancien.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import DataManager as DataManagerModule
+import Main
+import Stockcsv
+import Stockdb
+from DataManager import DataManager, Repository
+from generate import GenerateDataset
+
+# Cas par défaut : de 1k à 1M étudiants, de 3 à 200 notes
+DEFAULT_CASES = ["1000x3", "1000x200", "100000x3", "100000x20", "100000x200", "1000000x3"]
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+# Lignes visibles simulées pour le remplissage des tableaux sans affichage
+VISIBLE_ROWS = 30
+
+
+class HeadlessTree:
+    """Remplaçant minimal d'un `ttk.Treeview` qui conserve les lignes en mémoire."""
+
+    def __init__(self):
+        self.rows = {}
+        self.order = []
+        self.selected = ()
+
+    def configure(self, **kwargs):
+        pass
+
+    def config(self, **kwargs):
+        pass
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def heading(self, *args, **kwargs):
+        pass
+
+    def set(self, *args):
+        pass
+
+    def get_children(self, item=''):
+        return tuple(self.order)
+
+    def delete(self, *items):
+        for iid in items:
+            del self.rows[iid]
+        self.order = [iid for iid in self.order if iid in self.rows]
+
+    def insert(self, parent, index, iid=None, values=()):
+        self.rows[iid] = tuple(values)
+        self.order.insert(len(self.order) if index == 'end' else index, iid)
+        return iid
+
+    def move(self, iid, parent, index):
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def item(self, iid, values=None):
+        if values is not None:
+            self.rows[iid] = tuple(values)
+        return {'values': list(self.rows[iid])}
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, iid):
+        self.selected = (iid,)
+
+    def focus(self, iid=None):
+        pass
+
+
+def headless_window(repository):
+    """Construit une `StatisticsWindow` sans Tk, reliée à des tableaux `HeadlessTree`."""
+    import Windows
+
+    class HeadlessView(Windows.VirtualTreeview):
+        def visible_rows(self):
+            return VISIBLE_ROWS
+
+    window = Windows.StatisticsWindow.__new__(Windows.StatisticsWindow)
+    window.repository = repository
+    window.individuals = repository.individuals
+    window.groups = repository.groups
+    window.filtered_individuals = repository.individuals.copy()
+    window.filtered_groups = repository.groups.copy()
+    window.search_results = repository.individuals
+    window.score_matrix = repository.matrix
+    window.stats_cache = Main.StatsCache()
+    window._entree_sort = None
+    window._groupe_sort = None
+    window.entree_view = HeadlessView(HeadlessTree(), HeadlessTree(), window._entree_values)
+    window.groupe_view = HeadlessView(HeadlessTree(), HeadlessTree(), window._groupe_values,
+                                      prefetch=lambda groups: window.get_groups_stats([g.nom for g in groups]))
+    window.entree_tree = window.entree_view.tree
+    window.groupe_tree = window.groupe_view.tree
+    return window
+
+
+def measure(function, repeat=1, setup=None):
+    """Retourne le meilleur temps (s) de `function` sur `repeat` exécutions, `setup` n'étant pas chronométré."""
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_memory(function):
+    """Retourne le résultat de `function` et les octets qu'il retient en mémoire une fois construit."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, retained
+
+
+def reset_state():
+    """Remet à zéro l'état des modules lié au jeu de données du dossier courant.
+
+    À appeler avant de quitter le dossier d'un cas : l'index du CSV est sauvegardé
+    à côté de son fichier puis oublié, la compaction du journal en cours est attendue,
+    les caches de DataManager et la connexion SQLite sont fermés.
+    """
+    Stockcsv.SaveIndex()
+    Stockcsv._index = None
+    thread = DataManagerModule._compaction_thread
+    if thread is not None:
+        thread.join()
+    DataManager.invalidate_cache()
+    Stockdb.Close()
+    gc.collect()
+
+
+def run_case(directory, nb_students, nb_notes, repeat, seed):
+    """Génère le jeu de données d'un cas puis chronomètre chaque opération."""
+    dataset = GenerateDataset(directory, nb_students, nb_notes, seed)
+    previous = os.getcwd()
+    use_sqlite = DataManagerModule.USE_SQLITE
+    use_snapshot = DataManagerModule.USE_SNAPSHOT
+    # DataManager et Stockcsv utilisent des chemins relatifs au dossier courant
+    os.chdir(directory)
+    DataManagerModule.USE_SQLITE = False
+    timings = {}
+    memory = {}
+    try:
+        # le cache des fichiers lus est vidé avant chaque mesure de chargement, et l'instantané
+        # binaire est désactivé : ces cas chronomètrent la lecture de students.json et de Bd.csv
+        uncached = DataManager.invalidate_cache
+        DataManagerModule.USE_SNAPSHOT = False
+        timings['load_all_individuals_json'] = measure(DataManager.load_all_individuals, repeat, setup=uncached)
+        timings['load_all_individuals_cached'] = measure(DataManager.load_all_individuals, repeat)
+
+        os.rename("students.json", "students.json.bak")
+        try:
+            timings['load_all_individuals_csv'] = measure(DataManager.load_all_individuals, repeat, setup=uncached)
+        finally:
+            os.rename("students.json.bak", "students.json")
+
+        timings['load_groups'] = measure(DataManager.load_groups, repeat, setup=uncached)
+
+        # mémoire des individus construits depuis students.json
+        DataManager.invalidate_cache()
+        loaded, retained = measure_memory(DataManager.load_all_individuals)
+        memory['individual_bytes_parsed'] = retained / max(1, len(loaded))
+        del loaded
+
+        # démarrage suivant : instantané écrit par un premier chargement, puis relu (mémoire projetée)
+        DataManagerModule.USE_SNAPSHOT = True
+        DataManager.invalidate_cache()
+        DataManager.load_all_individuals()
+        timings['load_all_individuals_snapshot'] = measure(DataManager.load_all_individuals, repeat,
+                                                           setup=uncached)
+
+        # individus relus depuis l'instantané : tracemalloc ne voit que leurs objets Python,
+        # leurs notes sont des vues sur le fichier projeté, compté à part
+        DataManager.invalidate_cache()
+        loaded, retained = measure_memory(DataManager.load_all_individuals)
+        count = max(1, len(loaded))
+        memory['individual_bytes_mapped'] = retained / count
+        memory['mapped_file_bytes'] = sum(
+            os.path.getsize(os.path.join(DataManagerModule.SNAPSHOT_DIR, name))
+            for name in os.listdir(DataManagerModule.SNAPSHOT_DIR) if name.startswith('scores-')) / count
+        del loaded
+
+        individuals = DataManager.load_all_individuals()
+        timings['score_matrix'] = measure(lambda: Main.ScoreMatrix(individuals), repeat)
+        matrix = Main.ScoreMatrix(individuals)
+        timings['national_stats'] = measure(matrix.national_stats, repeat)
+        timings['group_stats'] = measure(matrix.group_stats, repeat)
+        timings['leaderboard'] = measure(lambda: matrix.leaderboard(10), repeat)
+        mapped = Main.ScoreMatrix(individuals, directory=DataManagerModule.SCORES_MAP_DIR)
+        timings['national_stats_memmap'] = measure(mapped.national_stats, repeat)
+        timings['group_stats_memmap'] = measure(mapped.group_stats, repeat)
+
+        target = individuals[len(individuals) // 2]
+        student = {'nom': target.nom, 'prenom': target.prenom, 'groupe': target.groupe,
+                   'scores': {f"Note {i + 1}": 10.0 for i in range(nb_notes)}}
+        timings['save_student'] = measure(lambda: DataManager.save_student(student), repeat)
+
+        shutil.copyfile("Bd.csv", "Bd.csv.bak")
+        timings['csv_delete_entry'] = measure(lambda: Stockcsv.DeleteEntry(target.nom, target.prenom), repeat,
+                                              setup=lambda: shutil.copyfile("Bd.csv.bak", "Bd.csv"))
+
+        repository = Repository()
+        repository.load()
+        window = headless_window(repository)
+
+        def populate():
+            window.stats_cache.invalidate()
+            window.populate_groupe_table()
+            window.populate_entree_table()
+        timings['populate_tables'] = measure(populate, repeat)
+
+        def sort_entrees():
+            window._entree_sort = None
+            window.sort_entrees('Score')
+        # premier tri : clés et argsort calculés ; tri suivant : rangs en cache, puis inversion
+        timings['sort_entrees_build'] = measure(sort_entrees, 1, setup=window.stats_cache.invalidate)
+        timings['sort_entrees_cached'] = measure(sort_entrees, repeat)
+        timings['sort_entrees_toggle'] = measure(lambda: window.sort_entrees('Score'), repeat)
+        # l'index de recherche est construit à la première recherche : chronométré à part
+        timings['search_index_build'] = measure(lambda: repository.search(target.prenom[:3]), 1)
+        timings['search_entrees'] = measure(lambda: repository.search(target.prenom[:3]), repeat)
+    finally:
+        reset_state()
+        DataManagerModule.USE_SQLITE = use_sqlite
+        DataManagerModule.USE_SNAPSHOT = use_snapshot
+        os.chdir(previous)
+
+    dataset.pop('directory')
+    return {'dataset': dataset, 'timings': timings, 'memory': memory}
+
+
+def git_commit():
+    """Retourne le commit courant du dépôt, ou None hors d'un dépôt git."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_file):
+    """Affiche le rapport de temps entre une exécution précédente et `results` (cas et opérations communs)."""
+    with open(previous_file, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    before = {(c['dataset']['students'], c['dataset']['notes']): c['timings'] for c in previous['cases']}
+    before_memory = {(c['dataset']['students'], c['dataset']['notes']): c.get('memory', {}) for c in previous['cases']}
+    print(f"\nComparaison avec {previous.get('commit')} ({previous_file})")
+    for case in results['cases']:
+        key = (case['dataset']['students'], case['dataset']['notes'])
+        if key not in before:
+            continue
+        print(f"  {key[0]} étudiants x {key[1]} notes")
+        for name, seconds in case['timings'].items():
+            old = before[key].get(name)
+            if old:
+                print(f"    {name:<30} {old:10.4f}s -> {seconds:10.4f}s  (x{old / seconds:.2f})")
+        for name, size in case.get('memory', {}).items():
+            old = before_memory[key].get(name)
+            if old:
+                print(f"    {name:<30} {old:10.0f}B -> {size:10.0f}B  (x{old / size:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chronomètre le chargement, l'écriture et les statistiques de Quantiv.")
+    parser.add_argument("--cases", nargs='+', default=DEFAULT_CASES,
+                        help="cas à exécuter, sous la forme ETUDIANTSxNOTES (ex. 100000x20)")
+    parser.add_argument("--repeat", type=int, default=3, help="exécutions par opération (meilleur temps retenu)")
+    parser.add_argument("--seed", type=int, default=0, help="graine du générateur")
+    parser.add_argument("--output", help="fichier JSON des résultats (défaut : benchmarks/results/<date>-<commit>.json)")
+    parser.add_argument("--compare", help="fichier JSON d'une exécution précédente à comparer")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'cases': [],
+    }
+    for case in args.cases:
+        nb_students, nb_notes = (int(x) for x in case.lower().split('x'))
+        print(f"{nb_students} étudiants x {nb_notes} notes...")
+        with tempfile.TemporaryDirectory(prefix="quantiv_bench_") as directory:
+            result = run_case(directory, nb_students, nb_notes, args.repeat, args.seed)
+        for name, seconds in result['timings'].items():
+            print(f"  {name:<30} {seconds:10.4f}s")
+        for name, size in result['memory'].items():
+            print(f"  {name:<30} {size:10.0f}B")
+        results['cases'].append(result)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'local'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Résultats écrits dans {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Configuration commune des tests : modules de l'application importables, dossier de travail isolé."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import DataManager as DataManagerModule
+import Stockcsv
+import Stockdb
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Dossier courant vide ; index CSV, connexion SQLite et caches de DataManager remis à zéro."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(DataManagerModule, 'USE_SQLITE', False)
+    Stockdb.Close()
+    Stockcsv._index = None
+    DataManagerModule.DataManager.invalidate_cache()
+    yield tmp_path
+    Stockdb.Close()
+    Stockcsv._index = None
+    DataManagerModule.DataManager.invalidate_cache()
@@ -0,0 +1,193 @@
+import os
+import shutil
+import sqlite3
+
+import numpy as np
+import pytest
+
+import DataManager as DataManagerModule
+from DataManager import DataManager
+
+
+@pytest.fixture
+def sqlite_storage(workdir, monkeypatch):
+    monkeypatch.setattr(DataManagerModule, 'USE_SQLITE', True)
+    return workdir
+
+
+def test_sqlite_errors_during_migration_are_reported(sqlite_storage, monkeypatch):
+    def broken():
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(DataManager, 'migrate_to_sqlite', staticmethod(broken))
+
+    assert DataManager.save_student({'nom': 'Martin', 'prenom': 'Jean', 'groupe': '', 'scores': {}}) is False
+    assert DataManager.delete_student('Martin', 'Jean') is False
+
+    repository = make_repository(2)
+    individual = repository.individuals[0]
+    with pytest.raises(OSError):
+        repository.delete(individual)
+    assert repository.find(individual.nom, individual.prenom) is individual
+
+
+def make_repository(count=6):
+    from DataManager import Repository
+    from Main import Individual
+    repository = Repository()
+    repository.extend([Individual(f"N{i}", "P", f"G{i % 2}", [float(i)]) for i in range(count)])
+    return repository
+
+
+def test_repository_delete_keeps_display_order(workdir):
+    repository = make_repository()
+    for nom in ("N3", "N0", "N5"):
+        repository.delete(repository.find(nom, "P"))
+    assert [ind.nom for ind in repository.individuals] == ["N1", "N2", "N4"]
+    assert [repository.uid(ind) for ind in repository.individuals] == sorted(
+        repository.uid(ind) for ind in repository.individuals)
+
+
+def test_repository_removes_emptied_group_and_keeps_group_order(workdir):
+    repository = make_repository(4)
+    repository.save_student({'nom': 'Solo', 'prenom': 'P', 'groupe': 'G9', 'scores': {}})
+    assert [g.nom for g in repository.groups] == ["G0", "G1", "G9"]
+    for nom in ("N0", "N2"):
+        repository.delete(repository.find(nom, "P"))
+    assert [g.nom for g in repository.groups] == ["G1", "G9"]
+
+
+def test_repository_edit_in_same_group_keeps_group(workdir):
+    repository = make_repository(2)
+    solo = repository.find("N0", "P")
+    group = repository.find_group("G0")
+    target, touched, removed = repository.save_student({'nom': 'N0', 'prenom': 'P', 'groupe': 'G0', 'scores': {'a': 7.0}})
+    assert target is solo and touched == {"G0"} and removed == []
+    assert repository.find_group("G0") is group and group.members == [solo]
+    assert group.statistiques()['mean'] == 7.0
+
+
+def test_snapshot_rows_are_views_on_the_mapped_file(workdir):
+    from Main import Individual
+    individuals = [Individual("A", "P", "G", [1.0, 2.0]), Individual("B", "P", "G", [3.0])]
+    DataManager.write_snapshot({'csv': 1}, individuals)
+    loaded = DataManager.read_snapshot({'csv': 1})
+
+    assert [ind.data.tolist() for ind in loaded] == [[1.0, 2.0], [3.0]]
+    assert loaded[0].data.base is loaded[1].data.base and not loaded[0].data.flags.writeable
+    loaded[1].ajouter_donnée(4.0)
+    assert loaded[1].data.tolist() == [3.0, 4.0]
+    assert DataManager.read_snapshot({'csv': 2}) is None
+
+
+def saved_students():
+    return {(s['nom'], s['prenom']): s.get('scores') for s in DataManager.read_students_file()}
+
+
+def test_journal_replay_after_interrupted_write(workdir):
+    DataManager.save_student({'nom': 'A', 'prenom': 'P', 'groupe': '', 'scores': {'n': 1.0}})
+    with open(DataManagerModule.JOURNAL_FILE, 'a', encoding='utf-8') as f:
+        f.write('{"op": "upsert", "student": {"nom": "B"')
+    assert saved_students() == {('A', 'P'): {'n': 1.0}}
+
+    DataManager.save_student({'nom': 'C', 'prenom': 'P', 'groupe': '', 'scores': {}})
+    assert DataManager.delete_student('A', 'P') is True
+    assert saved_students() == {('C', 'P'): {}}
+
+
+def test_journal_replay_after_interrupted_compaction(workdir):
+    journal = DataManagerModule.JOURNAL_FILE
+    DataManager.save_student({'nom': 'A', 'prenom': 'P', 'groupe': '', 'scores': {'n': 1.0}})
+    DataManager.save_student({'nom': 'B', 'prenom': 'P', 'groupe': '', 'scores': {'n': 2.0}})
+    # arrêt juste après la mise de côté du journal : students.json n'existe pas encore
+    os.replace(journal, journal + '.compacting')
+    DataManager.save_student({'nom': 'A', 'prenom': 'P', 'groupe': '', 'scores': {'n': 3.0}})
+    DataManager.delete_student('B', 'P')
+    expected = {('A', 'P'): {'n': 3.0}}
+    assert saved_students() == expected
+
+    # la compaction suivante reprend le journal mis de côté, puis celui des écritures suivantes
+    DataManager.compact_journal()
+    assert saved_students() == expected
+    DataManager.compact_journal()
+    assert saved_students() == expected
+    assert not os.path.exists(journal) and not os.path.exists(journal + '.compacting')
+
+    # arrêt entre le remplacement de students.json et la suppression du journal compacté :
+    # le rejeu du journal déjà fusionné ne change rien
+    DataManager.save_student({'nom': 'D', 'prenom': 'P', 'groupe': '', 'scores': {}})
+    os.replace(journal, journal + '.compacting')
+    shutil.copy(journal + '.compacting', journal + '.kept')
+    DataManager.compact_journal()
+    os.replace(journal + '.kept', journal + '.compacting')
+    assert saved_students() == {('A', 'P'): {'n': 3.0}, ('D', 'P'): {}}
+
+
+@pytest.mark.parametrize('storage', ['memory', 'memmap'])
+def test_standings_follow_saves_and_deletes(workdir, monkeypatch, storage):
+    from Main import Individual, RankIndex
+    monkeypatch.setattr(DataManagerModule, 'SCORE_STORAGE', storage)
+    from DataManager import Repository
+    repository = Repository()
+    repository.extend([Individual(f"N{i}", "P", f"G{i % 3}", [float(i), float(i % 5)][:1 + i % 2])
+                       for i in range(12)])
+    matrix = repository.matrix
+    assert (matrix.directory is not None) == (storage == 'memmap')
+    assert matrix.standing(repository.find("N11", "P"))['national'] == (4, 12)
+
+    def check():
+        fresh = RankIndex.build(np.asarray(matrix.scores, dtype=np.float64), matrix.group_codes,
+                                matrix.group_names, matrix.individuals)
+        index = matrix.rank_index()
+        assert set(index._values) - set(fresh._values) <= {k for k, v in index._values.items() if not len(v)}
+        for key, values in fresh._values.items():
+            assert index._values[key].tolist() == values.tolist(), key
+            assert set(index._owners[key].tolist()) == set(fresh._owners[key].tolist()), key
+
+    save = lambda nom, groupe, scores, previous=None: repository.save_student(
+        {'nom': nom, 'prenom': 'P', 'groupe': groupe, 'scores': scores}, previous=previous)
+
+    top, _, _ = save("N4", "G1", {'a': 30.0})
+    assert matrix.standing(top)['national'] == (1, 12)
+    assert matrix.standing(top)['group'] == (1, 4)
+    check()
+    save("N0", "G9", {'a': 0.5, 'b': 0.5}, previous=repository.find("N0", "P"))
+    check()
+    save("N6", "G0", {'a': 1.0}, previous=repository.find("N5", "P"))
+    assert matrix.standing(repository.find("N6", "P"))['national'] == (9, 11)
+    check()
+    repository.delete(top)
+    assert matrix.standing(repository.find("N11", "P"))['national'] == (4, 10)
+    check()
+    save("New", "", {})
+    assert matrix.standing(repository.find("New", "P")) is None
+    check()
+
+
+def test_snapshot_switch_always_reads_the_sources(workdir, monkeypatch):
+    DataManager.save_student({'nom': 'A', 'prenom': 'P', 'groupe': '', 'scores': {'n': 1.0}})
+    monkeypatch.setattr(DataManagerModule, 'USE_SNAPSHOT', False)
+    assert [ind.nom for ind in DataManager.load_all_individuals()] == ['A']
+    assert not os.path.exists(DataManagerModule.SNAPSHOT_DIR)
+
+    monkeypatch.setattr(DataManagerModule, 'USE_SNAPSHOT', True)
+    DataManager.invalidate_cache()
+    DataManager.load_all_individuals()
+    assert os.path.isfile(os.path.join(DataManagerModule.SNAPSHOT_DIR, 'meta.json'))
+
+
+def test_repository_delete_from_csv_only_store(workdir):
+    import Stockcsv
+    from DataManager import Repository
+    Stockcsv.CreateCsv()
+    Stockcsv.AddEntry("Dupont", "Jean", "A1", "12,15")
+    Stockcsv.AddEntry("Martin", "Sophie", "B2", "14")
+    repository = Repository()
+    repository.load()
+    assert repository.delete(repository.find("Dupont", "Jean")) == {"A1"}
+    assert not DataManager.has_students()
+
+    DataManager.invalidate_cache()
+    reloaded = Repository()
+    reloaded.load()
+    assert [(ind.nom, ind.prenom) for ind in reloaded.individuals] == [("Martin", "Sophie")]
+    assert [r['Nom'] for r in Stockcsv.ReadCsv()] == ["Martin"]
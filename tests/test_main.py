@@ -0,0 +1,130 @@
+import numpy as np
+
+import Main
+
+
+def make(data=(12.0, 13.0, 12.0), names=('math', 'Fr', 'Arts')):
+    return Main.Individual('Martin', 'Jean', 'T01', list(data), dict(zip(names, data)))
+
+
+def test_scores_share_names_until_data_changes():
+    ind = make()
+    assert ind.note_names == ('math', 'Fr', 'Arts')
+    assert ind.scores == {'math': 12.0, 'Fr': 13.0, 'Arts': 12.0}
+
+
+def test_scores_unchanged_after_removing_a_value():
+    ind = make()
+    ind.supprimer_donnée(13.0)
+    assert list(ind.data) == [12.0, 12.0]
+    assert ind.scores == {'math': 12.0, 'Fr': 13.0, 'Arts': 12.0}
+    assert ind.note_names is None
+
+
+def test_scores_unchanged_after_adding_a_value():
+    ind = make()
+    ind.ajouter_donnée(9.0)
+    assert list(ind.data) == [12.0, 13.0, 12.0, 9.0]
+    assert ind.scores == {'math': 12.0, 'Fr': 13.0, 'Arts': 12.0}
+
+
+def test_scores_unchanged_after_assigning_data():
+    ind = make()
+    ind.data = [1.0, 2.0, 3.0]
+    assert ind.scores == {'math': 12.0, 'Fr': 13.0, 'Arts': 12.0}
+    # même valeurs (ex. vue sur une matrice projetée) : les noms restent partagés
+    other = make()
+    other.data = np.array([12.0, 13.0, 12.0])
+    assert other.note_names == ('math', 'Fr', 'Arts')
+
+
+def test_scores_unchanged_after_mutating_memmap_view():
+    ind = make()
+    ind.data = np.array([12.0, 13.0, 12.0])
+    ind.supprimer_donnée(13.0)
+    ind.ajouter_donnée(15.0)
+    assert ind.scores == {'math': 12.0, 'Fr': 13.0, 'Arts': 12.0}
+
+
+def test_segment_stats_exact_for_large_values():
+    values = np.array([1e9, 1e9 + 0.5, 3.0, 0.9999999999999999])
+    codes = np.array([0, 1, 2, 2])
+    stats = Main._segment_stats(values, codes, 3)
+    assert stats['max'].tolist() == [1e9, 1e9 + 0.5, 3.0]
+    assert stats['min'].tolist() == [1e9, 1e9 + 0.5, 0.9999999999999999]
+
+
+def test_segment_stats_matches_numpy_per_group():
+    rng = np.random.default_rng(0)
+    values = np.round(rng.normal(12, 3.5, 5000) * 2) / 2 + rng.uniform(0, 1e-6, 5000)
+    codes = rng.integers(0, 40, 5000)
+    stats = Main._segment_stats(values, codes, 41)
+    for code in range(40):
+        group = values[codes == code]
+        assert stats['min'][code] == group.min()
+        assert stats['max'][code] == group.max()
+        assert stats['median'][code] == np.median(group)
+        assert np.isclose(stats['q1'][code], np.percentile(group, 25), rtol=0, atol=1e-12)
+    assert stats['count'][40] == 0 and np.isnan(stats['mean'][40])
+
+
+def test_sort_ranks_breaks_ties_with_later_keys():
+    ranks = Main.sort_ranks(np.array(["b", "a", "b", "a"]), np.array([3, 2, 1, 0]))
+    assert ranks.tolist() == [3, 1, 2, 0]
+
+
+def test_locate_and_sorted_position_follow_reverse_order():
+    items = [9, 7, 4, 1]
+    assert Main.sorted_position(items, int, 5, reverse=True) == 2
+    assert Main.locate(items, 4, int, reverse=True) == 2
+    assert Main.locate(items, 5, int, reverse=True) == -1
+
+
+def rank_error(sketch, data, qs):
+    """Plus grand écart entre le rang visé et le rang de la valeur rendue par l'esquisse."""
+    ordered = np.sort(data)
+    errors = []
+    for q, value in zip(qs, sketch.quantiles(qs)):
+        lo = np.searchsorted(ordered, value, side='left') / len(ordered)
+        hi = np.searchsorted(ordered, value, side='right') / len(ordered)
+        errors.append(0.0 if lo <= q <= hi else min(abs(lo - q), abs(hi - q)))
+    return max(errors)
+
+
+def test_quantile_sketch_is_exact_below_limit():
+    data = np.random.default_rng(0).normal(12, 4, 5000)
+    sketch = Main.QuantileSketch(k=50, exact_limit=10_000, seed=0)
+    for chunk in np.array_split(data, 7):
+        sketch.update(chunk)
+    sketch.remove(data[:1000])
+    assert sketch.exact
+    assert sketch.quantiles([0.25, 0.5, 0.75]) == np.percentile(data[1000:], [25, 50, 75]).tolist()
+
+
+def test_quantile_sketch_error_within_bound():
+    k = 200
+    bound = 3.3 / k
+    qs = np.linspace(0.01, 0.99, 99)
+    data = np.random.default_rng(1).normal(12, 4, 200_000)
+
+    sketch = Main.QuantileSketch(k=k, exact_limit=1000, seed=1)
+    for chunk in np.array_split(data, 40):
+        sketch.update(chunk)
+    assert not sketch.exact
+    assert rank_error(sketch, data, qs) <= bound
+    # mémoire de l'ordre de 3k valeurs
+    assert len(sketch._weighted()[0]) <= 3 * k
+
+    left = Main.QuantileSketch(k=k, exact_limit=1000, seed=2)
+    right = Main.QuantileSketch(k=k, exact_limit=1000, seed=3)
+    for chunk in np.array_split(data[:120_000], 20):
+        left.update(chunk)
+    for chunk in np.array_split(data[120_000:], 20):
+        right.update(chunk)
+    left.merge(right)
+    assert left.count == len(data)
+    assert rank_error(left, data, qs) <= bound
+
+    sketch.remove(data[:50_000])
+    assert sketch.count == 150_000 and not sketch.needs_rebuild()
+    assert rank_error(sketch, data[50_000:], qs) <= bound
@@ -0,0 +1,80 @@
+import os
+
+import Stockcsv
+
+
+def names(rows):
+    return [(r['Nom'], r['Prénom']) for r in rows]
+
+
+def test_delete_then_reinsert(workdir):
+    Stockcsv.CreateCsv()
+    Stockcsv.AddEntry("Dupont", "Jean", "A1", "12,15,18")
+    Stockcsv.AddEntry("Martin", "Sophie", "B2", "14,16,17")
+    Stockcsv.DeleteEntry("Dupont", "Jean")
+    assert names(Stockcsv.ReadCsv()) == [("Martin", "Sophie")]
+    assert Stockcsv.SearchByName("Dupont", "Jean") == []
+
+    Stockcsv.AddEntry("Dupont", "Jean", "A2", "9")
+    assert names(Stockcsv.ReadCsv()) == [("Martin", "Sophie"), ("Dupont", "Jean")]
+    assert [r['Groupe'] for r in Stockcsv.SearchByName("dupont", "JEAN")] == ["A2"]
+
+
+def test_update_longer_row_moves_it_and_keeps_index(workdir):
+    Stockcsv.CreateCsv()
+    Stockcsv.AddEntry("Dupont", "Jean", "A1", "1")
+    Stockcsv.UpdateEntry("Dupont", "Jean", nouvelles_donnees="12,15,18,20")
+    assert [r['Données'] for r in Stockcsv.SearchByName("Dupont", "Jean")] == ["12,15,18,20"]
+    assert Stockcsv.LoadIndex()['tombstones'] == 1
+
+
+def test_update_shorter_row_keeps_fields_exact(workdir):
+    Stockcsv.CreateCsv()
+    Stockcsv.AddEntry("Dupont", "Jean", "A1", "12,15,18")
+    Stockcsv.AddEntry("Martin", "Sophie", "B2", "14")
+    Stockcsv.UpdateEntry("Dupont", "Jean", nouvelles_donnees="12,15")
+    Stockcsv.UpdateEntry("Martin", "Sophie", nouvelles_donnees="15")
+    assert [r['Données'] for r in Stockcsv.SearchByName("Dupont", "Jean")] == ["12,15"]
+    assert [r['Données'] for r in Stockcsv.SearchByGroupe("A1")] == ["12,15"]
+    assert {r['Nom']: r['Données'] for r in Stockcsv.ReadCsv()} == {"Dupont": "12,15", "Martin": "15"}
+    # même longueur : réécriture sur place, sans ligne effacée
+    assert Stockcsv.LoadIndex()['tombstones'] == 1
+
+
+def test_index_rebuilt_after_external_edit(workdir):
+    Stockcsv.CreateCsv()
+    Stockcsv.AddEntry("Dupont", "Jean", "A1", "1")
+    Stockcsv.SaveIndex()
+    with open("Bd.csv", 'a', encoding="utf-8", newline='') as f:
+        f.write("Petit,Léa,C3,5\r\n")
+    Stockcsv._index = None
+    assert names(Stockcsv.SearchByName("Petit", "Léa")) == [("Petit", "Léa")]
+
+
+def test_compaction_drops_tombstones(workdir, monkeypatch):
+    monkeypatch.setattr(Stockcsv, 'TOMBSTONE_COMPACT_MIN', 2)
+    Stockcsv.CreateCsv()
+    Stockcsv.AddEntries([(f"N{i}", "P", "G", "1") for i in range(4)])
+    Stockcsv.DeleteEntry("N0", "P")
+    Stockcsv.DeleteEntry("N1", "P")
+    index = Stockcsv.LoadIndex()
+    assert index['tombstones'] == 0 and index['rows'] == 2
+    with open("Bd.csv", encoding="utf-8") as f:
+        assert f.read().count("\n") == 3
+    assert names(Stockcsv.SearchByName("N3", "P")) == [("N3", "P")]
+
+
+def test_index_saved_next_to_its_csv(workdir, tmp_path_factory, monkeypatch):
+    Stockcsv.CreateCsv()
+    Stockcsv.AddEntry("Dupont", "Jean", "A1", "1")
+    other = tmp_path_factory.mktemp("other")
+    monkeypatch.chdir(other)
+    # changement de dossier : l'index du premier CSV est sauvegardé à côté de lui
+    assert Stockcsv.LoadIndex() is None
+    Stockcsv.SaveIndex()
+    assert os.path.isfile(workdir / ("Bd.csv" + Stockcsv.INDEX_SUFFIX))
+    assert not os.path.exists(other / ("Bd.csv" + Stockcsv.INDEX_SUFFIX))
+
+    monkeypatch.chdir(workdir)
+    assert Stockcsv.LoadIndex()['csv'] == str(workdir / "Bd.csv")
+    assert names(Stockcsv.SearchByName("Dupont", "Jean")) == [("Dupont", "Jean")]
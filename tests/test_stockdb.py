@@ -0,0 +1,21 @@
+import threading
+
+import Stockdb
+
+
+def test_connection_usable_from_another_thread(workdir):
+    """La connexion ouverte par le thread de chargement sert ensuite au thread principal."""
+    loaded = []
+    worker = threading.Thread(target=lambda: loaded.append(Stockdb.ReadStudents()))
+    worker.start()
+    worker.join()
+    assert loaded == [[]]
+
+    Stockdb.UpsertStudent({'nom': 'Martin', 'prenom': 'Jean', 'groupe': 'T01', 'scores': {'math': 12.0}})
+    Stockdb.DeleteStudent('Martin', 'Jean')
+    Stockdb.UpsertStudent({'nom': 'Petit', 'prenom': 'Léa', 'groupe': 'T02', 'scores': {}})
+
+    worker = threading.Thread(target=lambda: loaded.append(Stockdb.ReadStudents()))
+    worker.start()
+    worker.join()
+    assert [s['nom'] for s in loaded[-1]] == ['Petit']
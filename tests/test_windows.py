@@ -0,0 +1,254 @@
+import random
+
+import pytest
+
+import Main
+import Windows
+from DataManager import Repository
+from Main import Individual
+
+
+class FakeTree:
+    """Treeview minimal en mémoire : lignes, ordre et appels reçus."""
+
+    def __init__(self):
+        self.rows = {}
+        self.order = []
+        self.calls = []
+        self.selected = ()
+
+    def insert(self, parent, index, iid=None, values=()):
+        self.calls.append('insert')
+        if iid is None:
+            iid = f"I{len(self.calls)}"
+        self.rows[iid] = tuple(values)
+        self.order.insert(len(self.order) if index == 'end' else index, iid)
+        return iid
+
+    def delete(self, *iids):
+        self.calls.append('delete')
+        for iid in iids:
+            del self.rows[iid]
+            self.order.remove(iid)
+
+    def move(self, iid, parent, index):
+        self.calls.append('move')
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def item(self, iid, values=None):
+        self.calls.append('item')
+        self.rows[iid] = tuple(values)
+
+    def get_children(self):
+        return list(self.order)
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, iid):
+        self.selected = (iid,)
+
+    def __getattr__(self, name):
+        # configure, bind, heading... : sans effet
+        return lambda *args, **kwargs: None
+
+
+class FakeScrollbar:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class Value:
+    def __init__(self, value=''):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakeCombobox(Value):
+    def current(self):
+        return 0
+
+
+@pytest.fixture
+def window(workdir, monkeypatch):
+    """Fenêtre sans Tk : tableaux factices de 4 lignes visibles, dépôt de six étudiants."""
+    monkeypatch.setattr(Windows.VirtualTreeview, 'visible_rows', lambda self: 4)
+    w = Windows.StatisticsWindow.__new__(Windows.StatisticsWindow)
+    w.entree_tree, w.groupe_tree = FakeTree(), FakeTree()
+    w.entree_view = Windows.VirtualTreeview(w.entree_tree, FakeScrollbar(), w._entree_values)
+    w.groupe_view = Windows.VirtualTreeview(w.groupe_tree, FakeScrollbar(), w._groupe_values)
+    w.entree_search_var, w.groupe_search_var, w.entree_groupe_filter = Value(), Value(), Value('Tous')
+    w.status_label = w.count_label = FakeScrollbar()
+    w.stats_cache = Main.StatsCache()
+    w._displayed_entree = w._displayed_groupe = None
+    w._entree_sort = w._groupe_sort = None
+    w._entree_unsorted, w._groupe_unsorted = 0, False
+    repository = Repository()
+    scores = [12.0, 8.0, 15.0, 10.0, 18.0, 9.0]
+    repository.extend([Individual(f"N{i}", "P", f"G{i % 3}", [score]) for i, score in enumerate(scores)])
+    w.use_repository(repository)
+    return w
+
+
+def edit(w, individual, scores, nom=None):
+    """Modifie une entrée comme la boîte de dialogue d'édition."""
+    nom = nom or individual.nom
+    existing = w.repository.find(nom, individual.prenom)
+    changing = [individual] + ([existing] if existing is not None and existing is not individual else [])
+    w.detach_entrees(changing)
+    student = {'nom': nom, 'prenom': individual.prenom, 'groupe': individual.groupe, 'scores': scores}
+    w.apply_entree_change(*w.repository.save_student(student, previous=individual))
+
+
+def names(items):
+    return [item.nom for item in items]
+
+
+def test_edit_moves_entry_to_its_sorted_position(window):
+    window.sort_entrees('Score')
+    assert names(window.filtered_individuals) == ["N1", "N5", "N3", "N0", "N2", "N4"]
+
+    edit(window, window.repository.find("N4", "P"), {'a': 1.0})
+    assert names(window.filtered_individuals) == ["N4", "N1", "N5", "N3", "N0", "N2"]
+
+    window.sort_entrees('Score')
+    edit(window, window.repository.find("N1", "P"), {'a': 30.0})
+    assert names(window.filtered_individuals) == ["N1", "N2", "N0", "N3", "N5", "N4"]
+
+
+def test_added_and_merged_entries_follow_the_sort(window):
+    window.sort_entrees('Nom')
+    student = {'nom': 'M', 'prenom': 'P', 'groupe': 'G9', 'scores': {}}
+    window.apply_entree_change(*window.repository.save_student(student))
+    assert names(window.filtered_individuals) == ["M", "N0", "N1", "N2", "N3", "N4", "N5"]
+
+    edit(window, window.repository.find("N0", "P"), {'a': 5.0}, nom="N3")
+    assert names(window.filtered_individuals) == ["M", "N1", "N2", "N3", "N4", "N5"]
+    assert window.filtered_individuals == window.sorted_entrees(list(window.individuals), 'Nom')
+
+
+def test_group_sort_follows_changed_statistics(window):
+    window.sort_groupes('Moyenne')
+    assert names(window.filtered_groups) == ["G0", "G2", "G1"]
+    edit(window, window.repository.find("N0", "P"), {'a': 30.0})
+    assert names(window.filtered_groups) == ["G2", "G1", "G0"]
+    assert window.groupe_view.items is window.filtered_groups
+
+
+def test_loaded_batches_are_sorted(window):
+    window.sort_entrees('Score')
+    window.sort_entrees('Score')
+    window.add_loaded_batch([Individual(f"L{i}", "P", "G0", [float(i)]) for i in range(8)])
+    assert window.filtered_individuals == window.sorted_entrees(list(window.individuals), 'Score', True)
+
+    # petite fin de liste non triée : triée au prochain tri (ici à la fin du chargement)
+    window.add_loaded_batch([Individual("L9", "P", "G0", [99.0])])
+    assert window.filtered_individuals[-1].nom == "L9"
+    edit(window, window.repository.find("N0", "P"), {'a': 50.0})
+    window.populate_entree_table()
+    assert names(window.filtered_individuals[:2]) == ["L9", "N0"]
+
+
+def test_edit_refreshes_the_leaderboard(window):
+    window.leaderboard_tree = FakeTree()
+    window.leaderboard_criterion, window.leaderboard_scope = FakeCombobox(), FakeCombobox('Tous')
+    window.leaderboard_lowest, window.leaderboard_k = Value(False), Value(3)
+    window.refresh_leaderboard()
+    board = lambda: [window.leaderboard_tree.rows[iid][1] for iid in window.leaderboard_tree.order]
+    assert board() == ["N4", "N2", "N0"]
+
+    edit(window, window.repository.find("N1", "P"), {'a': 16.0})
+    assert board() == ["N4", "N1", "N2"]
+    edit(window, window.repository.find("N4", "P"), {'a': 1.0})
+    assert board() == ["N1", "N2", "N0"]
+
+
+@pytest.fixture
+def view(monkeypatch):
+    """Liste virtuelle de 4 lignes visibles (+2 de marge) dont les valeurs sont (position, élément)."""
+    monkeypatch.setattr(Windows.VirtualTreeview, 'visible_rows', lambda self: 4)
+    tree = FakeTree()
+    view = Windows.VirtualTreeview(tree, FakeScrollbar(), lambda pos, item: (pos, item), buffer=2)
+    view.set_items([f"e{i}" for i in range(20)])
+    tree.calls.clear()
+    return view
+
+
+def shown(view):
+    return [view.tree.rows[iid][1] for iid in view.tree.order]
+
+
+def test_treeview_only_creates_the_visible_window(view):
+    assert shown(view) == ["e0", "e1", "e2", "e3", "e4", "e5"]
+    view.refresh()
+    assert view.tree.calls == []
+
+
+def test_treeview_scroll_keeps_rows_that_stay_visible(view):
+    rows = list(view.tree.order)
+    view.scroll(1)
+    assert shown(view) == ["e1", "e2", "e3", "e4", "e5", "e6"]
+    assert view.tree.order[:5] == rows[1:]
+    # une ligne sortie, une créée ; les autres ne changent que de position affichée
+    assert view.tree.calls.count('delete') == 1 and view.tree.calls.count('insert') == 1
+    assert 'move' not in view.tree.calls
+
+
+def test_treeview_applies_only_the_difference(view):
+    items = view.items
+    del items[2]
+    view.refresh()
+    assert shown(view) == ["e0", "e1", "e3", "e4", "e5", "e6"]
+    assert view.tree.calls.count('delete') == 1 and view.tree.calls.count('insert') == 1
+    assert 'move' not in view.tree.calls
+
+    view.tree.calls.clear()
+    items[1], items[4] = items[4], items[1]
+    view.refresh()
+    assert shown(view) == ["e0", "e5", "e3", "e4", "e1", "e6"]
+    assert 'insert' not in view.tree.calls and 'delete' not in view.tree.calls
+    assert view.tree.calls.count('move') == 2
+
+
+def test_treeview_moves_a_shifted_row_once(view):
+    items = view.items
+    items.insert(4, items.pop(0))
+    view.refresh()
+    assert shown(view) == ["e1", "e2", "e3", "e4", "e0", "e5"]
+    assert view.tree.calls.count('move') == 1
+
+
+def test_treeview_matches_items_after_random_changes(view):
+    rng = random.Random(0)
+    items = view.items
+    for step in range(300):
+        change = rng.random()
+        if change < 0.3 and items:
+            del items[rng.randrange(len(items))]
+        elif change < 0.6:
+            items.insert(rng.randrange(len(items) + 1), f"n{step}")
+        elif change < 0.8 and len(items) > 1:
+            i, j = rng.randrange(len(items)), rng.randrange(len(items))
+            items[i], items[j] = items[j], items[i]
+        else:
+            view.offset += rng.randint(-3, 3)
+        view.refresh()
+        window = items[view.offset:view.offset + 6]
+        assert shown(view) == window
+        assert [view.tree.rows[iid][0] for iid in view.tree.order] == list(range(view.offset + 1, view.offset + 1 + len(window)))
+
+
+def test_treeview_keeps_selection_outside_the_window(view):
+    view.selected = "e1"
+    view.refresh()
+    selected_iid = view.tree.selected[0]
+    view.scroll(10)
+    assert "e1" not in shown(view) and view.selected_item() == "e1"
+    view.scroll(-10)
+    assert view.tree.selected == (view.iid("e1"),) and view.iid("e1") != selected_iid